@@ -0,0 +1,112 @@
+"""
+Reproducible cold-start benchmark of the Lambda function.
+
+Every sample runs in a fresh Python process (like a new execution
+environment) and measures, for each startup configuration:
+ - import: time to import lambda_function (the init phase)
+ - first_404: first invocation of a route which does not exist
+ - first_get: first getVisitorCount invocation after the 404
+ - first_get_only: first getVisitorCount invocation in a fresh process
+
+DynamoDB is served by a local stub (benchmarks/dynamodb_stub.py), so no AWS
+account is needed and the measured process never imports moto.
+
+Usage: python benchmarks/cold_start.py [--samples 20] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from dynamodb_stub import DynamoDBStubServer
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_ID = "6632d5b4-5655-4c48-b7b6-071d5823c888"
+
+# configuration name -> extra environment variables of the measured process
+CONFIGURATIONS = {
+    "eager": {"LAMBDA_STARTUP_MODE": "eager"},
+    "lazy": {"LAMBDA_STARTUP_MODE": "lazy"},
+    "lazy+provisioned-concurrency": {"LAMBDA_STARTUP_MODE": "lazy",
+                                     "AWS_LAMBDA_INITIALIZATION_TYPE": "provisioned-concurrency"},
+}
+
+_SAMPLE_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, "myresume_backend")
+with open("tests/events/sampleEvent_getVisitorCount.json", encoding="UTF-8") as file_handle:
+    get_event = json.load(file_handle)
+not_found_event = dict(get_event, queryStringParameters={"func": "unknownFunction"})
+
+timings = {}
+start = time.perf_counter()
+import lambda_function
+timings["import"] = time.perf_counter() - start
+if sys.argv[1] == "with_404":
+    start = time.perf_counter()
+    assert lambda_function.lambda_handler(not_found_event, None)["statusCode"] == 404
+    timings["first_404"] = time.perf_counter() - start
+    key = "first_get"
+else:
+    key = "first_get_only"
+start = time.perf_counter()
+assert lambda_function.lambda_handler(get_event, None)["statusCode"] == 200
+timings[key] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+
+def run_sample(environment: dict, scenario: str) -> dict:
+    """
+    Run one measured process and return its timings in seconds.
+    """
+    completed = subprocess.run([sys.executable, "-c", _SAMPLE_SCRIPT, scenario],
+                               cwd=REPO_ROOT, env=environment, check=True,
+                               capture_output=True, text=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=int, default=20, help="fresh processes per configuration and scenario")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    stub = DynamoDBStubServer({PAGE_ID: 42}).start()
+    base_environment = dict(os.environ,
+                            DYNAMODB_TABLE_NAME="benchmark",
+                            DYNAMODB_ENDPOINT_URL=stub.endpoint_url,
+                            AWS_ACCESS_KEY_ID="testing",
+                            AWS_SECRET_ACCESS_KEY="testing",
+                            PYTHONDONTWRITEBYTECODE="1")
+    for variable in ("LAMBDA_STARTUP_MODE", "AWS_LAMBDA_INITIALIZATION_TYPE"):
+        base_environment.pop(variable, None)
+
+    results = {}
+    for name, configuration in CONFIGURATIONS.items():
+        environment = dict(base_environment, **configuration)
+        samples = [run_sample(environment, "with_404") for _ in range(args.samples)]
+        samples += [run_sample(environment, "get_only") for _ in range(args.samples)]
+        results[name] = {}
+        for metric in ("import", "first_404", "first_get", "first_get_only"):
+            values = [sample[metric] for sample in samples if metric in sample]
+            results[name][metric] = {"median_ms": statistics.median(values) * 1000,
+                                     "min_ms": min(values) * 1000}
+    stub.shutdown()
+
+    print(f"{'configuration':<30}{'metric':<16}{'median ms':>12}{'min ms':>12}")
+    for name, metrics in results.items():
+        for metric, values in metrics.items():
+            print(f"{name:<30}{metric:<16}{values['median_ms']:>12.1f}{values['min_ms']:>12.1f}")
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as file_handle:
+            json.dump({"samples": args.samples, "results": results}, file_handle, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
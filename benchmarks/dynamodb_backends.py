@@ -0,0 +1,72 @@
+"""
+Per-call benchmark of the DynamoDB backends against moto.
+
+Compares the boto3 resource/Table backend with the low-level client fast
+path for reads (getVisitorCount) and writes (addOneVisitorCount). moto adds
+the same server-side cost to both, so the difference is the client-side
+(de)serialization work.
+
+Usage: python benchmarks/dynamodb_backends.py [--number 500] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+import moto
+from boto3 import client, resource
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "myresume_backend"))
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+TABLE_NAME = "benchmark"
+PAGE_ID = "6632d5b4-5655-4c48-b7b6-071d5823c888"
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=500, help="calls per measurement")
+    parser.add_argument("--repeat", type=int, default=3, help="measurements, the best one is kept")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    with moto.mock_dynamodb():
+        import lambda_function  # pylint: disable=import-outside-toplevel
+
+        region = lambda_function._AWS_REGION  # pylint: disable=protected-access
+        dynamodb = resource("dynamodb", region_name=region)
+        dynamodb.create_table(TableName=TABLE_NAME,
+                              KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+                              AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+                              BillingMode="PAY_PER_REQUEST")
+        dynamodb.Table(TABLE_NAME).put_item(Item={"pkey_uuid": PAGE_ID, "visit_count": 42})
+
+        results = {}
+        for backend in ("resource", "client"):
+            dynamodb_class = lambda_function.LambdaDynamoDBClass({"resource": dynamodb,
+                                                                  "client": client("dynamodb", region_name=region),
+                                                                  "table_name": TABLE_NAME,
+                                                                  "backend": backend})
+            operations = {"get": lambda: lambda_function.get_visit_count(dynamodb_class, PAGE_ID),
+                          "add": lambda: lambda_function.add_visit_count_delta(dynamodb_class, PAGE_ID, 1)}
+            results[backend] = {}
+            for operation, call in operations.items():
+                call()
+                best = min(timeit.repeat(call, number=args.number, repeat=args.repeat))
+                results[backend][operation] = {"us_per_call": best / args.number * 1e6}
+
+    print(f"{'backend':<12}{'get us':>12}{'add us':>12}")
+    for backend, result in results.items():
+        print(f"{backend:<12}{result['get']['us_per_call']:>12.1f}{result['add']['us_per_call']:>12.1f}")
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as file_handle:
+            json.dump(results, file_handle, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Minimal local stand-in for the DynamoDB HTTP API, for the benchmarks.
+
+It speaks just enough of the DynamoDB JSON protocol (GetItem, UpdateItem and
+BatchGetItem on "visit_count") for the Lambda function to run against it with
+DYNAMODB_ENDPOINT_URL. Unlike moto it does not need boto3 in the benchmarked
+process, so import times are not skewed.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+
+class DynamoDBStubServer(ThreadingHTTPServer):
+    """
+    HTTP server holding an in-memory table of pkey_uuid -> visit_count
+    """
+    daemon_threads = True
+
+    def __init__(self, counts: Dict[str, int], address: Tuple[str, int] = ("127.0.0.1", 0)):
+        super().__init__(address, _DynamoDBStubHandler)
+        self.counts = dict(counts)
+        self.lock = threading.Lock()
+
+    @property
+    def endpoint_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def start(self) -> "DynamoDBStubServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def _item(key: str, count: int) -> dict:
+    return {"pkey_uuid": {"S": key}, "visit_count": {"N": str(count)}}
+
+
+class _DynamoDBStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        operation = self.headers["X-Amz-Target"].split(".")[-1]
+        counts = self.server.counts
+        status, response = 200, {}
+
+        with self.server.lock:
+            if operation == "GetItem":
+                key = request["Key"]["pkey_uuid"]["S"]
+                if key in counts:
+                    response = {"Item": _item(key, counts[key])}
+            elif operation == "UpdateItem":
+                key = request["Key"]["pkey_uuid"]["S"]
+                delta = int(request["ExpressionAttributeValues"][":val"]["N"])
+                if key not in counts and request["UpdateExpression"].startswith("SET"):
+                    status, response = 400, {"__type": "com.amazon.coral.validate#ValidationException",
+                                             "message": "The provided expression refers to an attribute that does not exist in the item"}
+                else:
+                    counts[key] = counts.get(key, 0) + delta
+                    response = {"Attributes": {"visit_count": {"N": str(counts[key])}}}
+            elif operation == "BatchGetItem":
+                response = {"Responses": {}, "UnprocessedKeys": {}}
+                for table_name, request_items in request["RequestItems"].items():
+                    keys = [key["pkey_uuid"]["S"] for key in request_items["Keys"]]
+                    response["Responses"][table_name] = [_item(key, counts[key]) for key in keys if key in counts]
+            else:
+                status, response = 400, {"__type": "com.amazon.coral.service#UnknownOperationException",
+                                         "message": f"{operation} is not supported by the stub"}
+
+        payload = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-amz-json-1.0")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
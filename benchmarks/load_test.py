@@ -0,0 +1,300 @@
+"""
+Local load test and latency benchmark of lambda_handler.
+
+Replays the sample events of tests/events with page-ids and functions varied
+according to a synthetic traffic mix, against a moto table, the local
+DynamoDB stub or a local store (memory or SQLite), from a thread pool at
+several concurrency levels. Reports per
+level: throughput, p50/p95/p99 latency, a per-phase breakdown (validation,
+routing, DynamoDB call, response building) and memory allocated per
+invocation. Results are saved as JSON together with the git commit, and can
+be compared with a previous run to spot regressions.
+
+Usage:
+    python benchmarks/load_test.py --mix read-heavy --concurrency 1,4,16 --requests 2000 --output run.json
+    python benchmarks/load_test.py --mix read-heavy --output new.json --compare run.json
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "myresume_backend"))
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+TABLE_NAME = "benchmark"
+
+# mix name -> weight of each function name ("getVisitorCounts" is the batch route)
+MIXES = {
+    "read-heavy": {"getVisitorCount": 90, "addOneVisitorCount": 10},
+    "write-heavy": {"getVisitorCount": 20, "addOneVisitorCount": 80},
+    "batch": {"getVisitorCount": 40, "addOneVisitorCount": 20, "getVisitorCounts": 40},
+}
+PHASES = ("validation", "routing", "dynamodb", "response")
+
+
+def load_event(name: str) -> dict:
+    with open(os.path.join(REPO_ROOT, "tests", "events", f"sampleEvent_{name}.json"), encoding="UTF-8") as file_handle:
+        return json.load(file_handle)
+
+
+class EventGenerator:
+    """
+    Synthetic events: sample events with the function drawn from the mix and
+    the page-id drawn from a skewed (Zipf-like) set of pages.
+    """
+    def __init__(self, mix: Dict[str, int], page_ids: List[str], seed: int):
+        self.templates = {"getVisitorCount": load_event("getVisitorCount"),
+                          "addOneVisitorCount": load_event("addOneVisitorCount"),
+                          "getVisitorCounts": load_event("getVisitorCounts")}
+        self.functions = list(mix)
+        self.function_weights = list(mix.values())
+        self.page_ids = page_ids
+        # popular pages get most of the traffic, like a resume home page
+        self.page_weights = [1 / (rank + 1) for rank in range(len(page_ids))]
+        self.random = random.Random(seed)
+
+    def events(self, count: int) -> List[dict]:
+        events = []
+        for function_name in self.random.choices(self.functions, self.function_weights, k=count):
+            event = copy.deepcopy(self.templates[function_name])
+            if function_name == "getVisitorCounts":
+                ids = ",".join(self.random.sample(self.page_ids, min(5, len(self.page_ids))))
+                event["queryStringParameters"]["ids"] = ids
+            else:
+                event["pathParameters"]["page-id"] = self.random.choices(self.page_ids, self.page_weights)[0]
+            events.append(event)
+        return events
+
+
+class PhaseTimer:
+    """
+    Wraps the phase functions of lambda_function to accumulate their time
+    per invocation (per thread, so that concurrent invocations do not mix).
+    """
+    def __init__(self, lambda_function):
+        self._local = threading.local()
+        self._originals = {}
+        self.lambda_function = lambda_function
+        wrapped = {"validation": ("validate_request", "validate_response"),
+                   "route": ("getVisitorsCount", "addOneVisitorCount", "getVisitorsCounts"),
+                   "dynamodb": ("get_visit_count", "add_visit_count_delta", "get_visit_counts")}
+        for phase, function_names in wrapped.items():
+            for function_name in function_names:
+                original = getattr(lambda_function, function_name)
+                self._originals[function_name] = original
+                setattr(lambda_function, function_name, self._timed(phase, original))
+
+    def _timed(self, phase: str, function: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.totals[phase] = self.totals.get(phase, 0.0) + time.perf_counter() - start
+        return wrapper
+
+    @property
+    def totals(self) -> Dict[str, float]:
+        if not hasattr(self._local, "totals"):
+            self._local.totals = {}
+        return self._local.totals
+
+    def invoke(self, event: dict) -> Dict[str, float]:
+        """
+        Run one invocation and return its total latency and phase breakdown.
+        """
+        self._local.totals = {}
+        start = time.perf_counter()
+        response = self.lambda_function.lambda_handler(event, None)
+        total = time.perf_counter() - start
+        if response["statusCode"] >= 500:
+            raise RuntimeError(f"invocation failed: {response}")
+        totals = self.totals
+        route = totals.get("route", 0.0)
+        dynamodb = totals.get("dynamodb", 0.0)
+        validation = totals.get("validation", 0.0)
+        return {"total": total, "validation": validation, "dynamodb": dynamodb,
+                "response": max(route - dynamodb, 0.0),
+                "routing": max(total - validation - route, 0.0)}
+
+    def restore(self) -> None:
+        for function_name, original in self._originals.items():
+            setattr(self.lambda_function, function_name, original)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_level(timer: PhaseTimer, events: List[dict], concurrency: int) -> dict:
+    """
+    Replay the events from a thread pool and summarize the latencies.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(timer.invoke, events))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(sample["total"] for sample in samples)
+    return {"concurrency": concurrency,
+            "requests": len(samples),
+            "throughput_rps": len(samples) / elapsed,
+            "latency_ms": {"p50": percentile(latencies, 0.50) * 1000,
+                           "p95": percentile(latencies, 0.95) * 1000,
+                           "p99": percentile(latencies, 0.99) * 1000,
+                           "mean": sum(latencies) / len(latencies) * 1000},
+            "phases_mean_ms": {phase: sum(sample[phase] for sample in samples) / len(samples) * 1000
+                               for phase in PHASES}}
+
+
+def measure_allocations(timer: PhaseTimer, events: List[dict]) -> dict:
+    """
+    Sequentially replay events under tracemalloc: peak bytes allocated while
+    an invocation runs, and bytes still held after it returned.
+    """
+    tracemalloc.start()
+    peaks, retained = [], []
+    for event in events:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        timer.invoke(event)
+        after, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        retained.append(after - before)
+    tracemalloc.stop()
+    return {"peak_bytes_per_invocation": sum(peaks) / len(peaks),
+            "retained_bytes_per_invocation": sum(retained) / len(retained)}
+
+
+@contextlib.contextmanager
+def benchmark_table(table: str, page_ids: List[str]):
+    """
+    Provide a table holding the benchmark pages: moto in-process, the local
+    DynamoDB stub reached over HTTP, or a local store (memory or SQLite).
+    """
+    os.environ["DYNAMODB_TABLE_NAME"] = TABLE_NAME
+    if table in ("memory", "sqlite"):
+        import tempfile  # pylint: disable=import-outside-toplevel
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ["VISIT_COUNT_STORE"] = table
+            os.environ["VISIT_COUNT_SQLITE_PATH"] = os.path.join(directory, "benchmark.sqlite3")
+            os.environ["VISIT_COUNT_STORE_PAGES"] = json.dumps({page_id: 0 for page_id in page_ids})
+            yield
+        return
+    if table == "stub":
+        from dynamodb_stub import DynamoDBStubServer  # pylint: disable=import-outside-toplevel
+        stub = DynamoDBStubServer({page_id: 0 for page_id in page_ids}).start()
+        os.environ["DYNAMODB_ENDPOINT_URL"] = stub.endpoint_url
+        try:
+            yield
+        finally:
+            stub.shutdown()
+        return
+
+    import moto                     # pylint: disable=import-outside-toplevel
+    from boto3 import resource      # pylint: disable=import-outside-toplevel
+    with moto.mock_dynamodb():
+        dynamodb = resource("dynamodb", region_name="ap-northeast-1")
+        dynamodb.create_table(TableName=TABLE_NAME,
+                              KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+                              AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+                              BillingMode="PAY_PER_REQUEST")
+        with dynamodb.Table(TABLE_NAME).batch_writer() as batch:
+            for page_id in page_ids:
+                batch.put_item(Item={"pkey_uuid": page_id, "visit_count": 0})
+        yield
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """
+    Print the change of throughput and p99 latency against a baseline run.
+    """
+    print(f"\ncompared with {baseline.get('commit')} ({baseline.get('mix')}):")
+    baseline_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    for level in current["levels"]:
+        reference = baseline_levels.get(level["concurrency"])
+        if reference is None:
+            continue
+        throughput = (level["throughput_rps"] / reference["throughput_rps"] - 1) * 100
+        p99 = (level["latency_ms"]["p99"] / reference["latency_ms"]["p99"] - 1) * 100
+        print(f"  concurrency {level['concurrency']:>3}: throughput {throughput:+6.1f}%  p99 {p99:+6.1f}%")
+
+
+def print_results(results: dict) -> None:
+    print(f"commit {results['commit']}, mix {results['mix']}, table {results['table']}")
+    print(f"{'conc':>5}{'rps':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  "
+          + "".join(f"{phase + ' ms':>14}" for phase in PHASES))
+    for level in results["levels"]:
+        print(f"{level['concurrency']:>5}{level['throughput_rps']:>10.1f}"
+              f"{level['latency_ms']['p50']:>9.2f}{level['latency_ms']['p95']:>9.2f}{level['latency_ms']['p99']:>9.2f}  "
+              + "".join(f"{level['phases_mean_ms'][phase]:>14.3f}" for phase in PHASES))
+    allocations = results["allocations"]
+    print(f"allocations: {allocations['peak_bytes_per_invocation'] / 1024:.1f} KiB peak, "
+          f"{allocations['retained_bytes_per_invocation'] / 1024:.2f} KiB retained per invocation")
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mix", choices=sorted(MIXES), default="read-heavy")
+    parser.add_argument("--table", choices=("moto", "stub", "memory", "sqlite"), default="moto")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma separated thread pool sizes")
+    parser.add_argument("--requests", type=int, default=1000, help="invocations per concurrency level")
+    parser.add_argument("--pages", type=int, default=20, help="number of distinct page-ids")
+    parser.add_argument("--warmup", type=int, default=50, help="invocations before measuring")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+    args = parser.parse_args(argv)
+
+    page_ids = [f"{index:08d}-0000-4000-8000-000000000000" for index in range(args.pages)]
+    generator = EventGenerator(MIXES[args.mix], page_ids, args.seed)
+
+    with benchmark_table(args.table, page_ids), contextlib.redirect_stdout(io.StringIO()):
+        import lambda_function  # pylint: disable=import-outside-toplevel
+        timer = PhaseTimer(lambda_function)
+        try:
+            for event in generator.events(args.warmup):
+                timer.invoke(event)
+            levels = [run_level(timer, generator.events(args.requests), int(concurrency))
+                      for concurrency in args.concurrency.split(",")]
+            allocations = measure_allocations(timer, generator.events(min(args.requests, 200)))
+        finally:
+            timer.restore()
+
+    results = {"commit": git_commit(), "mix": args.mix, "table": args.table,
+               "pages": args.pages, "levels": levels, "allocations": allocations}
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as file_handle:
+            json.dump(results, file_handle, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="UTF-8") as file_handle:
+            compare(results, json.load(file_handle))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Micro-benchmark of the request/response validation of lambda_handler.
+
+Compares, for each sample event, the powertools @validator decorator path
+(used before) with the precompiled fastjsonschema path of validation.py,
+both wrapped around the same no-op handler.
+
+Usage: python benchmarks/validation.py [--number 2000] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "myresume_backend"))
+
+from aws_lambda_powertools.utilities.validation import validator  # pylint: disable=wrong-import-position
+from schemas import INPUT_SCHEMA, OUTPUT_SCHEMA                    # pylint: disable=wrong-import-position
+from validation import validate_request, validate_response         # pylint: disable=wrong-import-position
+
+
+SAMPLE_EVENTS = ("sampleEvent_getVisitorCount", "sampleEvent_addOneVisitorCount")
+_RESPONSE = {"statusCode": 200, "body": "42"}
+
+
+def noop_handler(event, context):
+    return _RESPONSE
+
+
+@validator(inbound_schema=INPUT_SCHEMA, outbound_schema=OUTPUT_SCHEMA)
+def decorator_handler(event, context):
+    return noop_handler(event, context)
+
+
+def compiled_handler(event, context):
+    validate_request(event)
+    response = noop_handler(event, context)
+    validate_response(response)
+    return response
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000, help="calls per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="measurements, the best one is kept")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for event_name in SAMPLE_EVENTS:
+        with open(os.path.join(REPO_ROOT, "tests", "events", f"{event_name}.json"), encoding="UTF-8") as file_handle:
+            event = json.load(file_handle)
+        results[event_name] = {}
+        for path_name, handler in (("decorator", decorator_handler), ("compiled", compiled_handler)):
+            best = min(timeit.repeat(lambda: handler(event, None), number=args.number, repeat=args.repeat))
+            results[event_name][path_name] = {"us_per_call": best / args.number * 1e6}
+        results[event_name]["speedup"] = (results[event_name]["decorator"]["us_per_call"]
+                                          / results[event_name]["compiled"]["us_per_call"])
+
+    print(f"{'event':<34}{'decorator us':>14}{'compiled us':>14}{'speedup':>10}")
+    for event_name, result in results.items():
+        print(f"{event_name:<34}{result['decorator']['us_per_call']:>14.1f}"
+              f"{result['compiled']['us_per_call']:>14.1f}{result['speedup']:>9.1f}x")
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as file_handle:
+            json.dump(results, file_handle, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Read many visitor counts in one go with DynamoDB BatchGetItem.
+
+BatchGetItem accepts at most 100 keys per call and may return part of them
+as "UnprocessedKeys" (e.g. when throttled). The helpers below split the keys
+into chunks, retry the unprocessed keys with exponential backoff, and report
+the keys that still could not be read, so that callers can tell pages which
+do not exist apart from pages which could not be read.
+"""
+
+import random
+import time
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 5
+BATCH_GET_BASE_BACKOFF_SECONDS = 0.05
+
+
+def batch_get_items(dynamodb_resource, table_name: str, keys: Iterable[str],
+                    projection: str = "pkey_uuid, visit_count") -> Tuple[Dict[str, dict], Set[str]]:
+    """
+    Read the items of the given "pkey_uuid" keys. Return the found items by
+    key, and the keys still unprocessed after all retries. Keys which are in
+    neither do not exist in the table.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    items = {}
+    unprocessed = set()
+
+    for chunk_start in range(0, len(unique_keys), BATCH_GET_MAX_KEYS):
+        chunk = unique_keys[chunk_start:chunk_start + BATCH_GET_MAX_KEYS]
+        request_items = {table_name: {"Keys": [{"pkey_uuid": key} for key in chunk],
+                                      "ProjectionExpression": projection}}
+        for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+            if attempt > 0:
+                # exponential backoff with full jitter before retrying the leftovers
+                time.sleep(random.uniform(0, BATCH_GET_BASE_BACKOFF_SECONDS * (2 ** attempt)))
+            dbResponse = dynamodb_resource.batch_get_item(RequestItems=request_items)
+            for item in dbResponse.get("Responses", {}).get(table_name, []):
+                items[item["pkey_uuid"]] = item
+            request_items = dbResponse.get("UnprocessedKeys") or {}
+            if not request_items:
+                break
+        else:
+            unprocessed.update(key["pkey_uuid"] for key in request_items[table_name]["Keys"])
+
+    return items, unprocessed
+
+
+def batch_get_visit_counts(dynamodb_resource, table_name: str,
+                           keys_by_page: Mapping[str, List[str]]) -> Tuple[Dict[str, int], List[str], List[str]]:
+    """
+    Read the visit counts of many pages. keys_by_page maps each page-id to
+    the keys holding its count (the page item first, then its shards), which
+    are added up. Return the counts by page-id, the page-ids not found in the
+    table, and the page-ids which could not be read.
+    """
+    items, unprocessed = batch_get_items(dynamodb_resource, table_name,
+                                         (key for keys in keys_by_page.values() for key in keys))
+
+    counts, missing, errors = {}, [], []
+    for page_id, keys in keys_by_page.items():
+        if unprocessed.intersection(keys):
+            errors.append(page_id)
+        elif page_id not in items or "visit_count" not in items[page_id]:
+            missing.append(page_id)
+        else:
+            counts[page_id] = sum(int(items[key].get("visit_count", 0)) for key in keys if key in items)
+    return counts, missing, errors
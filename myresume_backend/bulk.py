@@ -0,0 +1,332 @@
+"""
+Bulk export and import of the visit count table.
+
+export streams every item of the table to a JSONL file, one
+{"Item": {...}} line per item in DynamoDB JSON (the format of the DynamoDB
+export to S3, binary values in base64). The table is read by a parallel
+Scan: each of the --segments threads scans its own segment, and the lines
+go through a bounded queue to the single writer, so memory use does not
+grow with the table.
+
+import loads a JSONL file with BatchWriteItem (25 items per request, from
+--workers threads), retrying the unprocessed items with exponential
+backoff. Besides the export format, it accepts {"pageId": ..., "visit_count": ...}
+lines, which create or reset the count of a page (the other attributes of
+the page, e.g. its unique-visitor sketch, are removed). Such a line also
+deletes the shard items of a sharded page (VISIT_COUNT_SHARD_COUNT and
+VISIT_COUNT_PAGE_SHARD_COUNTS, or --shard-count), so that the count of the
+page is the one of the line. The file is read lazily and at most
+2 * --workers batches are in flight.
+
+Progress (items and items per second) is printed to stderr.
+
+Usage:
+    python myresume_backend/bulk.py export --table <table> --output counts.jsonl [--segments 8]
+    python myresume_backend/bulk.py import --table <table> --input counts.jsonl [--workers 4] [--shard-count 8]
+"""
+
+import argparse
+import base64
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from os import environ
+from typing import Callable, Iterable, List, Optional, TextIO
+
+from sharding import ShardConfig, shard_keys
+
+
+BATCH_WRITE_MAX_ITEMS = 25
+BATCH_WRITE_MAX_ATTEMPTS = 8
+BATCH_WRITE_BASE_BACKOFF_SECONDS = 0.05
+
+# Lines buffered between the scanning threads and the writer
+EXPORT_QUEUE_SIZE = 1000
+
+
+class Progress:
+    """
+    Item counter printing the throughput at most every interval_seconds
+    """
+    def __init__(self, label: str, interval_seconds: float = 5.0, stream: Optional[TextIO] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.label = label
+        self.interval_seconds = interval_seconds
+        self.stream = stream if stream is not None else sys.stderr
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.items = 0
+        self._started_at = self._reported_at = clock()
+
+    def add(self, items: int) -> None:
+        """
+        Count items, and report the progress when the interval passed.
+        """
+        with self._lock:
+            self.items += items
+            now = self._clock()
+            if now - self._reported_at < self.interval_seconds:
+                return
+            self._reported_at = now
+        self.report()
+
+    def rate(self) -> float:
+        """
+        Return the items per second since the start.
+        """
+        return self.items / max(self._clock() - self._started_at, 1e-9)
+
+    def report(self) -> None:
+        print(f"{self.label}: {self.items} items, {self.rate():.0f} items/s", file=self.stream)
+
+
+def _map_binary_values(value: dict, convert: Callable) -> dict:
+    """
+    Return the DynamoDB JSON value with convert applied to its binary
+    values, also within sets, lists and maps.
+    """
+    (value_type, content), = value.items()
+    if value_type == "B":
+        return {"B": convert(content)}
+    if value_type == "BS":
+        return {"BS": [convert(member) for member in content]}
+    if value_type == "L":
+        return {"L": [_map_binary_values(member, convert) for member in content]}
+    if value_type == "M":
+        return {"M": {name: _map_binary_values(member, convert) for name, member in content.items()}}
+    return value
+
+
+def item_to_json(item: dict) -> dict:
+    """
+    Return the JSON form of a DynamoDB item of the low-level client (binary
+    values in base64).
+    """
+    return {name: _map_binary_values(value, lambda content: base64.b64encode(content).decode("ascii"))
+            for name, value in item.items()}
+
+
+def item_from_json(record: dict) -> dict:
+    """
+    Return the DynamoDB item of an import line: {"Item": <DynamoDB JSON>}
+    or {"pageId": ..., "visit_count": ...}.
+    """
+    if "Item" not in record:
+        return {"pkey_uuid": {"S": str(record["pageId"])},
+                "visit_count": {"N": str(int(record["visit_count"]))}}
+    return {name: _map_binary_values(value, base64.b64decode) for name, value in record["Item"].items()}
+
+
+def write_requests_from_json(record: dict, shard_config: ShardConfig) -> List[dict]:
+    """
+    Return the BatchWriteItem requests of an import line. A pageId line also
+    deletes the shards 1..N-1 of the page (missing shards count as zero).
+    """
+    requests = [{"PutRequest": {"Item": item_from_json(record)}}]
+    if "Item" not in record:
+        page_id = str(record["pageId"])
+        requests.extend({"DeleteRequest": {"Key": {"pkey_uuid": {"S": key}}}}
+                        for key in shard_keys(page_id, shard_config.shard_count(page_id))[1:])
+    return requests
+
+
+def _request_key(request: dict) -> str:
+    """
+    Return the "pkey_uuid" of a BatchWriteItem request.
+    """
+    if "PutRequest" in request:
+        return request["PutRequest"]["Item"]["pkey_uuid"]["S"]
+    return request["DeleteRequest"]["Key"]["pkey_uuid"]["S"]
+
+
+def scan_segment(dynamodb_client, table_name: str, segment: int, total_segments: int,
+                 emit: Callable[[dict], None]) -> int:
+    """
+    Scan one segment of the table, calling emit with each item. Return the
+    number of items.
+    """
+    scan_arguments = {"TableName": table_name, "Segment": segment, "TotalSegments": total_segments}
+    items = 0
+    while True:
+        dbResponse = dynamodb_client.scan(**scan_arguments)
+        for item in dbResponse.get("Items", []):
+            emit(item)
+            items += 1
+        if "LastEvaluatedKey" not in dbResponse:
+            return items
+        scan_arguments["ExclusiveStartKey"] = dbResponse["LastEvaluatedKey"]
+
+
+def export_table(dynamodb_client, table_name: str, output: TextIO, segments: int = 8,
+                 progress: Optional[Progress] = None) -> int:
+    """
+    Write every item of the table to output as JSONL, scanning the segments
+    in parallel. Return the number of items written.
+    """
+    lines: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+    # set when the writer failed, so that the scans stop instead of blocking on the queue
+    cancelled = threading.Event()
+
+    def put(line: Optional[str]) -> None:
+        while not cancelled.is_set():
+            try:
+                lines.put(line, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise RuntimeError("export cancelled")
+
+    def scan(segment: int) -> int:
+        try:
+            return scan_segment(dynamodb_client, table_name, segment, segments,
+                                lambda item: put(json.dumps({"Item": item_to_json(item)})))
+        finally:
+            # one end marker per segment, also when the scan failed
+            put(None)
+
+    written = 0
+    with ThreadPoolExecutor(max_workers=segments, thread_name_prefix="export-scan") as executor:
+        futures = [executor.submit(scan, segment) for segment in range(segments)]
+        finished_segments = 0
+        try:
+            while finished_segments < segments:
+                line = lines.get()
+                if line is None:
+                    finished_segments += 1
+                    continue
+                output.write(line + "\n")
+                written += 1
+                if progress is not None:
+                    progress.add(1)
+        except BaseException:
+            cancelled.set()
+            raise
+    for future in futures:
+        # raise the error of a failed segment
+        future.result()
+    return written
+
+
+def write_batch(dynamodb_client, table_name: str, requests: Iterable[dict],
+                sleep: Callable[[float], None] = time.sleep) -> int:
+    """
+    Write up to 25 put or delete requests with BatchWriteItem, retrying the
+    unprocessed ones with exponential backoff and full jitter. Return the
+    number of items put. Raise RuntimeError when some requests are still
+    unprocessed after all attempts.
+    """
+    # BatchWriteItem rejects two requests on the same key: the last one wins
+    unique_requests = {_request_key(request): request for request in requests}
+    request_items = {table_name: list(unique_requests.values())}
+    for attempt in range(BATCH_WRITE_MAX_ATTEMPTS):
+        if attempt > 0:
+            sleep(random.uniform(0, BATCH_WRITE_BASE_BACKOFF_SECONDS * (2 ** attempt)))
+        dbResponse = dynamodb_client.batch_write_item(RequestItems=request_items)
+        request_items = dbResponse.get("UnprocessedItems") or {}
+        if not request_items:
+            return sum(1 for request in unique_requests.values() if "PutRequest" in request)
+    raise RuntimeError(f"{len(request_items[table_name])} requests still unprocessed "
+                       f"after {BATCH_WRITE_MAX_ATTEMPTS} attempts")
+
+
+def import_items(dynamodb_client, table_name: str, lines: Iterable[str], workers: int = 4,
+                 progress: Optional[Progress] = None,
+                 sleep: Callable[[float], None] = time.sleep,
+                 shard_config: Optional[ShardConfig] = None) -> int:
+    """
+    Write the items of the JSONL lines with BatchWriteItem from workers
+    threads, keeping at most 2 * workers batches in flight. pageId lines
+    also delete the shards of the page given by shard_config (none by
+    default). Return the number of items written.
+    """
+    shard_config = shard_config or ShardConfig()
+    written = 0
+
+    def collect(done) -> int:
+        items = 0
+        for future in done:
+            batch_items = future.result()
+            items += batch_items
+            if progress is not None:
+                progress.add(batch_items)
+        return items
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import-write") as executor:
+        in_flight = set()
+        batch = []
+        for line in lines:
+            if not line.strip():
+                continue
+            batch.extend(write_requests_from_json(json.loads(line), shard_config))
+            while len(batch) >= BATCH_WRITE_MAX_ITEMS:
+                if len(in_flight) >= 2 * workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    written += collect(done)
+                in_flight.add(executor.submit(write_batch, dynamodb_client, table_name,
+                                              batch[:BATCH_WRITE_MAX_ITEMS], sleep))
+                batch = batch[BATCH_WRITE_MAX_ITEMS:]
+        if batch:
+            in_flight.add(executor.submit(write_batch, dynamodb_client, table_name, batch, sleep))
+        written += collect(wait(in_flight).done)
+    return written
+
+
+def _create_dynamodb_client(region: str, max_pool_connections: int):
+    """
+    Create the low-level DynamoDB client. DYNAMODB_ENDPOINT_URL can point it
+    to a local DynamoDB, as for the Lambda function.
+    """
+    from boto3 import client  # pylint: disable=import-outside-toplevel
+    from botocore.config import Config  # pylint: disable=import-outside-toplevel
+    return client("dynamodb", region_name=region,
+                  endpoint_url=environ.get("DYNAMODB_ENDPOINT_URL") or None,
+                  config=Config(max_pool_connections=max_pool_connections,
+                                retries={"mode": "adaptive", "max_attempts": 10}))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("--table", default=environ.get("DYNAMODB_TABLE_NAME"),
+                        help="table name (default: DYNAMODB_TABLE_NAME)")
+    parser.add_argument("--region", default="ap-northeast-1")
+    parser.add_argument("--output", help="JSONL file written by export (default: stdout)")
+    parser.add_argument("--input", help="JSONL file read by import (default: stdin)")
+    parser.add_argument("--segments", type=int, default=8, help="parallel scan segments of export")
+    parser.add_argument("--workers", type=int, default=4, help="BatchWriteItem threads of import")
+    parser.add_argument("--shard-count", type=int,
+                        help="shards per page deleted by the pageId lines of import "
+                             "(default: VISIT_COUNT_SHARD_COUNT and VISIT_COUNT_PAGE_SHARD_COUNTS)")
+    args = parser.parse_args(argv)
+    if not args.table:
+        parser.error("--table is required when DYNAMODB_TABLE_NAME is not set")
+
+    dynamodb_client = _create_dynamodb_client(args.region, max(args.segments, args.workers) + 2)
+    progress = Progress(args.command)
+    if args.command == "export":
+        output = open(args.output, "w", encoding="UTF-8") if args.output else sys.stdout
+        try:
+            items = export_table(dynamodb_client, args.table, output, args.segments, progress)
+        finally:
+            if args.output:
+                output.close()
+    else:
+        source = open(args.input, encoding="UTF-8") if args.input else sys.stdin
+        try:
+            shard_config = (ShardConfig(args.shard_count) if args.shard_count is not None
+                            else ShardConfig.from_environ(environ))
+            items = import_items(dynamodb_client, args.table, source, args.workers, progress,
+                                 shard_config=shard_config)
+        finally:
+            if args.input:
+                source.close()
+    progress.report()
+    return items
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
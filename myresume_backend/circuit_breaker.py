@@ -0,0 +1,170 @@
+"""
+Circuit breaker around the DynamoDB calls.
+
+botocore already retries throttled calls (adaptive retry mode) within one
+request. When DynamoDB keeps throttling or timing out even so, every
+invocation would wait for all its retries and then fail. The breaker opens
+after failure_threshold consecutive throttles/timeouts, so that the next
+requests fail fast (and are answered with the last known count, marked
+stale) instead of piling up on DynamoDB. After reset_timeout_seconds one
+trial call is let through (half-open): its success closes the breaker,
+its failure opens it again.
+
+Like the other warm-environment state, the breaker is per execution
+environment.
+"""
+
+import threading
+import time
+from typing import Callable, Mapping, Optional
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Error codes of the DynamoDB responses counted as throttles
+THROTTLING_ERROR_CODES = {"ProvisionedThroughputExceededException", "ThrottlingException",
+                          "RequestLimitExceeded", "InternalServerError", "ServiceUnavailable"}
+
+
+class DependencyUnavailableError(RuntimeError):
+    """
+    Raised when a call was throttled or timed out, or was not made at all
+    because the breaker is open
+    """
+
+
+class CircuitOpenError(DependencyUnavailableError):
+    """
+    Raised instead of calling DynamoDB while the breaker is open
+    """
+
+
+def is_breaker_failure(error: Exception) -> bool:
+    """
+    Return True when the error is a throttle or a timeout, i.e. a sign that
+    DynamoDB is overloaded or unreachable (not a bad request).
+    """
+    from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError
+    from botocore.exceptions import ReadTimeoutError
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+    return isinstance(error, (BotocoreConnectionError, ReadTimeoutError))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a half-open trial call
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout_seconds: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 on_state_change: Optional[Callable[[str, str], None]] = None):
+        """
+        Initialize a closed breaker. on_state_change(old, new) is called on
+        every transition.
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._on_state_change = on_state_change
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.open_count = 0
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> Optional["CircuitBreaker"]:
+        """
+        Build the breaker from the Lambda environment variables, or return
+        None when DYNAMODB_BREAKER_FAILURE_THRESHOLD is not set (breaker disabled).
+        """
+        failure_threshold = int(environ.get("DYNAMODB_BREAKER_FAILURE_THRESHOLD", "0"))
+        if failure_threshold <= 0:
+            return None
+        return cls(failure_threshold=failure_threshold,
+                   reset_timeout_seconds=float(environ.get("DYNAMODB_BREAKER_RESET_SECONDS", "10")),
+                   on_state_change=lambda old, new: print(f"circuit breaker: {old} -> {new}"))
+
+    @property
+    def state(self) -> str:
+        """
+        The current state: "closed", "open" or "half_open"
+        """
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def _transition(self, new_state: str) -> None:
+        """
+        Change state (lock held) and report the transition.
+        """
+        old_state, self._state = self._state, new_state
+        if new_state == OPEN:
+            self._opened_at = self._clock()
+            self.open_count += 1
+        if old_state != new_state and self._on_state_change is not None:
+            self._on_state_change(old_state, new_state)
+
+    def allow(self) -> bool:
+        """
+        Return True when a call may go to DynamoDB. Once the reset timeout
+        passed, only one trial call is allowed until its outcome is recorded.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout_seconds:
+                    return False
+                self._transition(HALF_OPEN)
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """
+        Record a call answered by DynamoDB.
+        """
+        with self._lock:
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """
+        Record a throttled or timed out call.
+        """
+        with self._lock:
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or (self._state == CLOSED
+                                            and self._consecutive_failures >= self.failure_threshold):
+                self._transition(OPEN)
+
+    def call(self, function: Callable, *args, **kwargs):
+        """
+        Call function through the breaker: raise CircuitOpenError while open,
+        and record the outcome. Throttles and timeouts are raised as
+        DependencyUnavailableError. Other errors (e.g. an unknown page-id)
+        mean DynamoDB answered: they count as success and are raised as is.
+        """
+        if not self.allow():
+            raise CircuitOpenError("DynamoDB circuit breaker is open")
+        try:
+            result = function(*args, **kwargs)
+        except Exception as call_error:
+            if not is_breaker_failure(call_error):
+                self.record_success()
+                raise
+            self.record_failure()
+            raise DependencyUnavailableError(str(call_error)) from call_error
+        self.record_success()
+        return result
@@ -0,0 +1,190 @@
+"""
+Suppression of the repeated hits of a visitor on a page (refreshes).
+
+A hit of a visitor (hash of source IP + user-agent) on a page is only
+counted once per dedupe window. Two checks are chained:
+ - a bounded bloom filter in the warm execution environment rejects the
+   repeats this environment has already seen, without any DynamoDB call;
+ - a conditional put of a short-lived dedupe item ("#visit#<page-id>#<hash>",
+   with an "expires_at" TTL attribute) claims the hit, which is the
+   authoritative check across execution environments.
+
+The claim is taken before the increment, so that concurrent hits of a
+visitor are counted once, and released when the increment fails (unknown
+page, DynamoDB unavailable): the retry of the visitor is then counted, and
+no dedupe item is left behind. Only counted hits enter the bloom filter.
+The "#" prefix keeps the dedupe items apart from the pages, whose page-ids
+cannot contain "#".
+
+The bloom filter is rotated (current + previous generation, each covering
+half the window), so a visitor is never suppressed longer than the window.
+Its false positives (error_rate) suppress a few first hits; the dedupe
+items never do.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from typing import Callable, Mapping, Optional
+
+
+DEDUPE_KEY_PREFIX = "#visit#"
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter of strings
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Initialize an empty filter sized for capacity keys at error_rate.
+        """
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be at least 1 and error_rate between 0 and 1")
+        self.capacity = capacity
+        self.bit_count = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self._bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        """
+        Return the bit positions of the key (double hashing).
+        """
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first_hash, second_hash = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return [(first_hash + index * second_hash) % self.bit_count for index in range(self.hash_count)]
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def add(self, key: str) -> None:
+        """
+        Add a key to the filter.
+        """
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+
+class VisitDeduplicator:
+    """
+    Dedupe window of the visitor hits, per visitor and page
+    """
+    def __init__(self, window_seconds: float, bloom_capacity: int = 10000,
+                 bloom_error_rate: float = 0.01, table_name: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize the deduplicator. The dedupe items are written to
+        table_name, or to the visitor count table when not given.
+        """
+        self.window_seconds = window_seconds
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.table_name = table_name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._current = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._previous = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._generation_start = clock()
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> Optional["VisitDeduplicator"]:
+        """
+        Build the deduplicator from the Lambda environment variables, or
+        return None when VISIT_DEDUPE_WINDOW_SECONDS is not set (every hit counts).
+        """
+        window_seconds = float(environ.get("VISIT_DEDUPE_WINDOW_SECONDS", "0"))
+        if window_seconds <= 0:
+            return None
+        return cls(window_seconds=window_seconds,
+                   bloom_capacity=int(environ.get("VISIT_DEDUPE_BLOOM_CAPACITY", "10000")),
+                   table_name=environ.get("VISIT_DEDUPE_TABLE_NAME") or None)
+
+    def _rotate(self) -> None:
+        """
+        Start a new bloom generation (lock held) when half the window passed
+        or the current generation is full.
+        """
+        now = self._clock()
+        if now - self._generation_start >= self.window_seconds / 2 or self._current.count >= self.bloom_capacity:
+            self._previous, self._current = self._current, BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+            self._generation_start = now
+
+    def seen_recently(self, key: str) -> bool:
+        """
+        Return True when this environment saw the key within the window
+        (or on a bloom false positive).
+        """
+        with self._lock:
+            self._rotate()
+            return key in self._current or key in self._previous
+
+    def remember(self, key: str) -> None:
+        """
+        Add the key to the current bloom generation.
+        """
+        with self._lock:
+            self._rotate()
+            self._current.add(key)
+
+    def claim_visit(self, dynamodb_client, table_name: str, key: str) -> Optional[int]:
+        """
+        Put the dedupe item of the key unless an unexpired one exists. Return
+        the expiry time of the new item, or None when the window of the key
+        is already claimed. The condition also checks "expires_at", since
+        DynamoDB TTL deletes expired items late.
+        """
+        now = int(self._clock())
+        expires_at = now + int(self.window_seconds)
+        try:
+            dynamodb_client.put_item(TableName=table_name,
+                                     Item={"pkey_uuid": {"S": key},
+                                           "expires_at": {"N": str(expires_at)}},
+                                     ConditionExpression="attribute_not_exists(pkey_uuid) OR expires_at <= :now",
+                                     ExpressionAttributeValues={":now": {"N": str(now)}})
+        except dynamodb_client.exceptions.ConditionalCheckFailedException:
+            return None
+        return expires_at
+
+    def claim(self, dynamodb_client, table_name: str, page_id: str, visitor_hash: int) -> Optional[int]:
+        """
+        Claim the hit of the visitor on the page before it is counted. Return
+        the expiry time of the claim, or None when the visitor already hit the
+        page within the window (the hit must not be counted).
+        """
+        key = dedupe_key(page_id, visitor_hash)
+        if self.seen_recently(key):
+            return None
+        return self.claim_visit(dynamodb_client, self.table_name or table_name, key)
+
+    def confirm(self, page_id: str, visitor_hash: int) -> None:
+        """
+        Remember a claimed hit once it is counted. Only the hits claimed here
+        enter the bloom filter, which must not keep a visitor longer than
+        the window started by the dedupe item.
+        """
+        self.remember(dedupe_key(page_id, visitor_hash))
+
+    def release(self, dynamodb_client, table_name: str, page_id: str, visitor_hash: int,
+                expires_at: int) -> None:
+        """
+        Delete the dedupe item of a claimed hit which could not be counted, on
+        condition that it is still this claim (same expiry time).
+        """
+        try:
+            dynamodb_client.delete_item(TableName=self.table_name or table_name,
+                                        Key={"pkey_uuid": {"S": dedupe_key(page_id, visitor_hash)}},
+                                        ConditionExpression="expires_at = :expiresAt",
+                                        ExpressionAttributeValues={":expiresAt": {"N": str(expires_at)}})
+        except dynamodb_client.exceptions.ConditionalCheckFailedException:
+            # the claim expired and another hit claimed the window meanwhile
+            pass
+
+
+def dedupe_key(page_id: str, visitor_hash: int) -> str:
+    """
+    Return the "pkey_uuid" of the dedupe item of a visitor on a page.
+    """
+    return f"{DEDUPE_KEY_PREFIX}{page_id}#{visitor_hash:016x}"
@@ -0,0 +1,140 @@
+"""
+Time-bucketed visit history of the pages, with daily and monthly rollups.
+
+Every increment of a page is also added to the hour, day and month buckets
+of that page in a separate history table (partition key "pkey_uuid" =
+"<page-id>#<granularity>", sort key "bucket" = the UTC bucket start, e.g.
+"2026-10-16T13", "2026-10-16" or "2026-10"). The three buckets are updated
+in one TransactWriteItems, so the rollups always agree with the hours.
+
+A range of buckets is read with one paginated Query on a single partition:
+long ranges are read from the day or month rollups instead of adding up
+hundreds of hourly items.
+"""
+
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+# strftime format of the bucket sort key of each granularity
+GRANULARITY_FORMATS = {"hour": "%Y-%m-%dT%H",
+                       "day": "%Y-%m-%d",
+                       "month": "%Y-%m"}
+
+# Sorts after every character used in a bucket, so that "to" bounds
+# coarser than the granularity (e.g. a month) include their finer buckets
+_BUCKET_RANGE_END = "~"
+
+DEFAULT_QUERY_LIMIT = 100
+MAX_QUERY_LIMIT = 1000
+
+
+class VisitHistoryConfig:
+    """
+    History table and retention of the hourly buckets
+    """
+    def __init__(self, table_name: str, hourly_retention_days: int = 0):
+        """
+        Initialize the history configuration. With hourly_retention_days above
+        0, the hourly buckets get an "expires_at" attribute for DynamoDB TTL
+        (the day and month rollups are kept).
+        """
+        self.table_name = table_name
+        self.hourly_retention_days = hourly_retention_days
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> Optional["VisitHistoryConfig"]:
+        """
+        Build the configuration from the Lambda environment variables, or
+        return None when VISIT_HISTORY_TABLE_NAME is not set (history disabled).
+        """
+        table_name = environ.get("VISIT_HISTORY_TABLE_NAME", "")
+        if not table_name:
+            return None
+        return cls(table_name=table_name,
+                   hourly_retention_days=int(environ.get("VISIT_HISTORY_HOURLY_RETENTION_DAYS", "0")))
+
+
+def history_partition_key(page_id: str, granularity: str) -> str:
+    """
+    Return the "pkey_uuid" of the history partition of a page and granularity.
+    """
+    return f"{page_id}#{granularity}"
+
+
+def history_bucket(timestamp: float, granularity: str) -> str:
+    """
+    Return the UTC bucket (sort key) of the given granularity holding timestamp.
+    """
+    return time.strftime(GRANULARITY_FORMATS[granularity], time.gmtime(timestamp))
+
+
+def record_visit_history(dynamodb_client, config: VisitHistoryConfig, page_id: str,
+                         delta: int, timestamp: Optional[float] = None) -> None:
+    """
+    Add delta to the hour, day and month buckets of the page in one
+    TransactWriteItems of the low-level dynamodb_client (typed attribute
+    values, unlike resource.meta.client). The buckets are created on their
+    first increment.
+    """
+    timestamp = time.time() if timestamp is None else timestamp
+    transact_items = []
+    for granularity in GRANULARITY_FORMATS:
+        update_expression = "ADD #updateAttr1 :val"
+        expression_names = {"#updateAttr1": "visit_count"}
+        expression_values = {":val": {"N": str(delta)}}
+        if granularity == "hour" and config.hourly_retention_days > 0:
+            expires_at = int(timestamp) + config.hourly_retention_days * 86400
+            update_expression += " SET #expiresAt = :expiresAt"
+            expression_names["#expiresAt"] = "expires_at"
+            expression_values[":expiresAt"] = {"N": str(expires_at)}
+        transact_items.append({"Update": {
+            "TableName": config.table_name,
+            "Key": {"pkey_uuid": {"S": history_partition_key(page_id, granularity)},
+                    "bucket": {"S": history_bucket(timestamp, granularity)}},
+            "UpdateExpression": update_expression,
+            "ExpressionAttributeNames": expression_names,
+            "ExpressionAttributeValues": expression_values}})
+    dynamodb_client.transact_write_items(TransactItems=transact_items)
+
+
+def query_visit_history(history_table, page_id: str, granularity: str,
+                        start: Optional[str] = None, end: Optional[str] = None,
+                        limit: int = DEFAULT_QUERY_LIMIT,
+                        next_token: Optional[str] = None) -> Tuple[List[Dict[str, object]], Optional[str]]:
+    """
+    Query one page of the buckets of the page between start and end
+    (inclusive, "YYYY-MM[-DD[THH]]" in UTC, both optional), oldest first.
+    Return the buckets and the token of the next page, or None on the last page.
+    """
+    if granularity not in GRANULARITY_FORMATS:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITY_FORMATS)}")
+    if not 1 <= limit <= MAX_QUERY_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_QUERY_LIMIT}")
+
+    partition_key = history_partition_key(page_id, granularity)
+    # A start bound finer than the granularity is truncated, so that it does
+    # not skip the bucket containing it
+    bucket_length = len(history_bucket(0, granularity))
+    lower = (start or "")[:bucket_length]
+    upper = (end or "") + _BUCKET_RANGE_END
+
+    key_condition = "#pkey = :pkey"
+    expression_values: Dict[str, str] = {":pkey": partition_key}
+    if start or end:
+        key_condition += " AND #bucket BETWEEN :lower AND :upper"
+        expression_values.update({":lower": lower or "0", ":upper": upper})
+    query_parameters = {"KeyConditionExpression": key_condition,
+                        "ExpressionAttributeNames": {"#pkey": "pkey_uuid", "#bucket": "bucket",
+                                                     "#visitCount": "visit_count"},
+                        "ExpressionAttributeValues": expression_values,
+                        "ProjectionExpression": "#bucket, #visitCount",
+                        "Limit": limit}
+    if next_token:
+        query_parameters["ExclusiveStartKey"] = {"pkey_uuid": partition_key, "bucket": next_token}
+
+    dbResponse = history_table.query(**query_parameters)
+    buckets = [{"bucket": item["bucket"], "visit_count": int(item.get("visit_count", 0))}
+               for item in dbResponse.get("Items", [])]
+    last_evaluated_key = dbResponse.get("LastEvaluatedKey")
+    return buckets, last_evaluated_key["bucket"] if last_evaluated_key else None
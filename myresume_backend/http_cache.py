@@ -0,0 +1,72 @@
+"""
+HTTP caching of the visitor count responses.
+
+getVisitorCount responses carry a Cache-Control header (max-age and
+stale-while-revalidate), so that CloudFront/API Gateway caches and browsers
+answer most reads, and an ETag derived from the count, so that revalidation
+requests (If-None-Match) are answered with a 304 and no body.
+"""
+
+from typing import Dict, Mapping, Optional
+
+
+class HttpCacheConfig:
+    """
+    Cache-Control lifetimes of the visitor count responses
+    """
+    def __init__(self, max_age_seconds: int, stale_while_revalidate_seconds: int = 0):
+        """
+        Initialize the configuration
+        """
+        self.max_age_seconds = max_age_seconds
+        self.stale_while_revalidate_seconds = stale_while_revalidate_seconds
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> Optional["HttpCacheConfig"]:
+        """
+        Build the configuration from the Lambda environment variables, or
+        return None when VISIT_COUNT_HTTP_MAX_AGE_SECONDS is not set (no
+        caching headers).
+        """
+        max_age_seconds = int(environ.get("VISIT_COUNT_HTTP_MAX_AGE_SECONDS", "0"))
+        if max_age_seconds <= 0:
+            return None
+        return cls(max_age_seconds=max_age_seconds,
+                   stale_while_revalidate_seconds=int(
+                       environ.get("VISIT_COUNT_HTTP_STALE_WHILE_REVALIDATE_SECONDS", "0")))
+
+    def cache_control(self) -> str:
+        """
+        Return the Cache-Control header value.
+        """
+        cache_control = f"public, max-age={self.max_age_seconds}"
+        if self.stale_while_revalidate_seconds > 0:
+            cache_control += f", stale-while-revalidate={self.stale_while_revalidate_seconds}"
+        return cache_control
+
+    def headers(self, visit_count: int) -> Dict[str, str]:
+        """
+        Return the caching headers of a response carrying visit_count.
+        """
+        return {"Cache-Control": self.cache_control(), "ETag": visit_count_etag(visit_count)}
+
+
+def visit_count_etag(visit_count: int) -> str:
+    """
+    Return the (strong) ETag of a visit count.
+    """
+    return f'"{visit_count}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Return True when the If-None-Match header value lists etag (weak
+    comparison, as required for If-None-Match) or is "*".
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
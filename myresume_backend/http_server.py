@@ -0,0 +1,379 @@
+"""
+Standalone asyncio HTTP server running the counter outside Lambda.
+
+The server maps "GET /counts/{page-id}?func=..." and "GET /counts?ids=..."
+onto API Gateway v2 events and answers them with lambda_handler, so a
+container (load tests, self-hosted deployment) runs exactly the Lambda route
+logic. The event loop only parses and writes HTTP; the handler, which blocks
+on DynamoDB, runs in a bounded thread pool. Requests beyond max_pending are
+rejected with a 503 instead of queueing without bound.
+
+GET /metrics returns the request counters in the Prometheus text format and
+GET /healthz returns 200 until shutdown starts. On SIGTERM/SIGINT the server
+stops accepting connections, finishes the requests in flight (up to
+shutdown_timeout_seconds), then flushes the buffered increments and metrics.
+
+Usage: python myresume_backend/http_server.py [--host 0.0.0.0] [--port 8080] [--workers 16]
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from os import environ
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl, unquote
+
+
+# Most headers accepted in one request
+MAX_REQUEST_HEADERS = 100
+
+class BadRequestError(ValueError):
+    """
+    Raised when the request line or headers cannot be parsed
+    """
+
+
+# Upper bounds (seconds) of the latency histogram of /metrics
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def api_gateway_event(method: str, target: str, headers: Mapping[str, str], source_ip: str) -> dict:
+    """
+    Return the API Gateway v2 (HTTP API) event of a request. Paths which
+    match no route keep their raw path as route key, so lambda_handler
+    answers them with a 404 as for API Gateway. Like API Gateway, the source
+    IP is appended to x-forwarded-for.
+    """
+    rawPath, _, rawQueryString = target.partition("?")
+    pathSegments = [unquote(segment) for segment in rawPath.strip("/").split("/")]
+    eventHeaders = dict(headers)
+    forwardedFor = eventHeaders.get("x-forwarded-for")
+    eventHeaders["x-forwarded-for"] = f"{forwardedFor}, {source_ip}" if forwardedFor else source_ip
+    event = {"version": "2.0",
+             "rawPath": rawPath,
+             "rawQueryString": rawQueryString,
+             "headers": eventHeaders,
+             "requestContext": {"http": {"method": method,
+                                         "path": rawPath,
+                                         "protocol": "HTTP/1.1",
+                                         "sourceIp": source_ip,
+                                         "userAgent": headers.get("user-agent", "")}},
+             "isBase64Encoded": False}
+    if pathSegments == ["counts"]:
+        event["routeKey"] = f"{method} /counts"
+    elif len(pathSegments) == 2 and pathSegments[0] == "counts" and pathSegments[1]:
+        event["routeKey"] = f"{method} /counts/{{page-id}}"
+        event["pathParameters"] = {"page-id": pathSegments[1]}
+    else:
+        event["routeKey"] = f"{method} {rawPath}"
+
+    # API Gateway joins repeated query parameters with commas and omits the
+    # field when the query string is empty
+    queryStringParameters: Dict[str, str] = {}
+    for name, value in parse_qsl(rawQueryString, keep_blank_values=True):
+        queryStringParameters[name] = (queryStringParameters[name] + "," + value
+                                       if name in queryStringParameters else value)
+    if queryStringParameters:
+        event["queryStringParameters"] = queryStringParameters
+    return event
+
+
+class ServerMetrics:
+    """
+    Request counters and latency histogram of the server, by route and status
+    """
+    def __init__(self):
+        """
+        Initialize the counters. They are only updated from the event loop.
+        """
+        self.requests: Dict[Tuple[str, int], int] = {}
+        self.latency_bucket_counts: Dict[str, List[int]] = {}
+        self.latency_sums: Dict[str, float] = {}
+        self.rejected = 0
+
+    def record(self, route: str, status_code: int, latency_seconds: float) -> None:
+        """
+        Record a request answered by the handler.
+        """
+        self.requests[(route, status_code)] = self.requests.get((route, status_code), 0) + 1
+        bucket_counts = self.latency_bucket_counts.setdefault(route, [0] * (len(LATENCY_BUCKETS) + 1))
+        for index, upper_bound in enumerate(LATENCY_BUCKETS):
+            if latency_seconds <= upper_bound:
+                bucket_counts[index] += 1
+        bucket_counts[-1] += 1
+        self.latency_sums[route] = self.latency_sums.get(route, 0.0) + latency_seconds
+
+    def render(self, in_flight: int, gauges: Mapping[str, float]) -> str:
+        """
+        Return the metrics in the Prometheus text exposition format.
+        """
+        lines = ["# TYPE counter_http_requests_total counter"]
+        for (route, status_code), count in sorted(self.requests.items()):
+            lines.append(f'counter_http_requests_total{{route="{route}",status="{status_code}"}} {count}')
+        lines.append("# TYPE counter_http_request_duration_seconds histogram")
+        for route, bucket_counts in sorted(self.latency_bucket_counts.items()):
+            for upper_bound, count in zip(LATENCY_BUCKETS, bucket_counts):
+                lines.append(f'counter_http_request_duration_seconds_bucket{{route="{route}",le="{upper_bound}"}} {count}')
+            lines.append(f'counter_http_request_duration_seconds_bucket{{route="{route}",le="+Inf"}} {bucket_counts[-1]}')
+            lines.append(f'counter_http_request_duration_seconds_sum{{route="{route}"}} {self.latency_sums[route]:.6f}')
+            lines.append(f'counter_http_request_duration_seconds_count{{route="{route}"}} {bucket_counts[-1]}')
+        lines.append("# TYPE counter_http_requests_rejected_total counter")
+        lines.append(f"counter_http_requests_rejected_total {self.rejected}")
+        lines.append("# TYPE counter_http_requests_in_flight gauge")
+        lines.append(f"counter_http_requests_in_flight {in_flight}")
+        for name, value in sorted(gauges.items()):
+            lines.append(f"# TYPE counter_{name} gauge")
+            lines.append(f"counter_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class CounterHttpServer:
+    """
+    asyncio HTTP/1.1 server calling the Lambda handler in a thread pool
+    """
+    def __init__(self, handler: Callable[[dict, object], dict],
+                 host: str = "0.0.0.0", port: int = 8080, max_workers: int = 16,
+                 max_pending: int = 1000, shutdown_timeout_seconds: float = 10.0,
+                 keep_alive_timeout_seconds: float = 5.0,
+                 route_name: Callable[[dict], str] = lambda event: event["routeKey"],
+                 gauges: Callable[[], Mapping[str, float]] = dict,
+                 on_shutdown: Optional[Callable[[], None]] = None):
+        """
+        Initialize the server. handler(event, context) is lambda_handler;
+        route_name(event) gives the route label of the metrics, gauges()
+        extra gauges of /metrics, and on_shutdown() is called once the
+        requests in flight are finished.
+        """
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.shutdown_timeout_seconds = shutdown_timeout_seconds
+        self.keep_alive_timeout_seconds = keep_alive_timeout_seconds
+        self.route_name = route_name
+        self.gauges = gauges
+        self.on_shutdown = on_shutdown
+        self.metrics = ServerMetrics()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: set = set()
+        self._in_flight = 0
+        self._drained: Optional[asyncio.Event] = None
+        self._closing = False
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str], handler: Callable[[dict, object], dict],
+                     **kwargs) -> "CounterHttpServer":
+        """
+        Build the server from the environment variables (HTTP_SERVER_HOST,
+        HTTP_SERVER_PORT, HTTP_SERVER_WORKERS, HTTP_SERVER_MAX_PENDING and
+        HTTP_SERVER_SHUTDOWN_TIMEOUT_SECONDS).
+        """
+        return cls(handler,
+                   host=environ.get("HTTP_SERVER_HOST", "0.0.0.0"),
+                   port=int(environ.get("HTTP_SERVER_PORT", "8080")),
+                   max_workers=int(environ.get("HTTP_SERVER_WORKERS", "16")),
+                   max_pending=int(environ.get("HTTP_SERVER_MAX_PENDING", "1000")),
+                   shutdown_timeout_seconds=float(environ.get("HTTP_SERVER_SHUTDOWN_TIMEOUT_SECONDS", "10")),
+                   **kwargs)
+
+    async def start(self) -> None:
+        """
+        Start accepting connections. With port 0, self.port is set to the
+        port chosen by the system.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="counter-handler")
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """
+        Start the server and serve until SIGTERM or SIGINT, then shut down.
+        """
+        await self.start()
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
+        print(f"counter HTTP server listening on {self.host}:{self.port}")
+        await stop.wait()
+        await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """
+        Stop accepting connections, wait for the requests in flight (at most
+        shutdown_timeout_seconds), close the remaining connections and call
+        on_shutdown.
+        """
+        self._closing = True
+        self._server.close()
+        try:
+            await asyncio.wait_for(self._drained.wait(), self.shutdown_timeout_seconds)
+        except asyncio.TimeoutError:
+            print(f"ERROR: {self._in_flight} requests still in flight at shutdown")
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        # the handler threads may still run after a timeout: wait for them
+        # before flushing what they buffered
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        if self.on_shutdown is not None:
+            self.on_shutdown()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve the requests of one (keep-alive) connection.
+        """
+        self._writers.add(writer)
+        peer = writer.get_extra_info("peername")
+        source_ip = peer[0] if peer else ""
+        try:
+            while not self._closing:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, version, headers = request
+                status_code, response_headers, body = await self._respond(method, target, headers, source_ip)
+                keep_alive = (not self._closing and version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                self._write_response(writer, status_code, response_headers, body, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except BadRequestError as request_error:
+            self._write_response(writer, 400, {}, "Bad Request: " + str(request_error), keep_alive=False)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """
+        Read the request line and headers (and skip the body). Return None
+        when the connection is closed or idle longer than the keep-alive
+        timeout, and raise BadRequestError when the request cannot be parsed.
+        """
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), self.keep_alive_timeout_seconds)
+        except asyncio.TimeoutError:
+            return None
+        if not request_line.strip():
+            return None
+        request_parts = request_line.decode("latin-1").split()
+        if len(request_parts) != 3 or not request_parts[2].startswith("HTTP/"):
+            raise BadRequestError("malformed request line")
+        method, target, version = request_parts
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_REQUEST_HEADERS + 1):
+            header_line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+            if not header_line:
+                break
+            name, separator, value = header_line.partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if not separator or not name:
+                raise BadRequestError("malformed header line")
+            headers[name] = headers[name] + "," + value if name in headers else value
+        else:
+            raise BadRequestError("too many request headers")
+        try:
+            content_length = int(headers.get("content-length", "0") or "0")
+        except ValueError:
+            raise BadRequestError("malformed content-length") from None
+        if content_length < 0:
+            raise BadRequestError("malformed content-length")
+        if content_length:
+            await reader.readexactly(content_length)
+        return method, target, version, headers
+
+    async def _respond(self, method: str, target: str, headers: Mapping[str, str],
+                       source_ip: str) -> Tuple[int, Dict[str, str], str]:
+        """
+        Return the status code, headers and body answering the request.
+        """
+        path = target.partition("?")[0]
+        if path == "/metrics":
+            return (200, {"Content-Type": "text/plain; version=0.0.4"},
+                    self.metrics.render(self._in_flight, self.gauges()))
+        if path == "/healthz":
+            return (503, {}, "shutting down") if self._closing else (200, {}, "ok")
+        if self._in_flight >= self.max_pending:
+            self.metrics.rejected += 1
+            return 503, {"Retry-After": "1"}, "Service Unavailable: too many pending requests"
+
+        event = api_gateway_event(method, target, headers, source_ip)
+        self._in_flight += 1
+        self._drained.clear()
+        start = time.perf_counter()
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(self._executor, self.handler, event, None)
+        except Exception as handler_error:
+            print(f"ERROR: unhandled error of {target}: {handler_error!r}")
+            response = {"statusCode": 500, "body": "Internal Server Error"}
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._drained.set()
+        status_code = int(response.get("statusCode", 500))
+        self.metrics.record(self.route_name(event), status_code, time.perf_counter() - start)
+        return status_code, dict(response.get("headers") or {}), str(response.get("body", ""))
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status_code: int, headers: Dict[str, str],
+                        body: str, keep_alive: bool) -> None:
+        """
+        Write the status line, headers and body of a response.
+        """
+        # 204 and 304 responses have no body
+        payload = b"" if status_code in (204, 304) else body.encode("utf-8")
+        try:
+            reason = HTTPStatus(status_code).phrase
+        except ValueError:
+            reason = ""
+        headers.setdefault("Content-Type", "text/plain; charset=utf-8")
+        headers["Content-Length"] = str(len(payload))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        head = f"HTTP/1.1 {status_code} {reason}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + payload)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", help="listening address (HTTP_SERVER_HOST, default 0.0.0.0)")
+    parser.add_argument("--port", type=int, help="listening port (HTTP_SERVER_PORT, default 8080)")
+    parser.add_argument("--workers", type=int, help="handler threads (HTTP_SERVER_WORKERS, default 16)")
+    args = parser.parse_args(argv)
+
+    import lambda_function  # pylint: disable=import-outside-toplevel
+
+    def gauges() -> Dict[str, float]:
+        values = {}
+        if lambda_function._DYNAMODB_CIRCUIT_BREAKER is not None:  # pylint: disable=protected-access
+            values["dynamodb_circuit_breaker_open"] = int(
+                lambda_function._DYNAMODB_CIRCUIT_BREAKER.state != lambda_function.CLOSED)  # pylint: disable=protected-access
+        if lambda_function._VISIT_COUNT_WRITE_BUFFER is not None:  # pylint: disable=protected-access
+            values["write_buffer_pending"] = lambda_function._VISIT_COUNT_WRITE_BUFFER.pending_count()  # pylint: disable=protected-access
+        return values
+
+    server = CounterHttpServer.from_environ(environ, lambda_function.lambda_handler,
+                                            route_name=lambda_function.metric_route_name,
+                                            gauges=gauges,
+                                            # flush the buffered increments and metrics
+                                            on_shutdown=lambda_function._flush_on_shutdown)  # pylint: disable=protected-access
+    server.host = args.host or server.host
+    server.port = args.port if args.port is not None else server.port
+    server.max_workers = args.workers or server.max_workers
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,198 @@
+"""
+Asynchronous increment pipeline: producer queues and the batch aggregation
+of the consumer.
+
+In queued mode, addOneVisitorCount does not wait on DynamoDB: it sends an
+increment message ({"pageId": ..., "delta": ...}) to a queue and returns at
+once. The consumer entry point of lambda_function receives the messages in
+batches (SQS, or a Kinesis stream), collapses them into one delta per page
+and applies each delta with a single update, reporting the messages of the
+pages which could not be updated as partial batch failures.
+
+A Kinesis shard is redelivered from the first failed record onwards, so its
+records are applied in order instead: only consecutive increments of the
+same page are merged, and the consumer stops at the first failure.
+
+LocalIncrementQueue is an in-memory stand-in for SQS, so the whole pipeline
+can run offline (tests, benchmarks, local server).
+"""
+
+import base64
+import json
+import threading
+import uuid
+from collections import deque
+from typing import Callable, Dict, List, Mapping, Tuple
+
+
+LOCAL_QUEUE_URL = "local://"
+
+
+class IncrementQueueError(RuntimeError):
+    """
+    Raised when an increment could not be queued
+    """
+
+
+def increment_message_body(page_id: str, delta: int = 1) -> str:
+    """
+    Return the body of an increment message.
+    """
+    return json.dumps({"pageId": page_id, "delta": delta})
+
+
+class SqsIncrementQueue:
+    """
+    Producer side of the pipeline on an SQS queue
+    """
+    def __init__(self, queue_url: str, client_factory: Callable[[], object]):
+        """
+        Initialize the producer. The SQS client is only created by
+        client_factory on the first send, like the DynamoDB resource.
+        """
+        self.queue_url = queue_url
+        self._client_factory = client_factory
+        self._client = None
+
+    @property
+    def client(self):
+        """
+        The SQS client, created once per execution environment
+        """
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def send(self, page_id: str, delta: int = 1) -> None:
+        """
+        Queue an increment of the page, or raise IncrementQueueError.
+        """
+        try:
+            self.client.send_message(QueueUrl=self.queue_url,
+                                     MessageBody=increment_message_body(page_id, delta))
+        except Exception as send_error:
+            raise IncrementQueueError("increment not queued: " + str(send_error)) from send_error
+
+
+class LocalIncrementQueue:
+    """
+    In-memory stand-in for the SQS queue and the Lambda event source mapping
+    """
+    def __init__(self):
+        """
+        Initialize an empty queue
+        """
+        self._lock = threading.Lock()
+        self._messages: "deque[dict]" = deque()
+
+    def send(self, page_id: str, delta: int = 1) -> None:
+        """
+        Queue an increment of the page, as an SQS record.
+        """
+        with self._lock:
+            self._messages.append({"messageId": str(uuid.uuid4()),
+                                   "body": increment_message_body(page_id, delta),
+                                   "eventSource": "aws:sqs"})
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._messages)
+
+    def deliver(self, consumer: Callable[[dict, object], dict], batch_size: int = 10) -> int:
+        """
+        Invoke consumer with batches of the queued messages until the queue
+        is empty or a batch fails completely, the way the SQS event source
+        mapping does. Failed messages are queued again. Return the number of
+        messages consumed.
+        """
+        consumed = 0
+        while True:
+            with self._lock:
+                batch = [self._messages.popleft() for _ in range(min(batch_size, len(self._messages)))]
+            if not batch:
+                return consumed
+            response = consumer({"Records": batch}, None)
+            failed_ids = {failure["itemIdentifier"] for failure in response.get("batchItemFailures", [])}
+            with self._lock:
+                self._messages.extend(record for record in batch if record["messageId"] in failed_ids)
+            consumed += len(batch) - len(failed_ids)
+            if len(failed_ids) == len(batch):
+                return consumed
+
+
+def increment_queue_from_environ(environ: Mapping[str, str], sqs_client_factory: Callable[[], object]):
+    """
+    Build the producer queue from the Lambda environment variables, or return
+    None when VISIT_COUNT_QUEUE_URL is not set (synchronous increments).
+    "local://" selects the in-memory LocalIncrementQueue.
+    """
+    queue_url = environ.get("VISIT_COUNT_QUEUE_URL", "")
+    if not queue_url:
+        return None
+    if queue_url == LOCAL_QUEUE_URL:
+        return LocalIncrementQueue()
+    return SqsIncrementQueue(queue_url, sqs_client_factory)
+
+
+def _record_identifier_and_body(record: dict) -> Tuple[str, str]:
+    """
+    Return the batch item identifier and the message body of an SQS or
+    Kinesis record.
+    """
+    if "kinesis" in record:
+        return (record["kinesis"]["sequenceNumber"],
+                base64.b64decode(record["kinesis"]["data"]).decode("utf-8"))
+    return record["messageId"], record["body"]
+
+
+def aggregate_increment_records(records: List[dict]) -> Tuple[Dict[str, int], Dict[str, List[str]], List[str]]:
+    """
+    Collapse the increment records of a batch into one delta per page.
+    Return the deltas, the record identifiers of each page and the
+    identifiers of the records which are not valid increment messages.
+    """
+    deltas: Dict[str, int] = {}
+    identifiers: Dict[str, List[str]] = {}
+    invalid: List[str] = []
+    for record in records:
+        identifier, body = _record_identifier_and_body(record)
+        try:
+            message = json.loads(body)
+            page_id, delta = str(message["pageId"]), int(message.get("delta", 1))
+        except (ValueError, TypeError, KeyError):
+            invalid.append(identifier)
+            continue
+        deltas[page_id] = deltas.get(page_id, 0) + delta
+        identifiers.setdefault(page_id, []).append(identifier)
+    return deltas, identifiers, invalid
+
+
+def is_kinesis_batch(records: List[dict]) -> bool:
+    """
+    Return True when the records come from a Kinesis stream.
+    """
+    return bool(records) and "kinesis" in records[0]
+
+
+def ordered_increment_runs(records: List[dict]) -> Tuple[List[Tuple[str, int, str]], List[str]]:
+    """
+    Collapse the consecutive increment records of the same page, keeping the
+    order of the batch. Return the runs as (page-id, delta, identifier of
+    the first record) and the identifiers of the records which are not valid
+    increment messages (left out of the runs).
+    """
+    runs: List[Tuple[str, int, str]] = []
+    invalid: List[str] = []
+    for record in records:
+        identifier, body = _record_identifier_and_body(record)
+        try:
+            message = json.loads(body)
+            page_id, delta = str(message["pageId"]), int(message.get("delta", 1))
+        except (ValueError, TypeError, KeyError):
+            invalid.append(identifier)
+            continue
+        if runs and runs[-1][0] == page_id:
+            runs[-1] = (page_id, runs[-1][1] + delta, runs[-1][2])
+        else:
+            runs.append((page_id, delta, identifier))
+    return runs, invalid
@@ -1,24 +1,87 @@
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import signal
+import threading
+import time
 from os import environ
-from typing import Any, Dict
-from boto3 import resource
-import botocore.exceptions
-from aws_lambda_powertools.utilities.data_classes import APIGatewayProxyEvent
-from aws_lambda_powertools.utilities.typing import LambdaContext
-from aws_lambda_powertools.utilities.validation import validator
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+# boto3, botocore and fastjsonschema are heavy to import: they are imported
+# on first use (see _create_dynamodb_resource, _client_error_type and the
+# validation module) so that they stay off the cold-start path in lazy mode.
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.data_classes import APIGatewayProxyEvent
+    from aws_lambda_powertools.utilities.typing import LambdaContext
 
 
 # Reference: 
 # github: https://github.com/aws-samples/serverless-test-samples/blob/main/python-test-samples/lambda-mock/src/sample_lambda/app.py
 # AWS blog: https://aws.amazon.com/blogs/devops/unit-testing-aws-lambda-with-python-and-mock-aws-services/
 
-# Import the schema for the Lambda Powertools Validator
-from schemas import INPUT_SCHEMA, OUTPUT_SCHEMA
+# Import the precompiled validators of the schemas
+from validation import SchemaValidationError, validate_request, validate_response
+from validation import prewarm as prewarm_validation
+from sharding import ShardConfig, read_visit_count_shards, add_to_visit_count_shard, choose_shard, shard_keys
+from batch_counts import batch_get_visit_counts
+from write_buffer import VisitCountWriteBuffer
+from read_cache import VisitCountReadCache
+from metrics import EmfMetricsEmitter, current_invocation_metrics, start_invocation, end_invocation
+from metrics import register_dynamodb_hooks
+from history import VisitHistoryConfig, record_visit_history, query_visit_history, DEFAULT_QUERY_LIMIT
+from unique_visitors import UniqueVisitorConfig, visitor_hash, add_unique_visitor, estimate_unique_visitors
+from increment_queue import increment_queue_from_environ, aggregate_increment_records
+from increment_queue import is_kinesis_batch, ordered_increment_runs, IncrementQueueError
+from circuit_breaker import CircuitBreaker, DependencyUnavailableError, CLOSED
+from http_cache import HttpCacheConfig, etag_matches, visit_count_etag
+from dedupe import VisitDeduplicator
+from storage import VisitCountStore, visit_count_store_from_environ
+from top_pages import TopPagesIndex, rank_top_pages, DEFAULT_TOP_PAGES_LIMIT
 
 # Prepare globally scoped resources
 # Initialize the resources once per Lambda execution environment by using global scope.
 _AWS_REGION = 'ap-northeast-1'
-_LAMBDA_DYNAMODB_RESOURCE = { "resource" : resource('dynamodb', region_name=_AWS_REGION), 
-                              "table_name" : environ.get("DYNAMODB_TABLE_NAME","NONE") }
+# "eager": build the DynamoDB resource and the validator at import time (init phase).
+# "lazy": defer them until the first invocation that needs them.
+_LAMBDA_STARTUP_MODE = environ.get("LAMBDA_STARTUP_MODE", "eager")
+# The DynamoDB resource is None until it is created by _create_dynamodb_resource
+_LAMBDA_DYNAMODB_RESOURCE = { "resource" : None,
+                              "table_name" : environ.get("DYNAMODB_TABLE_NAME","NONE"),
+                              "shard_config" : ShardConfig.from_environ(environ),
+                              # "resource": boto3 Table API, "client": low-level client fast path
+                              "backend" : environ.get("DYNAMODB_BACKEND", "resource"),
+                              "client" : None,
+                              # hourly/daily/monthly visit history (None: history disabled)
+                              "history" : VisitHistoryConfig.from_environ(environ),
+                              # HyperLogLog unique-visitor sketches (None: estimation disabled)
+                              "unique_visitors" : UniqueVisitorConfig.from_environ(environ),
+                              # local memory/SQLite engine of the counts (None: DynamoDB table)
+                              "store" : visit_count_store_from_environ(environ),
+                              # materialized top-K index of the pages (None: getTopPages disabled)
+                              "top_pages" : TopPagesIndex.from_environ(environ) }
+# Serializes the creation of the resource and the client, which the threads of the
+# HTTP server may need at the same time
+_DYNAMODB_CREATE_LOCK = threading.Lock()
+# Increments buffered in the warm execution environment (None: buffering disabled)
+_VISIT_COUNT_WRITE_BUFFER = VisitCountWriteBuffer.from_environ(environ)
+# Queue of the asynchronous increments (None: increments are written synchronously)
+_VISIT_COUNT_INCREMENT_QUEUE = increment_queue_from_environ(environ, lambda: _create_sqs_client())
+# Circuit breaker of the DynamoDB calls (None: breaker disabled)
+_DYNAMODB_CIRCUIT_BREAKER = CircuitBreaker.from_environ(environ)
+# Visitor counts cached in the warm execution environment (None: caching disabled).
+# With the breaker, expired counts are kept as the stale fallback.
+_VISIT_COUNT_READ_CACHE = VisitCountReadCache.from_environ(environ,
+                                                           keep_stale=_DYNAMODB_CIRCUIT_BREAKER is not None)
+# Dedupe window of the repeated hits of a visitor (None: every hit counts)
+_VISIT_DEDUPE = VisitDeduplicator.from_environ(environ)
+# Cache-Control/ETag of the visitor count responses (None: no caching headers)
+_HTTP_CACHE_CONFIG = HttpCacheConfig.from_environ(environ)
+# EMF metrics of the sampled invocations (None: metrics disabled)
+_METRICS_EMITTER = EmfMetricsEmitter.from_environ(environ)
+# True until the first invocation of this execution environment
+_COLD_START = True
 
 # A custom class to catch error when 
 # the request from API Gateway cannot be handled
@@ -32,14 +95,242 @@ class LambdaDynamoDBClass:
     """
     def __init__(self, lambda_dynamodb_resource):
         """
-        Initialize a DynamoDB Resource
+        Initialize a DynamoDB Resource. The resource and the table are only
+        created when first used, so requests which never reach DynamoDB
+        (e.g. 404) do not pay for them.
         """
-        self.resource = lambda_dynamodb_resource["resource"]
+        self._lambda_dynamodb_resource = lambda_dynamodb_resource
+        self._table = None
         self.table_name = lambda_dynamodb_resource["table_name"]
-        self.table = self.resource.Table(self.table_name)
+        # sharded counter configuration, single-item mode when not given
+        self.shard_config = lambda_dynamodb_resource.get("shard_config", ShardConfig())
+        self.backend = lambda_dynamodb_resource.get("backend", "resource")
+        self.history = lambda_dynamodb_resource.get("history")
+        self.unique_visitors = lambda_dynamodb_resource.get("unique_visitors")
+        self._local_store = lambda_dynamodb_resource.get("store")
+        self._dynamodb_store = None
+        self.top_pages = lambda_dynamodb_resource.get("top_pages")
+        self._history_table = None
+
+    @property
+    def store(self) -> VisitCountStore:
+        """
+        The storage engine of the counts: the local store when configured,
+        else the DynamoDB table
+        """
+        if self._local_store is not None:
+            return self._local_store
+        if self._dynamodb_store is None:
+            self._dynamodb_store = DynamoDBVisitCountStore(self)
+        return self._dynamodb_store
+
+    @property
+    def resource(self):
+        """
+        The DynamoDB resource, created once per execution environment
+        """
+        if self._lambda_dynamodb_resource["resource"] is None:
+            with _DYNAMODB_CREATE_LOCK:
+                if self._lambda_dynamodb_resource["resource"] is None:
+                    self._lambda_dynamodb_resource["resource"] = _create_dynamodb_resource()
+        return self._lambda_dynamodb_resource["resource"]
+
+    @property
+    def table(self):
+        """
+        The DynamoDB table holding the visitor counts
+        """
+        if self._table is None:
+            self._table = self.resource.Table(self.table_name)
+        return self._table
+
+    @property
+    def history_table(self):
+        """
+        The DynamoDB table holding the visit history buckets
+        """
+        if self._history_table is None:
+            self._history_table = self.resource.Table(self.history.table_name)
+        return self._history_table
+
+    @property
+    def client(self):
+        """
+        The low-level DynamoDB client, created once per execution environment.
+        Unlike resource.meta.client, it returns the raw attribute values
+        without the resource layer's type deserialization.
+        """
+        if self._lambda_dynamodb_resource.get("client") is None:
+            with _DYNAMODB_CREATE_LOCK:
+                if self._lambda_dynamodb_resource.get("client") is None:
+                    self._lambda_dynamodb_resource["client"] = _create_dynamodb_client()
+        return self._lambda_dynamodb_resource["client"]
+
+    @property
+    def uses_client(self) -> bool:
+        """
+        True when some feature calls DynamoDB through the low-level client
+        """
+        # history, unique visitors and dedupe stay in DynamoDB whatever the store
+        if self.history is not None or self.unique_visitors is not None or _VISIT_DEDUPE is not None:
+            return True
+        return self._local_store is None and (self.backend == "client" or self.top_pages is not None)
+
+
+def _create_dynamodb_resource():
+    """
+    Import boto3 and create the DynamoDB resource. DYNAMODB_ENDPOINT_URL can
+    point it to a local DynamoDB (e.g. DynamoDB Local or a benchmark stub).
+    """
+    from boto3 import resource
+    dynamodb_resource = resource('dynamodb', region_name=_AWS_REGION,
+                                 endpoint_url=environ.get("DYNAMODB_ENDPOINT_URL") or None,
+                                 config=_dynamodb_client_config())
+    if _METRICS_EMITTER is not None:
+        register_dynamodb_hooks(dynamodb_resource.meta.client)
+    return dynamodb_resource
+
+
+def _dynamodb_client_config():
+    """
+    Return the botocore configuration of the DynamoDB clients: short
+    connect/read timeouts so that a throttled or unreachable DynamoDB fails
+    fast instead of hanging the invocation, TCP keep-alive on the pooled
+    connections kept by the warm environment, and adaptive retries, which
+    also rate-limit the client while it is being throttled.
+    """
+    from botocore.config import Config
+    return Config(connect_timeout=float(environ.get("DYNAMODB_CONNECT_TIMEOUT_SECONDS", "1")),
+                  read_timeout=float(environ.get("DYNAMODB_READ_TIMEOUT_SECONDS", "2")),
+                  tcp_keepalive=True,
+                  max_pool_connections=int(environ.get("DYNAMODB_MAX_POOL_CONNECTIONS", "10")),
+                  retries={"mode": environ.get("DYNAMODB_RETRY_MODE", "adaptive"),
+                           "max_attempts": int(environ.get("DYNAMODB_MAX_ATTEMPTS", "3"))})
+
+
+def _create_dynamodb_client():
+    """
+    Import boto3 and create the low-level DynamoDB client.
+    """
+    from boto3 import client
+    dynamodb_client = client('dynamodb', region_name=_AWS_REGION,
+                             endpoint_url=environ.get("DYNAMODB_ENDPOINT_URL") or None,
+                             config=_dynamodb_client_config())
+    if _METRICS_EMITTER is not None:
+        register_dynamodb_hooks(dynamodb_client)
+    return dynamodb_client
+
+
+def _create_sqs_client():
+    """
+    Import boto3 and create the SQS client of the increment queue.
+    SQS_ENDPOINT_URL can point it to a local SQS (e.g. ElasticMQ).
+    """
+    from boto3 import client
+    return client('sqs', region_name=_AWS_REGION,
+                  endpoint_url=environ.get("SQS_ENDPOINT_URL") or None)
+
+
+def _client_error_type() -> type:
+    """
+    Return botocore's ClientError. Only evaluated by the except clauses once
+    an exception was raised, i.e. after boto3 has been imported anyway.
+    """
+    from botocore.exceptions import ClientError
+    return ClientError
+
+
+def _validated(handler):
+    """
+    Validate the event schema and return schema with the precompiled
+    validators. An invalid event is answered with 400 instead of raising
+    out of the handler, an invalid response with 500.
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        metrics = current_invocation_metrics()
+        start = time.perf_counter()
+        try:
+            validate_request(event)
+        except SchemaValidationError as schema_error:
+            body = "Bad Request: " + str(schema_error)
+            status_code = 400
+            return {"statusCode": status_code, "body" : body }
+        finally:
+            if metrics is not None:
+                metrics.validation_ms += (time.perf_counter() - start) * 1000
+
+        response = handler(event, context)
+        start = time.perf_counter()
+        try:
+            validate_response(response)
+        except SchemaValidationError as schema_error:
+            body = "ERROR: invalid response: " + str(schema_error)
+            status_code = 500
+            print(body)
+            return {"statusCode": status_code, "body" : body }
+        finally:
+            if metrics is not None:
+                metrics.validation_ms += (time.perf_counter() - start) * 1000
+        return response
+
+    wrapper.prewarm = prewarm_validation
+    return wrapper
+
+
+# Route names used as metric dimension, keyed by (routeKey, func)
+_METRIC_ROUTE_NAMES = {('GET /counts/{page-id}', "getVisitorCount"): "getVisitorCount",
+                       ('GET /counts/{page-id}', "addOneVisitorCount"): "addOneVisitorCount",
+                       ('GET /counts/{page-id}', "getVisitorHistory"): "getVisitorHistory",
+                       ('GET /counts/{page-id}', "getUniqueVisitorCount"): "getUniqueVisitorCount",
+                       ('GET /counts', None): "getVisitorCounts",
+                       ('GET /counts', "getTopPages"): "getTopPages"}
+
+
+def metric_route_name(event: dict) -> str:
+    """
+    Return the route name of the event used as metric dimension, "unknown"
+    for the requests which match no route (so that arbitrary func values do
+    not create new dimensions).
+    """
+    queryStringParameters = event.get('queryStringParameters') or {}
+    return _METRIC_ROUTE_NAMES.get((event.get('routeKey'), queryStringParameters.get('func')), "unknown")
+
 
-# Validate the event schema and return schema using Lambda Power Tools
-@validator(inbound_schema=INPUT_SCHEMA, outbound_schema=OUTPUT_SCHEMA)
+def _instrumented(handler):
+    """
+    Record the cold-start flag, latency, route and status code of the sampled
+    invocations (plus the validation and DynamoDB measurements collected while
+    they run) and hand them to the EMF metrics emitter.
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        global _COLD_START
+        cold_start, _COLD_START = _COLD_START, False
+        metrics = _METRICS_EMITTER.sample(cold_start) if _METRICS_EMITTER is not None else None
+        if metrics is None:
+            return handler(event, context)
+
+        token = start_invocation(metrics)
+        start = time.perf_counter()
+        response = {"statusCode": 500}
+        try:
+            response = handler(event, context)
+            return response
+        finally:
+            end_invocation(token)
+            metrics.latency_ms = (time.perf_counter() - start) * 1000
+            metrics.status_code = response.get("statusCode", 500)
+            metrics.breaker_open = (_DYNAMODB_CIRCUIT_BREAKER is not None
+                                    and _DYNAMODB_CIRCUIT_BREAKER.state != CLOSED)
+            metrics.route = metric_route_name(event)
+            _METRICS_EMITTER.record(metrics)
+
+    return wrapper
+
+
+@_instrumented
+@_validated
 def lambda_handler(event: APIGatewayProxyEvent,context: LambdaContext) -> Dict[str, Any]:
     """
     Lambda Entry Point
@@ -51,20 +342,66 @@ def lambda_handler(event: APIGatewayProxyEvent,context: LambdaContext) -> Dict[s
         # parse event object from API Gateway
         routeKey = event.get('routeKey', '{}')
         functionName = event.get('queryStringParameters', {"func":"{}"}).get('func','{}')
-        pageId = event.get('pathParameters', '{}').get('page-id','{}')
+        pageId = (event.get('pathParameters') or {}).get('page-id','{}')
 
         # initialize the AWS DynamoDB resource
         dynamodb_resource_class = LambdaDynamoDBClass(_LAMBDA_DYNAMODB_RESOURCE)
 
         # execute the API depending on the function name
         if (routeKey == 'GET /counts/{page-id}') and (functionName == "getVisitorCount"):
-            return getVisitorsCount(dynamo_db=dynamodb_resource_class,
-                                    page_id=pageId)
+            # answer a revalidation from the cached count without reading the table
+            ifNoneMatch = (event.get('headers') or {}).get('if-none-match')
+            response = notModifiedVisitorsCount(page_id=pageId, if_none_match=ifNoneMatch)
+            if response is None:
+                response = getVisitorsCount(dynamo_db=dynamodb_resource_class,
+                                            page_id=pageId)
+                response = revalidatedVisitorsCount(response, if_none_match=ifNoneMatch)
         elif (routeKey == 'GET /counts/{page-id}') and (functionName == "addOneVisitorCount"):
-            return addOneVisitorCount(  dynamo_db=dynamodb_resource_class,
-                                        page_id=pageId)
+            dedupeClaim = 0
+            if _VISIT_DEDUPE is not None:
+                dedupeClaim = claim_dedupe_window(dynamo_db=dynamodb_resource_class,
+                                                  page_id=pageId,
+                                                  event=event)
+            if dedupeClaim is None:
+                # a refresh within the dedupe window: current count, no write
+                response = uncached_visitors_count(getVisitorsCount(dynamo_db=dynamodb_resource_class,
+                                                                    page_id=pageId))
+            else:
+                response = addOneVisitorCount(  dynamo_db=dynamodb_resource_class,
+                                                page_id=pageId)
+                # a stale answer means the increment was not counted
+                visitCounted = (response["statusCode"] == 200
+                                and "X-Visit-Count-Stale" not in (response.get("headers") or {}))
+                if dedupeClaim:
+                    settle_dedupe_claim(dynamo_db=dynamodb_resource_class,
+                                        page_id=pageId,
+                                        event=event,
+                                        expires_at=dedupeClaim,
+                                        counted=visitCounted)
+                if visitCounted and dynamodb_resource_class.unique_visitors is not None:
+                    record_unique_visitor(dynamo_db=dynamodb_resource_class,
+                                          page_id=pageId,
+                                          event=event)
+        elif (routeKey == 'GET /counts/{page-id}') and (functionName == "getUniqueVisitorCount"):
+            response = getUniqueVisitorCount(dynamo_db=dynamodb_resource_class,
+                                             page_id=pageId)
+        elif (routeKey == 'GET /counts/{page-id}') and (functionName == "getVisitorHistory"):
+            response = getVisitorHistory(dynamo_db=dynamodb_resource_class,
+                                         page_id=pageId,
+                                         query_parameters=event['queryStringParameters'])
+        elif (routeKey == 'GET /counts') and (functionName == "getTopPages"):
+            response = getTopPages(dynamo_db=dynamodb_resource_class,
+                                   query_parameters=event['queryStringParameters'])
+        elif routeKey == 'GET /counts':
+            pageIds = list(dict.fromkeys(event['queryStringParameters']['ids'].split(',')))
+            response = getVisitorsCounts(dynamo_db=dynamodb_resource_class,
+                                         page_ids=pageIds)
         else:
             raise ApiRequestNotFoundError("Requested path or parameter not found")
+
+        # persist the buffered increments before the environment may be frozen
+        flush_visit_count_write_buffer(dynamodb_resource_class, context)
+        return response
     
     except ApiRequestNotFoundError as api_error:
         body = "Not Found: " + api_error.args[0]
@@ -72,6 +409,54 @@ def lambda_handler(event: APIGatewayProxyEvent,context: LambdaContext) -> Dict[s
         return {"statusCode": status_code, "body" : body }
     
 
+def visit_count_consumer_handler(event: dict, context: LambdaContext) -> Dict[str, Any]:
+    """
+    Consumer Entry Point of the increment queue (SQS or Kinesis event source
+    with ReportBatchItemFailures). The increments of an SQS batch are
+    collapsed into one delta per page, each applied with a single update; the
+    records of the pages which could not be updated are reported as failures,
+    so that only they are delivered again.
+    """
+    dynamodb_resource_class = LambdaDynamoDBClass(_LAMBDA_DYNAMODB_RESOURCE)
+    if is_kinesis_batch(event.get('Records', [])):
+        return consume_ordered_increments(dynamodb_resource_class, event['Records'])
+    deltas, recordIds, failedRecordIds = aggregate_increment_records(event.get('Records', []))
+    if failedRecordIds:
+        print(f"ERROR: {len(failedRecordIds)} invalid increment messages")
+
+    for page_id, delta in deltas.items():
+        try:
+            add_visit_count_delta(dynamodb_resource_class, page_id, delta)
+        except Exception as increment_error:
+            print(f"ERROR: increment of page {page_id} not applied: {increment_error}")
+            failedRecordIds.extend(recordIds[page_id])
+
+    return {"batchItemFailures": [{"itemIdentifier": recordId} for recordId in failedRecordIds]}
+
+
+def consume_ordered_increments(dynamo_db: LambdaDynamoDBClass,
+                               records: list) -> Dict[str, Any]:
+    """
+    Apply the increments of a Kinesis batch in order, merging only the
+    consecutive records of the same page. Kinesis delivers the shard again
+    from the reported sequence number, so the consumer stops at the first
+    failure and reports only it: the increments applied before are not
+    delivered twice. Invalid records are logged and skipped, as they would
+    block the shard forever.
+    """
+    runs, invalidRecordIds = ordered_increment_runs(records)
+    if invalidRecordIds:
+        print(f"ERROR: {len(invalidRecordIds)} invalid increment messages skipped")
+
+    for page_id, delta, firstRecordId in runs:
+        try:
+            add_visit_count_delta(dynamo_db, page_id, delta)
+        except Exception as increment_error:
+            print(f"ERROR: increment of page {page_id} not applied: {increment_error}")
+            return {"batchItemFailures": [{"itemIdentifier": firstRecordId}]}
+    return {"batchItemFailures": []}
+
+
 def getVisitorsCount( dynamo_db: LambdaDynamoDBClass,
                       page_id: str) -> dict:
     """
@@ -82,21 +467,235 @@ def getVisitorsCount( dynamo_db: LambdaDynamoDBClass,
     # default output as placeholder
     status_code = 200
     body = "0"
+    headers = None
 
     try:         
-        # Use the passed environment class for AWS resource access to read from the DB
-        dbResponse = dynamo_db.table.get_item(  Key={"pkey_uuid": page_id},
-                                                ConsistentRead=False)
-        visitorCount = extract_visit_count_from_dbresponse(dbResponse)
+        # Serve repeated reads from the cache of the warm environment
+        visitorCount = _VISIT_COUNT_READ_CACHE.get(page_id) if _VISIT_COUNT_READ_CACHE is not None else None
+        if visitorCount is None:
+            visitorCount = _call_dynamodb(get_visit_count, dynamo_db, page_id)
+            if _VISIT_COUNT_READ_CACHE is not None:
+                _VISIT_COUNT_READ_CACHE.put(page_id, visitorCount)
         body = f"{visitorCount}"
+        if _HTTP_CACHE_CONFIG is not None:
+            # let CloudFront/API Gateway and browsers cache and revalidate the count
+            headers = _HTTP_CACHE_CONFIG.headers(visitorCount)
     except KeyError as index_error:
         body = "Not Found: " + str(index_error)
         status_code = 404
+    except DependencyUnavailableError as unavailable_error:
+        status_code, body, headers = degraded_visitors_count(page_id, unavailable_error)
     except Exception as other_error:               
         body = "ERROR: " + str(other_error)
         status_code = 500
     finally:
         print("this is from ci/cd.")
+        print(body)
+        response = {"statusCode": status_code, "body" : body }
+        if headers:
+            response["headers"] = headers
+        return response
+
+def notModifiedVisitorsCount(page_id: str,
+                             if_none_match: Optional[str]) -> Optional[dict]:
+    """
+    Return a 304 response when the If-None-Match header matches the ETag of
+    the count cached in the warm environment, or None when the count must
+    be read (no header, no fresh cached count, or a changed count).
+    """
+    if _HTTP_CACHE_CONFIG is None or not if_none_match or _VISIT_COUNT_READ_CACHE is None:
+        return None
+    visitorCount = _VISIT_COUNT_READ_CACHE.get(page_id)
+    if visitorCount is None or not etag_matches(if_none_match, visit_count_etag(visitorCount)):
+        return None
+    return {"statusCode": 304, "body": "", "headers": _HTTP_CACHE_CONFIG.headers(visitorCount)}
+
+def revalidatedVisitorsCount(response: dict,
+                             if_none_match: Optional[str]) -> dict:
+    """
+    Turn a 200 getVisitorsCount response into a 304 without body when the
+    If-None-Match header matches its ETag.
+    """
+    etag = (response.get("headers") or {}).get("ETag")
+    if response["statusCode"] != 200 or etag is None or not etag_matches(if_none_match, etag):
+        return response
+    return {"statusCode": 304, "body": "", "headers": response["headers"]}
+
+def uncached_visitors_count(response: dict) -> dict:
+    """
+    Strip the caching headers of a count answered on the increment route.
+    The increment URL must never be cached (e.g. by CloudFront, with func in
+    the cache key): the cached answer would be served to the next visitors,
+    whose hits would not be counted.
+    """
+    headers = {name: value for name, value in (response.get("headers") or {}).items()
+               if name not in ("Cache-Control", "ETag")}
+    headers["Cache-Control"] = "no-store"
+    return dict(response, headers=headers)
+
+
+def getVisitorsCounts(dynamo_db: LambdaDynamoDBClass,
+                      page_ids: list) -> dict:
+    """
+    Given several page ids, return a JSON map of page id to visitors count,
+    read from DynamoDB with BatchGetItem. Page ids not present in the table
+    are listed under "missing", page ids which could not be read under "errors".
+    """
+
+    # default output as placeholder
+    status_code = 200
+    body = "{}"
+    content_type = "application/json"
+    stalePageIds = []
+
+    try:
+        # Serve the cached pages first, read the others in batches
+        counts = {}
+        uncachedPageIds = []
+        for page_id in page_ids:
+            cachedCount = _VISIT_COUNT_READ_CACHE.get(page_id) if _VISIT_COUNT_READ_CACHE is not None else None
+            if cachedCount is None:
+                uncachedPageIds.append(page_id)
+            else:
+                counts[page_id] = cachedCount
+
+        try:
+            readCounts, missing, errors = _call_dynamodb(get_visit_counts, dynamo_db, uncachedPageIds)
+        except DependencyUnavailableError:
+            # DynamoDB unavailable: fall back to the last known counts, marked stale
+            readCounts, missing, errors = {}, [], []
+            for page_id in uncachedPageIds:
+                staleCount = _VISIT_COUNT_READ_CACHE.get_stale(page_id) if _VISIT_COUNT_READ_CACHE is not None else None
+                if staleCount is None:
+                    errors.append(page_id)
+                else:
+                    counts[page_id] = staleCount
+                    stalePageIds.append(page_id)
+        if _VISIT_COUNT_READ_CACHE is not None:
+            for page_id, visitorCount in readCounts.items():
+                _VISIT_COUNT_READ_CACHE.put(page_id, visitorCount)
+        counts.update(readCounts)
+
+        result = {"counts": counts, "missing": missing, "errors": errors}
+        if stalePageIds:
+            result["stale"] = stalePageIds
+            _mark_stale_response()
+        body = json.dumps(result)
+        if errors:
+            # some pages were throttled even after retries: let the client retry later
+            status_code = 503
+    except Exception as other_error:
+        body = "ERROR: " + str(other_error)
+        status_code = 500
+        content_type = "text/plain"
+    finally:
+        print(body)
+        headers = {"Content-Type": content_type}
+        if stalePageIds:
+            headers["X-Visit-Count-Stale"] = "true"
+        return {"statusCode": status_code, "body" : body,
+                "headers" : headers}
+
+def getTopPages(dynamo_db: LambdaDynamoDBClass,
+                query_parameters: dict) -> dict:
+    """
+    Return the "limit" most visited pages as JSON, highest count first:
+    the members of the top pages index with their current count.
+    """
+
+    # default output as placeholder
+    status_code = 200
+    body = "{}"
+    content_type = "application/json"
+
+    try:
+        limit = int(query_parameters.get("limit", DEFAULT_TOP_PAGES_LIMIT))
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        counts = _call_dynamodb(dynamo_db.store.top_pages, limit)
+        body = json.dumps({"pages": rank_top_pages(counts, limit)})
+    except ApiRequestNotFoundError as api_error:
+        body = "Not Found: " + api_error.args[0]
+        status_code = 404
+        content_type = "text/plain"
+    except ValueError as value_error:
+        body = "Bad Request: " + str(value_error)
+        status_code = 400
+        content_type = "text/plain"
+    except Exception as other_error:
+        body = "ERROR: " + str(other_error)
+        status_code = 500
+        content_type = "text/plain"
+    finally:
+        print(body)
+        return {"statusCode": status_code, "body" : body,
+                "headers" : {"Content-Type": content_type}}
+
+def getVisitorHistory(dynamo_db: LambdaDynamoDBClass,
+                      page_id: str,
+                      query_parameters: dict) -> dict:
+    """
+    Given a page id, return one page of its visit history as JSON: the
+    "granularity" (hour, day or month) buckets between "from" and "to",
+    oldest first, and the "next" token of the following page (null on the
+    last page).
+    """
+
+    # default output as placeholder
+    status_code = 200
+    body = "{}"
+    content_type = "application/json"
+
+    try:
+        if dynamo_db.history is None:
+            raise ApiRequestNotFoundError("visit history is not enabled")
+        granularity = query_parameters.get("granularity", "day")
+        buckets, next_token = query_visit_history(dynamo_db.history_table, page_id, granularity,
+                                                  start=query_parameters.get("from"),
+                                                  end=query_parameters.get("to"),
+                                                  limit=int(query_parameters.get("limit", DEFAULT_QUERY_LIMIT)),
+                                                  next_token=query_parameters.get("next"))
+        body = json.dumps({"pageId": page_id, "granularity": granularity,
+                           "buckets": buckets, "next": next_token})
+    except ApiRequestNotFoundError as api_error:
+        body = "Not Found: " + api_error.args[0]
+        status_code = 404
+        content_type = "text/plain"
+    except ValueError as value_error:
+        body = "Bad Request: " + str(value_error)
+        status_code = 400
+        content_type = "text/plain"
+    except Exception as other_error:
+        body = "ERROR: " + str(other_error)
+        status_code = 500
+        content_type = "text/plain"
+    finally:
+        print(body)
+        return {"statusCode": status_code, "body" : body,
+                "headers" : {"Content-Type": content_type}}
+
+def getUniqueVisitorCount(dynamo_db: LambdaDynamoDBClass,
+                          page_id: str) -> dict:
+    """
+    Given a page id, return the estimated number of unique visitors of the
+    page, read from its HyperLogLog sketch.
+    """
+
+    # default output as placeholder
+    status_code = 200
+    body = "0"
+
+    try:
+        if dynamo_db.unique_visitors is None:
+            raise ApiRequestNotFoundError("unique visitor estimation is not enabled")
+        body = f"{estimate_unique_visitors(dynamo_db.client, dynamo_db.table_name, page_id)}"
+    except (KeyError, ApiRequestNotFoundError) as not_found_error:
+        body = "Not Found: " + str(not_found_error.args[0])
+        status_code = 404
+    except Exception as other_error:
+        body = "ERROR: " + str(other_error)
+        status_code = 500
+    finally:
         print(body)
         return {"statusCode": status_code, "body" : body }
 
@@ -109,8 +708,139 @@ def addOneVisitorCount(dynamo_db: LambdaDynamoDBClass,
     # default output as placeholder
     status_code = 200
     body = "0"
+    headers = None
     
     try:         
+        if _VISIT_COUNT_INCREMENT_QUEUE is not None:
+            # Queued mode: the consumer handler applies the increment later
+            visitorCount = addOneVisitorCountQueued(dynamo_db, page_id, _VISIT_COUNT_INCREMENT_QUEUE)
+        elif _VISIT_COUNT_WRITE_BUFFER is not None:
+            # Buffered mode: coalesce the increments in the warm environment
+            visitorCount = _call_dynamodb(addOneVisitorCountBuffered, dynamo_db, page_id, _VISIT_COUNT_WRITE_BUFFER)
+        else:
+            visitorCount = _call_dynamodb(add_visit_count_delta, dynamo_db, page_id, 1)
+        # Keep the cached count fresh for the reads following this write. A
+        # queued count is only an estimate: it keeps the expiry of the count
+        # read from the DB, so that the environments do not drift apart.
+        if _VISIT_COUNT_READ_CACHE is not None:
+            _VISIT_COUNT_READ_CACHE.put(page_id, visitorCount, refresh=_VISIT_COUNT_INCREMENT_QUEUE is None)
+        body = f"{visitorCount}"
+
+    except KeyError as index_error:
+        body = "Not Found: " + str(index_error)
+        status_code = 404
+    except DependencyUnavailableError as unavailable_error:
+        # the increment is not counted, the visitor gets the last known count
+        status_code, body, headers = degraded_visitors_count(page_id, unavailable_error)
+    except IncrementQueueError as queue_error:
+        body = "Service Unavailable: " + str(queue_error)
+        status_code = 503
+    except _client_error_type() as dynamodb_error:
+        body = "Not Found: " + str(dynamodb_error)
+        status_code = 404
+    except Exception as other_error:               
+        body = "ERROR: " + str(other_error)
+        status_code = 500
+    finally:
+        print(body)
+        response = {"statusCode": status_code, "body" : body }
+        if headers:
+            response["headers"] = headers
+        return response
+
+
+def _call_dynamodb(function, *args):
+    """
+    Call function (which reaches DynamoDB) through the circuit breaker when
+    it is enabled: raise DependencyUnavailableError when the breaker is open
+    or the call was throttled or timed out.
+    """
+    if _DYNAMODB_CIRCUIT_BREAKER is None:
+        return function(*args)
+    return _DYNAMODB_CIRCUIT_BREAKER.call(function, *args)
+
+
+def _mark_stale_response() -> None:
+    """
+    Count the running invocation as answered with stale counts.
+    """
+    metrics = current_invocation_metrics()
+    if metrics is not None:
+        metrics.stale_response = True
+
+
+def degraded_visitors_count(page_id: str,
+                            unavailable_error: DependencyUnavailableError) -> tuple:
+    """
+    While DynamoDB is unavailable, return the status code, body and headers
+    answering with the last known count of the page, marked stale by the
+    "X-Visit-Count-Stale" header, or a 503 when this environment knows no
+    count of the page.
+    """
+    staleCount = _VISIT_COUNT_READ_CACHE.get_stale(page_id) if _VISIT_COUNT_READ_CACHE is not None else None
+    if staleCount is None:
+        retryAfter = int(_DYNAMODB_CIRCUIT_BREAKER.reset_timeout_seconds) if _DYNAMODB_CIRCUIT_BREAKER else 1
+        return 503, "Service Unavailable: " + str(unavailable_error), {"Retry-After": str(retryAfter)}
+    _mark_stale_response()
+    return 200, f"{staleCount}", {"X-Visit-Count-Stale": "true", "Cache-Control": "no-store"}
+
+
+class DynamoDBVisitCountStore(VisitCountStore):
+    """
+    Visit counts in the DynamoDB table (default store), with the sharded
+    counters, the client fast path and the top pages index
+    """
+    def __init__(self, dynamo_db: LambdaDynamoDBClass):
+        self.dynamo_db = dynamo_db
+
+    def get(self, page_id: str) -> int:
+        dynamo_db = self.dynamo_db
+        shard_count = dynamo_db.shard_config.shard_count(page_id)
+        if shard_count > 1:
+            # Sharded mode: add up all shards of the page with one BatchGetItem
+            return sum(read_visit_count_shards(dynamo_db.resource, dynamo_db.table_name,
+                                               page_id, shard_count).values())
+
+        if dynamo_db.backend == "client":
+            return get_visit_count_fast(dynamo_db, page_id)
+
+        # Use the passed environment class for AWS resource access to read from the DB
+        dbResponse = dynamo_db.table.get_item(  Key={"pkey_uuid": page_id},
+                                                ProjectionExpression="visit_count",
+                                                ConsistentRead=False)
+        return extract_visit_count_from_dbresponse(dbResponse)
+
+    def increment(self, page_id: str, delta: int = 1) -> int:
+        dynamo_db = self.dynamo_db
+        shard_count = dynamo_db.shard_config.shard_count(page_id)
+        if shard_count > 1:
+            # Sharded mode: spread the increments over the shard items of the page
+            visitorCount = add_visit_count_delta_sharded(dynamo_db, page_id, delta, shard_count)
+        else:
+            try:
+                visitorCount = self._increment_item(page_id, delta)
+            except _client_error_type() as update_error:
+                # the update expression of an unknown page-id refers to a missing "visit_count"
+                if update_error.response.get("Error", {}).get("Code") != "ValidationException":
+                    raise
+                raise KeyError(f"page {page_id} not found. Check again the page-id.") from update_error
+
+        if dynamo_db.top_pages is not None:
+            # Like the history, a failed index update is logged, not reported
+            try:
+                dynamo_db.top_pages.record(dynamo_db.client, dynamo_db.table_name, page_id, visitorCount)
+            except Exception as index_error:
+                print("ERROR: top pages index not updated: " + str(index_error))
+        return visitorCount
+
+    def _increment_item(self, page_id: str, delta: int) -> int:
+        """
+        Add delta to the single item of the page and return its new count.
+        """
+        dynamo_db = self.dynamo_db
+        if dynamo_db.backend == "client":
+            return add_visit_count_delta_fast(dynamo_db, page_id, delta)
+
         # Use the passed environment class for AWS resource access to update the DB
         dbResponse = dynamo_db.table.update_item(   Key={
                                                         "pkey_uuid": page_id
@@ -120,25 +850,307 @@ def addOneVisitorCount(dynamo_db: LambdaDynamoDBClass,
                                                         '#updateAttr1': "visit_count"
                                                     },
                                                     ExpressionAttributeValues={
-                                                        ":val": 1
+                                                        ":val": delta
                                                     },
                                                     ReturnValues='UPDATED_NEW'
                                                 )
-        visitorCount = extract_visit_count_from_dbresponse(dbResponse)
-        body = f"{visitorCount}"
+        return extract_visit_count_from_dbresponse(dbResponse)
 
-    except KeyError as index_error:
-        body = "Not Found: " + str(index_error)
-        status_code = 404
-    except botocore.exceptions.ClientError as dynamodb_error:
-        body = "Not Found: " + str(dynamodb_error)
-        status_code = 404
-    except Exception as other_error:               
-        body = "ERROR: " + str(other_error)
-        status_code = 500
-    finally:
-        print(body)
-        return {"statusCode": status_code, "body" : body }
+    def batch_get(self, page_ids) -> tuple:
+        dynamo_db = self.dynamo_db
+        return batch_get_visit_counts(dynamo_db.resource, dynamo_db.table_name,
+                                      {page_id: shard_keys(page_id, dynamo_db.shard_config.shard_count(page_id))
+                                       for page_id in page_ids})
+
+    def create_page(self, page_id: str, visit_count: int = 0) -> None:
+        # shard 0 of a page is its item, the other shards are created on first use
+        table = self.dynamo_db.table
+        try:
+            table.put_item(Item={"pkey_uuid": page_id, "visit_count": visit_count},
+                           ConditionExpression="attribute_not_exists(pkey_uuid)")
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
+
+    def top_pages(self, limit: int) -> dict:
+        """
+        Return the counts of the members of the top pages index. Raise
+        ApiRequestNotFoundError when the index is not enabled.
+        """
+        dynamo_db = self.dynamo_db
+        if dynamo_db.top_pages is None:
+            raise ApiRequestNotFoundError("top pages are not enabled")
+        if limit > dynamo_db.top_pages.capacity:
+            raise ValueError(f"limit must be at most {dynamo_db.top_pages.capacity}")
+        entries, _ = dynamo_db.top_pages.read(dynamo_db.client, dynamo_db.table_name)
+        # rank the candidates by their exact count, the indexed one may lag
+        counts, _, _ = self.batch_get(list(entries))
+        return counts
+
+    def prewarm(self) -> None:
+        """
+        Import boto3 and create the DynamoDB resource and table.
+        """
+        self.dynamo_db.table
+        _client_error_type()
+
+
+def get_visit_count(dynamo_db: LambdaDynamoDBClass,
+                    page_id: str) -> int:
+    """
+    Read the visit count of the page from the DB.
+    """
+    return dynamo_db.store.get(page_id)
+
+
+def get_visit_counts(dynamo_db: LambdaDynamoDBClass,
+                     page_ids: list) -> tuple:
+    """
+    Read the visit counts of several pages from the DB. Return the counts by
+    page-id, the page-ids not found and the page-ids which could not be read.
+    """
+    return dynamo_db.store.batch_get(page_ids)
+
+
+def add_visit_count_delta(dynamo_db: LambdaDynamoDBClass,
+                          page_id: str,
+                          delta: int) -> int:
+    """
+    Add delta to the visit count of the page in the DB and return the
+    page's new visit count. With history enabled, delta is also added to the
+    page's current hour, day and month buckets.
+    """
+    visitorCount = dynamo_db.store.increment(page_id, delta)
+    if dynamo_db.history is not None:
+        # The count is already persisted: a failed history write is logged
+        # rather than reported, so that the client does not count the visit twice
+        try:
+            record_visit_history(dynamo_db.client, dynamo_db.history, page_id, delta)
+        except Exception as history_error:
+            print("ERROR: visit history not recorded: " + str(history_error))
+    return visitorCount
+
+
+def get_visit_count_fast(dynamo_db: LambdaDynamoDBClass,
+                         page_id: str) -> int:
+    """
+    Read the visit count of the page with the low-level client, projecting
+    only "visit_count" and reading its "N" value directly.
+    """
+    dbResponse = dynamo_db.client.get_item(TableName=dynamo_db.table_name,
+                                           Key={"pkey_uuid": {"S": page_id}},
+                                           ProjectionExpression="visit_count",
+                                           ConsistentRead=False)
+    try:
+        return int(dbResponse["Item"]["visit_count"]["N"])
+    except KeyError:
+        raise KeyError('"visit_count" attribute is expected but not found in the database response. Check again the page-id.') from None
+
+
+def add_visit_count_delta_fast(dynamo_db: LambdaDynamoDBClass,
+                               page_id: str,
+                               delta: int) -> int:
+    """
+    Add delta to the visit count of the page with the low-level client and
+    return the page's new visit count.
+    """
+    dbResponse = dynamo_db.client.update_item(TableName=dynamo_db.table_name,
+                                              Key={"pkey_uuid": {"S": page_id}},
+                                              UpdateExpression='SET #updateAttr1 = #updateAttr1 + :val',
+                                              ExpressionAttributeNames={'#updateAttr1': "visit_count"},
+                                              ExpressionAttributeValues={":val": {"N": str(delta)}},
+                                              ReturnValues='UPDATED_NEW')
+    return int(dbResponse["Attributes"]["visit_count"]["N"])
+
+
+def add_visit_count_delta_sharded(dynamo_db: LambdaDynamoDBClass,
+                                  page_id: str,
+                                  delta: int,
+                                  shard_count: int) -> int:
+    """
+    Add delta to a random shard of the page and return the page's total count.
+    The shards are read first, so an unknown page-id raises KeyError before
+    anything is written.
+    """
+    shardCounts = read_visit_count_shards(dynamo_db.resource, dynamo_db.table_name,
+                                          page_id, shard_count)
+    shard = choose_shard(shard_count)
+    newShardCount = add_to_visit_count_shard(dynamo_db.table, page_id, shard, delta)
+    return sum(shardCounts.values()) - shardCounts[shard] + newShardCount
+
+
+def addOneVisitorCountQueued(dynamo_db: LambdaDynamoDBClass,
+                             page_id: str,
+                             increment_queue) -> int:
+    """
+    Queue one increment of the page and return the last known count plus
+    this increment, without writing to the DB. The known count comes from
+    the read cache, or from the DB, which also rejects an unknown page-id
+    before anything is queued. Only that read goes through the DynamoDB
+    circuit breaker: a failed send raises IncrementQueueError.
+    """
+    visitorCount = _VISIT_COUNT_READ_CACHE.get(page_id) if _VISIT_COUNT_READ_CACHE is not None else None
+    if visitorCount is None:
+        visitorCount = _call_dynamodb(get_visit_count, dynamo_db, page_id)
+    increment_queue.send(page_id)
+    return visitorCount + 1
+
+
+def request_visitor_hash(event: dict) -> int:
+    """
+    Return the hash identifying the visitor of a request, from the source IP
+    seen by API Gateway and the user-agent header. x-forwarded-for is not
+    used: the client sets it, and could claim a new identity on every hit.
+    """
+    sourceIp = ((event.get('requestContext') or {}).get('http') or {}).get('sourceIp', '')
+    return visitor_hash(sourceIp, (event.get('headers') or {}).get('user-agent', ''))
+
+
+def claim_dedupe_window(dynamo_db: LambdaDynamoDBClass,
+                        page_id: str,
+                        event: dict) -> Optional[int]:
+    """
+    Claim the dedupe window of the visitor of the request on the page, before
+    the hit is counted. Return the expiry time of the claim, or None when the
+    visitor already hit the page within the window. When the check itself
+    fails, the hit is counted without a claim (0 is returned).
+    """
+    try:
+        return _call_dynamodb(_VISIT_DEDUPE.claim, dynamo_db.client, dynamo_db.table_name,
+                              page_id, request_visitor_hash(event))
+    except Exception as dedupe_error:
+        print("ERROR: visit dedupe check failed: " + str(dedupe_error))
+        return 0
+
+
+def settle_dedupe_claim(dynamo_db: LambdaDynamoDBClass,
+                        page_id: str,
+                        event: dict,
+                        expires_at: int,
+                        counted: bool) -> None:
+    """
+    Remember the claimed hit once counted. Otherwise release the claim, so
+    that the retry of the visitor is counted and no dedupe item is left for
+    an unknown page-id. A failed release is logged: the retries of the
+    visitor are then suppressed until the window ends.
+    """
+    visitorHash = request_visitor_hash(event)
+    if counted:
+        _VISIT_DEDUPE.confirm(page_id, visitorHash)
+        return
+    try:
+        _call_dynamodb(_VISIT_DEDUPE.release, dynamo_db.client, dynamo_db.table_name,
+                       page_id, visitorHash, expires_at)
+    except Exception as dedupe_error:
+        print("ERROR: visit dedupe claim not released: " + str(dedupe_error))
+
+
+def record_unique_visitor(dynamo_db: LambdaDynamoDBClass,
+                          page_id: str,
+                          event: dict) -> None:
+    """
+    Add the visitor of the request (source IP + user-agent header) to
+    the unique-visitor sketch of the page. The visit itself is already
+    counted, so a failure is logged and not reported.
+    """
+    # secondary write: skipped while DynamoDB is failing
+    if _DYNAMODB_CIRCUIT_BREAKER is not None and _DYNAMODB_CIRCUIT_BREAKER.state != CLOSED:
+        return
+    try:
+        add_unique_visitor(dynamo_db.client, dynamo_db.table_name, page_id,
+                           request_visitor_hash(event), dynamo_db.unique_visitors.precision)
+    except Exception as sketch_error:
+        print("ERROR: unique visitor not recorded: " + str(sketch_error))
+
+
+def addOneVisitorCountBuffered(dynamo_db: LambdaDynamoDBClass,
+                               page_id: str,
+                               write_buffer: VisitCountWriteBuffer) -> int:
+    """
+    Buffer one increment of the page and return the last persisted count plus
+    the pending delta. The first increment of a page in this environment is
+    written at once, so that its count is known and an unknown page-id fails.
+    When the flush of the page fails, its increment is taken back from the
+    delta kept for the next flush, as the visitor is told it was not counted.
+    """
+    write_buffer.add(page_id)
+    if write_buffer.is_persisted(page_id) and not write_buffer.is_due():
+        return write_buffer.current_count(page_id)
+
+    flush_errors = write_buffer.flush(lambda flushed_page_id, delta:
+                                      add_visit_count_delta(dynamo_db, flushed_page_id, delta))
+    for flushed_page_id, flush_error in flush_errors.items():
+        if flushed_page_id == page_id:
+            if write_buffer.is_persisted(page_id):
+                write_buffer.discard(page_id)
+            raise flush_error
+        print(f"Failed to flush the visit count of {flushed_page_id}: {flush_error}")
+    return write_buffer.current_count(page_id)
+
+
+def flush_visit_count_write_buffer(dynamo_db: LambdaDynamoDBClass,
+                                   context: LambdaContext,
+                                   force: bool = False) -> None:
+    """
+    Flush the increments buffered in this environment when a threshold is
+    reached (or always when force is True). Errors are logged, not raised,
+    because the increments of the current request are already accounted for.
+    """
+    write_buffer = _VISIT_COUNT_WRITE_BUFFER
+    if write_buffer is None:
+        return
+    remaining_time_ms = context.get_remaining_time_in_millis() if context is not None else None
+    if not (force or write_buffer.is_due(remaining_time_ms)):
+        return
+
+    flush_errors = write_buffer.flush(lambda page_id, delta:
+                                      add_visit_count_delta(dynamo_db, page_id, delta))
+    for page_id, flush_error in flush_errors.items():
+        print(f"Failed to flush the visit count of {page_id}: {flush_error}")
+
+
+def _flush_on_shutdown(signum=None, frame=None) -> None:
+    """
+    Flush the buffered increments and metrics when the execution environment
+    shuts down. Lambda sends SIGTERM to the runtime before shutdown when an
+    extension is registered; atexit covers a normal interpreter exit.
+    """
+    flush_visit_count_write_buffer(LambdaDynamoDBClass(_LAMBDA_DYNAMODB_RESOURCE), None, force=True)
+    if _METRICS_EMITTER is not None:
+        _METRICS_EMITTER.flush()
+    if signum is not None:
+        raise SystemExit(0)
+
+
+if _VISIT_COUNT_WRITE_BUFFER is not None or _METRICS_EMITTER is not None:
+    atexit.register(_flush_on_shutdown)
+    signal.signal(signal.SIGTERM, _flush_on_shutdown)
+
+
+def prewarm() -> None:
+    """
+    Pre-warm hook: do the deferred startup work up front (import boto3,
+    compile the schemas, create the DynamoDB resource, table and client). Called at import
+    time in eager mode, during the init phase of provisioned concurrency,
+    and before the snapshot is taken with SnapStart.
+    """
+    dynamodb_resource_class = LambdaDynamoDBClass(_LAMBDA_DYNAMODB_RESOURCE)
+    # only the DynamoDB store creates the resource and the table
+    dynamodb_resource_class.store.prewarm()
+    if dynamodb_resource_class.uses_client:
+        dynamodb_resource_class.client
+    lambda_handler.prewarm()
+
+
+if (_LAMBDA_STARTUP_MODE != "lazy"
+        or environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency"):
+    prewarm()
+else:
+    try:
+        # SnapStart runtime hooks, only available in the Lambda Python runtime
+        from snapshot_restore_py import register_before_snapshot
+        register_before_snapshot(prewarm)
+    except ImportError:
+        pass
 
 
 def extract_visit_count_from_dbresponse(dbResponse) -> int:
@@ -147,18 +1159,16 @@ def extract_visit_count_from_dbresponse(dbResponse) -> int:
     Return integer.
     """
     
-    # naively iterate for all keys in the DB response payload to look for "visit_count"
-    for key in dbResponse:
-        if(dbResponse[key].get('visit_count')):
-            visitCount = int(dbResponse[key].get('visit_count'))
-            return visitCount
+    # get_item returns the attributes under "Item", update_item under "Attributes"
+    attributes = dbResponse.get('Item') or dbResponse.get('Attributes') or {}
+    if 'visit_count' in attributes:
+        return int(attributes['visit_count'])
     raise KeyError ('"visit_count" attribute is expected but not found in the database response. Check again the page-id.')
 
 
 # I used the 'main' part below when developing/debugging in my local machine.
 # The 'main' part below is not necessary when deploying the code to Lambda.
 '''
-from aws_lambda_powertools.utilities.validation.exceptions import SchemaValidationError
 import sys
 import json # for testing
 
@@ -174,12 +1184,8 @@ def main(argv):
     with open(eventFileName,"r",encoding='UTF-8') as fileHandle:
         event = json.load(fileHandle)
     
-    try:
-        return lambda_handler(event, None)
-    except SchemaValidationError as schema_error:
-        body = "Bad Request: " + schema_error.args[0]
-        status_code = 400
-        return {"statusCode": status_code, "body" : body }
+    # schema errors are answered by lambda_handler with a 400 response
+    return lambda_handler(event, None)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,236 @@
+"""
+Per-invocation hot-path metrics emitted as CloudWatch Embedded Metric Format.
+
+Each sampled invocation records its route, status code, cold-start flag,
+total and validation time, DynamoDB call time and the capacity units
+consumed (DynamoDB calls are measured with botocore event hooks, which also
+ask DynamoDB for ReturnConsumedCapacity). The records are batched in the warm
+execution environment and printed as EMF log lines, one per route, status
+code and minute, so CloudWatch extracts the metrics from the logs without any extra
+PutMetricData call.
+"""
+
+import contextvars
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Mapping, Optional
+
+
+# DynamoDB operations accepting ReturnConsumedCapacity, and whether they read
+_CAPACITY_OPERATIONS = {"GetItem": True, "BatchGetItem": True, "Query": True, "Scan": True,
+                        "PutItem": False, "UpdateItem": False, "DeleteItem": False,
+                        "BatchWriteItem": False, "TransactWriteItems": False}
+
+# EMF accepts at most 100 values per metric in one log line
+_EMF_MAX_VALUES = 100
+
+_METRIC_UNITS = {"Invocations": "Count",
+                 "ColdStart": "Count",
+                 "Latency": "Milliseconds",
+                 "ValidationTime": "Milliseconds",
+                 "DynamoDBTime": "Milliseconds",
+                 "DynamoDBCalls": "Count",
+                 "ConsumedReadCapacity": "Count",
+                 "ConsumedWriteCapacity": "Count",
+                 "CircuitBreakerOpen": "Count",
+                 "StaleResponses": "Count"}
+
+
+class InvocationMetrics:
+    """
+    Measurements of one invocation
+    """
+    def __init__(self, cold_start: bool):
+        self.cold_start = cold_start
+        self.route = "unknown"
+        self.status_code = 0
+        self.latency_ms = 0.0
+        self.validation_ms = 0.0
+        self.dynamodb_ms = 0.0
+        self.dynamodb_calls = 0
+        self.consumed_read_capacity = 0.0
+        self.consumed_write_capacity = 0.0
+        self.breaker_open = False
+        self.stale_response = False
+        # epoch seconds at which the invocation was recorded (EMF Timestamp)
+        self.timestamp: Optional[float] = None
+
+    def values(self) -> Dict[str, float]:
+        """
+        Return the metric values of the invocation, by metric name.
+        """
+        return {"Invocations": 1,
+                "ColdStart": int(self.cold_start),
+                "Latency": self.latency_ms,
+                "ValidationTime": self.validation_ms,
+                "DynamoDBTime": self.dynamodb_ms,
+                "DynamoDBCalls": self.dynamodb_calls,
+                "ConsumedReadCapacity": self.consumed_read_capacity,
+                "ConsumedWriteCapacity": self.consumed_write_capacity,
+                "CircuitBreakerOpen": int(self.breaker_open),
+                "StaleResponses": int(self.stale_response)}
+
+
+# Metrics of the invocation running in the current thread (None: not sampled)
+_CURRENT_INVOCATION: contextvars.ContextVar = contextvars.ContextVar("current_invocation_metrics", default=None)
+
+
+def current_invocation_metrics() -> Optional[InvocationMetrics]:
+    """
+    Return the metrics of the running invocation, or None when not sampled.
+    """
+    return _CURRENT_INVOCATION.get()
+
+
+def start_invocation(metrics: Optional[InvocationMetrics]) -> contextvars.Token:
+    """
+    Make metrics the metrics of the running invocation.
+    """
+    return _CURRENT_INVOCATION.set(metrics)
+
+
+def end_invocation(token: contextvars.Token) -> None:
+    """
+    Restore the metrics of the previous invocation (usually None).
+    """
+    _CURRENT_INVOCATION.reset(token)
+
+
+class EmfMetricsEmitter:
+    """
+    Batches invocation metrics and prints them as EMF log lines
+    """
+    def __init__(self, namespace: str, sample_rate: float = 1.0, batch_size: int = 10,
+                 max_age_seconds: float = 60.0, service: str = "myresume_backend",
+                 printer: Callable[[str], None] = print,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize the emitter. sample_rate is the fraction of invocations
+        measured, batch_size the number of invocations per flush.
+        """
+        self.namespace = namespace
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.max_age_seconds = max_age_seconds
+        self.service = service
+        self._printer = printer
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._records: List[InvocationMetrics] = []
+        self._oldest_record_time: Optional[float] = None
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> Optional["EmfMetricsEmitter"]:
+        """
+        Build the emitter from the Lambda environment variables, or return None
+        when METRICS_SAMPLE_RATE is not set (metrics disabled).
+        """
+        sample_rate = float(environ.get("METRICS_SAMPLE_RATE", "0"))
+        if sample_rate <= 0:
+            return None
+        return cls(namespace=environ.get("METRICS_NAMESPACE", "MyResumeBackend"),
+                   sample_rate=min(sample_rate, 1.0),
+                   batch_size=int(environ.get("METRICS_BATCH_SIZE", "10")),
+                   max_age_seconds=float(environ.get("METRICS_MAX_AGE_SECONDS", "60")),
+                   service=environ.get("AWS_LAMBDA_FUNCTION_NAME", "myresume_backend"))
+
+    def sample(self, cold_start: bool) -> Optional[InvocationMetrics]:
+        """
+        Return new invocation metrics when this invocation is sampled, else
+        None. Cold starts are always sampled.
+        """
+        if cold_start or random.random() < self.sample_rate:
+            return InvocationMetrics(cold_start)
+        return None
+
+    def record(self, metrics: InvocationMetrics) -> None:
+        """
+        Add the metrics of a finished invocation to the batch, and flush the
+        batch when it is full or too old.
+        """
+        now = self._clock()
+        metrics.timestamp = now
+        with self._lock:
+            self._records.append(metrics)
+            if self._oldest_record_time is None:
+                self._oldest_record_time = now
+            due = (len(self._records) >= self.batch_size
+                   or now - self._oldest_record_time >= self.max_age_seconds)
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Print the batched metrics as EMF log lines, one per route, status code
+        and minute of the invocations (CloudWatch aggregates the values of a
+        line at its Timestamp, the time of its first invocation).
+        """
+        with self._lock:
+            records, self._records = self._records, []
+            self._oldest_record_time = None
+
+        groups: Dict[tuple, List[tuple]] = {}
+        for record in records:
+            timestamp = record.timestamp if record.timestamp is not None else self._clock()
+            groups.setdefault((record.route, str(record.status_code), int(timestamp // 60)),
+                              []).append((timestamp, record.values()))
+        for (route, status_code, _), group in groups.items():
+            for chunk_start in range(0, len(group), _EMF_MAX_VALUES):
+                chunk = group[chunk_start:chunk_start + _EMF_MAX_VALUES]
+                values = {name: [record_values[name] for _, record_values in chunk] for name in _METRIC_UNITS}
+                self._printer(self._emf_document({"Service": self.service, "Route": route,
+                                                  "StatusCode": status_code}, _METRIC_UNITS, values,
+                                                 min(timestamp for timestamp, _ in chunk)))
+
+    def _emf_document(self, dimensions: Dict[str, str], units: Dict[str, str], values: dict,
+                      timestamp: float) -> str:
+        """
+        Return one EMF log line.
+        """
+        document = {"_aws": {"Timestamp": int(timestamp * 1000),
+                             "CloudWatchMetrics": [{"Namespace": self.namespace,
+                                                    "Dimensions": [list(dimensions)],
+                                                    "Metrics": [{"Name": name, "Unit": unit}
+                                                                for name, unit in units.items()]}]},
+                    "SampleRate": self.sample_rate}
+        document.update(dimensions)
+        document.update(values)
+        return json.dumps(document)
+
+
+def register_dynamodb_hooks(dynamodb_client) -> None:
+    """
+    Measure every DynamoDB call of the client (time and consumed capacity)
+    into the metrics of the running invocation, asking DynamoDB to return
+    the consumed capacity when the invocation is sampled.
+    """
+    events = dynamodb_client.meta.events
+
+    def request_consumed_capacity(params, **kwargs):
+        if current_invocation_metrics() is not None:
+            params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+    def start_timer(context, **kwargs):
+        context["metrics_start_time"] = time.perf_counter()
+
+    def record_call(parsed, model, context, **kwargs):
+        metrics = current_invocation_metrics()
+        if metrics is None or "metrics_start_time" not in context:
+            return
+        metrics.dynamodb_ms += (time.perf_counter() - context["metrics_start_time"]) * 1000
+        metrics.dynamodb_calls += 1
+        consumed = parsed.get("ConsumedCapacity") or []
+        if isinstance(consumed, dict):
+            consumed = [consumed]
+        units = sum(capacity.get("CapacityUnits", 0) for capacity in consumed)
+        if _CAPACITY_OPERATIONS.get(model.name, False):
+            metrics.consumed_read_capacity += units
+        else:
+            metrics.consumed_write_capacity += units
+
+    for operation in _CAPACITY_OPERATIONS:
+        events.register(f"provide-client-params.dynamodb.{operation}", request_consumed_capacity)
+    events.register("before-call.dynamodb", start_timer)
+    events.register("after-call.dynamodb", record_call)
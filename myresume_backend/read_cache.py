@@ -0,0 +1,111 @@
+"""
+Bounded read-through cache of the visitor counts, keyed by page-id.
+
+The cache lives in global scope, so a warm Lambda execution environment
+answers repeated reads of the same page without a DynamoDB round trip.
+Entries expire after a TTL and the least recently used entry is evicted
+when the cache is full.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Mapping, Optional
+
+
+class VisitCountReadCache:
+    """
+    TTL + LRU cache of page-id to visit count, with hit/miss/eviction counters
+    """
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024,
+                 clock: Callable[[], float] = time.monotonic, keep_stale: bool = False):
+        """
+        Initialize an empty cache. With keep_stale, expired entries stay
+        (until evicted) as the last known counts returned by get_stale().
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self.keep_stale = keep_stale
+        self._lock = threading.Lock()
+        # page-id -> (visit count, expiry time), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str],
+                     keep_stale: bool = False) -> Optional["VisitCountReadCache"]:
+        """
+        Build the cache from the Lambda environment variables, or return None
+        when VISIT_COUNT_CACHE_TTL_SECONDS is not set (caching disabled) and
+        no stale counts are needed.
+        """
+        ttl_seconds = float(environ.get("VISIT_COUNT_CACHE_TTL_SECONDS", "0"))
+        if ttl_seconds <= 0 and not keep_stale:
+            return None
+        return cls(ttl_seconds=max(ttl_seconds, 0),
+                   max_entries=int(environ.get("VISIT_COUNT_CACHE_MAX_ENTRIES", "1024")),
+                   keep_stale=keep_stale)
+
+    def get(self, page_id: str) -> Optional[int]:
+        """
+        Return the cached count of the page, or None when missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(page_id)
+            if entry is None or entry[1] <= self._clock():
+                if entry is not None and not self.keep_stale:
+                    del self._entries[page_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(page_id)
+            self.hits += 1
+            return entry[0]
+
+    def get_stale(self, page_id: str) -> Optional[int]:
+        """
+        Return the last cached count of the page even when expired (only kept
+        with keep_stale), or None when the page was never cached or evicted.
+        """
+        with self._lock:
+            entry = self._entries.get(page_id)
+            return entry[0] if entry is not None else None
+
+    def put(self, page_id: str, visit_count: int, refresh: bool = True) -> None:
+        """
+        Cache the count of the page, evicting the least recently used entry
+        when the cache is full. Without refresh, an unexpired entry keeps its
+        expiry time: a count estimated locally must not extend the life of the
+        count last read from the DB.
+        """
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(page_id)
+            if not refresh and entry is not None and entry[1] > now:
+                expires_at = entry[1]
+            else:
+                expires_at = now + self.ttl_seconds
+            self._entries[page_id] = (visit_count, expires_at)
+            self._entries.move_to_end(page_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, page_id: str) -> None:
+        """
+        Remove the page from the cache.
+        """
+        with self._lock:
+            self._entries.pop(page_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the cache counters and current size.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "size": len(self._entries)}
@@ -9,8 +9,14 @@ INPUT_SCHEMA = {
     "type": "object",
     "title": "Sample input schema",
     "description": "The Document generation path parameters, Document Type and Customer ID.",
-    "required": ["pathParameters","queryStringParameters"],
+    "required": ["queryStringParameters"],
     "properties": {
+        "routeKey" : {
+            "$id": "#/properties/routeKey",
+            "type": "string",
+            "title": "The route key of API Gateway",
+            "examples": ["GET /counts/{page-id}","GET /counts"],
+        },
         "pathParameters" : { 
             "$id": "#/properties/pathParameters",
             "type": "object",
@@ -22,24 +28,83 @@ INPUT_SCHEMA = {
                     "title": "The uuid of the webpage",
                     "examples": ["6632d5b4-5655-4c48-b7b6-071d5823c888"],
                     "maxLength": 36,
+                    # "#" is reserved to the internal items (shards, dedupe, top pages)
+                    "pattern": "^[^#]+$",
                 }
             }
         },
         "queryStringParameters" : { 
             "$id": "#/properties/queryStringParameters",
             "type": "object",
-            "required": ["func"],
             "properties": {
                 "func": {
                     "$id": "#/properties/queryStringParameters/func",
                     "type": "string",
                     "title": "The function name of API Gateway",
-                    "examples": ["getVisitorCount","addOneVisitorCount"],
+                    "examples": ["getVisitorCount","addOneVisitorCount","getVisitorHistory","getUniqueVisitorCount",
+                                 "getTopPages"],
                     "maxLength": 30,
+                },
+                "ids": {
+                    "$id": "#/properties/queryStringParameters/ids",
+                    "type": "string",
+                    "title": "Comma separated uuids of the webpages",
+                    "examples": ["6632d5b4-5655-4c48-b7b6-071d5823c888,e1a5f0c2-1c7d-4a6f-9a53-2a2f3b8d1c11"],
+                    # "#" is reserved to the internal items, as for page-id
+                    "pattern": "^[^,#]{1,36}(,[^,#]{1,36})*$",
+                    "maxLength": 18500,
+                },
+                "granularity": {
+                    "$id": "#/properties/queryStringParameters/granularity",
+                    "type": "string",
+                    "title": "The bucket size of the visit history",
+                    "enum": ["hour", "day", "month"],
+                },
+                "from": {
+                    "$id": "#/properties/queryStringParameters/from",
+                    "type": "string",
+                    "title": "The first UTC bucket of the visit history",
+                    "examples": ["2026-10", "2026-10-01", "2026-10-01T09"],
+                    "pattern": "^[0-9]{4}-[0-9]{2}(-[0-9]{2}(T[0-9]{2})?)?$",
+                },
+                "to": {
+                    "$id": "#/properties/queryStringParameters/to",
+                    "type": "string",
+                    "title": "The last UTC bucket of the visit history",
+                    "examples": ["2026-10", "2026-10-31", "2026-10-31T23"],
+                    "pattern": "^[0-9]{4}-[0-9]{2}(-[0-9]{2}(T[0-9]{2})?)?$",
+                },
+                "limit": {
+                    "$id": "#/properties/queryStringParameters/limit",
+                    "type": "string",
+                    "title": "The maximum number of history buckets or top pages returned",
+                    "pattern": "^[0-9]{1,4}$",
+                },
+                "next": {
+                    "$id": "#/properties/queryStringParameters/next",
+                    "type": "string",
+                    "title": "The pagination token of the visit history",
+                    "maxLength": 13,
                 }
             }
         }
     },
+    # The batch route "GET /counts" takes the page ids from the query string
+    # (or func=getTopPages), every other route takes a single page id from the path.
+    "if": {
+        "required": ["routeKey"],
+        "properties": {"routeKey": {"const": "GET /counts"}},
+    },
+    "then": {
+        "properties": {"queryStringParameters": {"anyOf": [
+            {"required": ["ids"]},
+            {"required": ["func"], "properties": {"func": {"const": "getTopPages"}}},
+        ]}},
+    },
+    "else": {
+        "required": ["pathParameters"],
+        "properties": {"queryStringParameters": {"required": ["func"]}},
+    },
 }
 
 OUTPUT_SCHEMA = {
@@ -52,7 +117,14 @@ OUTPUT_SCHEMA = {
     "required": ["statusCode", "body"],
     "properties": {
         "statusCode": {"$id": "#/properties/statusCode", "type": "integer", "title": "The statusCode"},
-        "body": {"$id": "#/properties/body", "type": "string", "title": "The response"}
+        "body": {"$id": "#/properties/body", "type": "string", "title": "The response"},
+        "headers": {
+            "$id": "#/properties/headers",
+            "type": "object",
+            "title": "The response headers",
+            "examples": [{"Cache-Control": "public, max-age=60, stale-while-revalidate=300", "ETag": "\"42\""}],
+            "additionalProperties": {"type": "string"},
+        }
     },
 }
 
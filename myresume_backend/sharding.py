@@ -0,0 +1,161 @@
+"""
+Sharded write counters for the visitor count.
+
+A popular page funnels every increment into the single "pkey_uuid" item of
+that page, which makes the item a hot partition key during traffic spikes.
+In sharded mode, increments are spread over N shard items per page and the
+page count is the sum of all shards.
+
+Shard 0 is the original page item itself (key = page-id), shards 1..N-1 are
+stored under "<page-id>#shard-<n>". Because of this, pages which currently
+have a single "visit_count" item need no data migration to enable sharding:
+their existing count simply becomes shard 0. Reducing the shard count (or
+going back to single-item mode) is done with fold_visit_count_shards().
+"""
+
+import json
+import random
+import zlib
+from typing import Dict, List, Mapping, Optional
+
+from batch_counts import batch_get_items
+
+
+SHARD_KEY_SEPARATOR = "#shard-"
+
+
+class ShardConfig:
+    """
+    Number of visit_count shards, for the whole table or per page.
+    """
+    def __init__(self, default_shard_count: int = 1,
+                 page_shard_counts: Optional[Mapping[str, int]] = None):
+        """
+        Initialize the shard configuration
+        """
+        if default_shard_count < 1:
+            raise ValueError("default_shard_count must be at least 1")
+        self.default_shard_count = default_shard_count
+        self.page_shard_counts = dict(page_shard_counts or {})
+        for page_id, shard_count in self.page_shard_counts.items():
+            if shard_count < 1:
+                raise ValueError(f"shard count of page {page_id} must be at least 1")
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> "ShardConfig":
+        """
+        Build the configuration from the Lambda environment variables:
+         - VISIT_COUNT_SHARD_COUNT: table-wide shard count (default 1, no sharding)
+         - VISIT_COUNT_PAGE_SHARD_COUNTS: JSON object of page-id to shard count
+        """
+        default_shard_count = int(environ.get("VISIT_COUNT_SHARD_COUNT", "1"))
+        page_shard_counts = json.loads(environ.get("VISIT_COUNT_PAGE_SHARD_COUNTS", "{}"))
+        return cls(default_shard_count=default_shard_count,
+                   page_shard_counts={page_id: int(count) for page_id, count in page_shard_counts.items()})
+
+    def shard_count(self, page_id: str) -> int:
+        """
+        Return the number of shards used by the given page.
+        """
+        return self.page_shard_counts.get(page_id, self.default_shard_count)
+
+
+def shard_key(page_id: str, shard: int) -> str:
+    """
+    Return the "pkey_uuid" of the given shard of a page.
+    """
+    if shard == 0:
+        return page_id
+    return f"{page_id}{SHARD_KEY_SEPARATOR}{shard}"
+
+
+def shard_keys(page_id: str, shard_count: int) -> List[str]:
+    """
+    Return the "pkey_uuid" of every shard of a page, shard 0 first.
+    """
+    return [shard_key(page_id, shard) for shard in range(shard_count)]
+
+
+def choose_shard(shard_count: int, hash_key: Optional[str] = None) -> int:
+    """
+    Pick the shard that receives an increment. The shard is random by default,
+    or derived from a hash of hash_key (e.g. a visitor id) when given.
+    """
+    if shard_count <= 1:
+        return 0
+    if hash_key is not None:
+        return zlib.crc32(hash_key.encode("utf-8")) % shard_count
+    return random.randrange(shard_count)
+
+
+def read_visit_count_shards(dynamodb_resource, table_name: str,
+                            page_id: str, shard_count: int) -> Dict[int, int]:
+    """
+    Read all shards of a page with BatchGetItem and return a map of shard
+    number to its visit_count. Shards which have not been written yet count
+    as zero. Raise KeyError when the page itself (shard 0) does not exist.
+    """
+    keys = shard_keys(page_id, shard_count)
+    items, unprocessed = batch_get_items(dynamodb_resource, table_name, keys)
+    if unprocessed:
+        raise RuntimeError(f"BatchGetItem left unprocessed shards of page {page_id} after retries")
+    shard_counts = {shard: int(items[key].get("visit_count", 0)) if key in items else 0
+                    for shard, key in enumerate(keys)}
+
+    if page_id not in items:
+        raise KeyError('"visit_count" attribute is expected but not found in the database response. Check again the page-id.')
+    return shard_counts
+
+
+def add_to_visit_count_shard(table, page_id: str, shard: int, delta: int) -> int:
+    """
+    Add delta to one shard of a page and return the new value of that shard.
+    Shard 0 (the page item) must already exist, like in single-item mode;
+    the other shards are created on their first increment.
+    """
+    if shard == 0:
+        update_expression = "SET #updateAttr1 = #updateAttr1 + :val"
+    else:
+        update_expression = "ADD #updateAttr1 :val"
+    dbResponse = table.update_item(Key={"pkey_uuid": shard_key(page_id, shard)},
+                                   UpdateExpression=update_expression,
+                                   ExpressionAttributeNames={"#updateAttr1": "visit_count"},
+                                   ExpressionAttributeValues={":val": delta},
+                                   ReturnValues="UPDATED_NEW")
+    return int(dbResponse["Attributes"]["visit_count"])
+
+
+def fold_visit_count_shards(dynamodb_resource, table_name: str, page_id: str,
+                            from_shard_count: int, to_shard_count: int = 1) -> int:
+    """
+    Migration helper: move the counts of shards [to_shard_count, from_shard_count)
+    into shard 0 and delete those shard items, in one transaction per shard.
+    Use it before lowering the shard count of a page, or with to_shard_count=1
+    to go back to the single "visit_count" item. Return the folded amount.
+    """
+    if not 1 <= to_shard_count <= from_shard_count:
+        raise ValueError("to_shard_count must be between 1 and from_shard_count")
+
+    shard_counts = read_visit_count_shards(dynamodb_resource, table_name, page_id, from_shard_count)
+    dynamodb_client = dynamodb_resource.meta.client
+    folded = 0
+    for shard in range(to_shard_count, from_shard_count):
+        count = shard_counts[shard]
+        if count == 0:
+            continue
+        # The condition makes the transaction fail if the shard moved meanwhile,
+        # so no increment can be lost between the read and the fold.
+        dynamodb_client.transact_write_items(TransactItems=[
+            {"Update": {"TableName": table_name,
+                        "Key": {"pkey_uuid": page_id},
+                        "UpdateExpression": "ADD #updateAttr1 :val",
+                        "ExpressionAttributeNames": {"#updateAttr1": "visit_count"},
+                        "ExpressionAttributeValues": {":val": count}}},
+            {"Delete": {"TableName": table_name,
+                        "Key": {"pkey_uuid": shard_key(page_id, shard)},
+                        "ConditionExpression": "#updateAttr1 = :seen",
+                        "ExpressionAttributeNames": {"#updateAttr1": "visit_count"},
+                        "ExpressionAttributeValues": {":seen": count}}},
+        ])
+        folded += count
+    return folded
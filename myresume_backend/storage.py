@@ -0,0 +1,261 @@
+"""
+Local storage engines of the visit counts.
+
+VisitCountStore is the interface of the storage engines. By default the
+counts live in DynamoDB (DynamoDBVisitCountStore of lambda_function).
+VISIT_COUNT_STORE selects a local engine instead:
+ - "memory": a dictionary of the process, for tests and benchmarks;
+ - "sqlite": an SQLite database file in WAL mode, for a single-node
+   deployment without any cloud dependency.
+
+SQLite serializes the write transactions, and each commit costs a WAL
+write. Concurrent increments are therefore committed in groups: the thread
+holding the commit lock applies every increment queued meanwhile in one
+transaction, and the other threads find their increment done once they get
+the lock (group commit, no background thread).
+"""
+
+import heapq
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class VisitCountStore(ABC):
+    """
+    Storage interface of the visit counts
+    """
+    @abstractmethod
+    def get(self, page_id: str) -> int:
+        """
+        Return the visit count of the page. Raise KeyError when the page does not exist.
+        """
+
+    @abstractmethod
+    def increment(self, page_id: str, delta: int = 1) -> int:
+        """
+        Add delta to the visit count of the page and return the new count.
+        Raise KeyError when the page does not exist.
+        """
+
+    @abstractmethod
+    def batch_get(self, page_ids: Iterable[str]) -> Tuple[Dict[str, int], List[str], List[str]]:
+        """
+        Return the counts by page-id, the page-ids not found and the
+        page-ids which could not be read (like batch_get_visit_counts).
+        """
+
+    @abstractmethod
+    def create_page(self, page_id: str, visit_count: int = 0) -> None:
+        """
+        Create the page with visit_count unless it already exists.
+        """
+
+    @abstractmethod
+    def top_pages(self, limit: int) -> Dict[str, int]:
+        """
+        Return the counts of the limit pages of highest count. Raise
+        ValueError when the store cannot rank that many pages.
+        """
+
+    def prewarm(self) -> None:
+        """
+        Do the startup work of the store up front (nothing by default).
+        """
+
+
+def _not_found(page_id: str) -> KeyError:
+    return KeyError(f'page {page_id} not found. Check again the page-id.')
+
+
+class MemoryVisitCountStore(VisitCountStore):
+    """
+    Visit counts in a dictionary of the process
+    """
+    def __init__(self, counts: Optional[Mapping[str, int]] = None):
+        """
+        Initialize the store with the given pages.
+        """
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = dict(counts or {})
+
+    def get(self, page_id: str) -> int:
+        with self._lock:
+            if page_id not in self._counts:
+                raise _not_found(page_id)
+            return self._counts[page_id]
+
+    def increment(self, page_id: str, delta: int = 1) -> int:
+        with self._lock:
+            if page_id not in self._counts:
+                raise _not_found(page_id)
+            self._counts[page_id] += delta
+            return self._counts[page_id]
+
+    def batch_get(self, page_ids: Iterable[str]) -> Tuple[Dict[str, int], List[str], List[str]]:
+        counts, missing = {}, []
+        with self._lock:
+            for page_id in dict.fromkeys(page_ids):
+                if page_id in self._counts:
+                    counts[page_id] = self._counts[page_id]
+                else:
+                    missing.append(page_id)
+        return counts, missing, []
+
+    def create_page(self, page_id: str, visit_count: int = 0) -> None:
+        with self._lock:
+            self._counts.setdefault(page_id, visit_count)
+
+    def top_pages(self, limit: int) -> Dict[str, int]:
+        with self._lock:
+            return dict(heapq.nlargest(limit, self._counts.items(), key=lambda entry: entry[1]))
+
+
+class _PendingIncrement:
+    """
+    Increment waiting for the next group commit
+    """
+    __slots__ = ("page_id", "delta", "done", "result", "error")
+
+    def __init__(self, page_id: str, delta: int):
+        self.page_id = page_id
+        self.delta = delta
+        self.done = False
+        self.result: Optional[int] = None
+        self.error: Optional[Exception] = None
+
+
+class SqliteVisitCountStore(VisitCountStore):
+    """
+    Visit counts in an SQLite database file (WAL mode, group commits)
+    """
+    # SQLite limits the number of variables of a statement
+    MAX_QUERY_VARIABLES = 500
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        """
+        Open (or create) the database. Each thread gets its own connection;
+        WAL lets the readers run while a group of increments is committed.
+        """
+        if path == ":memory:" or not path:
+            raise ValueError("SqliteVisitCountStore needs a database file, use MemoryVisitCountStore instead")
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._pending_lock = threading.Lock()
+        self._pending: List[_PendingIncrement] = []
+        self._commit_lock = threading.Lock()
+        # number of write transactions, to observe the grouping
+        self.commits = 0
+        self._connection().execute("CREATE TABLE IF NOT EXISTS visit_counts ("
+                                   "page_id TEXT PRIMARY KEY, visit_count INTEGER NOT NULL) WITHOUT ROWID")
+        # maintained by SQLite on every increment, read by top_pages
+        self._connection().execute("CREATE INDEX IF NOT EXISTS visit_counts_by_count "
+                                   "ON visit_counts (visit_count DESC, page_id)")
+
+    def _connection(self):
+        """
+        Return the connection of the calling thread, opened on first use.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            import sqlite3  # pylint: disable=import-outside-toplevel
+            # autocommit mode: the transactions are opened explicitly
+            connection = sqlite3.connect(self.path, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # with WAL, NORMAL only syncs at checkpoints: a power loss may lose
+            # the last commits, never corrupt the database
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.connection = connection
+        return connection
+
+    def get(self, page_id: str) -> int:
+        row = self._connection().execute("SELECT visit_count FROM visit_counts WHERE page_id = ?",
+                                         (page_id,)).fetchone()
+        if row is None:
+            raise _not_found(page_id)
+        return row[0]
+
+    def increment(self, page_id: str, delta: int = 1) -> int:
+        pending = _PendingIncrement(page_id, delta)
+        with self._pending_lock:
+            self._pending.append(pending)
+        with self._commit_lock:
+            # a previous holder of the lock may have committed this increment
+            if not pending.done:
+                with self._pending_lock:
+                    batch, self._pending = self._pending, []
+                self._commit(batch)
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _commit(self, batch: List[_PendingIncrement]) -> None:
+        """
+        Apply the increments of the batch in one transaction (commit lock held).
+        """
+        connection = self._connection()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for pending in batch:
+                row = connection.execute("UPDATE visit_counts SET visit_count = visit_count + ? "
+                                         "WHERE page_id = ? RETURNING visit_count",
+                                         (pending.delta, pending.page_id)).fetchone()
+                if row is None:
+                    pending.error = _not_found(pending.page_id)
+                else:
+                    pending.result = row[0]
+            connection.execute("COMMIT")
+            self.commits += 1
+        except Exception as commit_error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            for pending in batch:
+                pending.result, pending.error = None, commit_error
+        finally:
+            for pending in batch:
+                pending.done = True
+
+    def batch_get(self, page_ids: Iterable[str]) -> Tuple[Dict[str, int], List[str], List[str]]:
+        unique_page_ids = list(dict.fromkeys(page_ids))
+        counts = {}
+        connection = self._connection()
+        for chunk_start in range(0, len(unique_page_ids), self.MAX_QUERY_VARIABLES):
+            chunk = unique_page_ids[chunk_start:chunk_start + self.MAX_QUERY_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            counts.update(connection.execute(f"SELECT page_id, visit_count FROM visit_counts "
+                                             f"WHERE page_id IN ({placeholders})", chunk).fetchall())
+        missing = [page_id for page_id in unique_page_ids if page_id not in counts]
+        return {page_id: counts[page_id] for page_id in unique_page_ids if page_id in counts}, missing, []
+
+    def create_page(self, page_id: str, visit_count: int = 0) -> None:
+        with self._commit_lock:
+            self._connection().execute("INSERT OR IGNORE INTO visit_counts (page_id, visit_count) VALUES (?, ?)",
+                                       (page_id, visit_count))
+
+    def top_pages(self, limit: int) -> Dict[str, int]:
+        return dict(self._connection().execute("SELECT page_id, visit_count FROM visit_counts "
+                                               "ORDER BY visit_count DESC, page_id LIMIT ?", (limit,)).fetchall())
+
+
+def visit_count_store_from_environ(environ: Mapping[str, str]) -> Optional[VisitCountStore]:
+    """
+    Build the local store from the Lambda environment variables, or return
+    None when VISIT_COUNT_STORE is not set or "dynamodb" (DynamoDB table).
+    VISIT_COUNT_STORE_PAGES (JSON object of page-id to count) creates the
+    pages which do not exist yet.
+    """
+    engine = environ.get("VISIT_COUNT_STORE", "dynamodb")
+    if engine == "dynamodb":
+        return None
+    if engine == "memory":
+        store = MemoryVisitCountStore()
+    elif engine == "sqlite":
+        store = SqliteVisitCountStore(environ.get("VISIT_COUNT_SQLITE_PATH", "visit_counts.sqlite3"))
+    else:
+        raise ValueError(f"unknown VISIT_COUNT_STORE {engine!r}: use dynamodb, memory or sqlite")
+    for page_id, visit_count in json.loads(environ.get("VISIT_COUNT_STORE_PAGES", "{}")).items():
+        store.create_page(page_id, int(visit_count))
+    return store
@@ -0,0 +1,191 @@
+"""
+Most-visited pages, served from a materialized top-K index item.
+
+The table item "#top-pages" keeps a map of at most capacity candidate
+pages to their count ("top_pages"). An increment updates the index when the
+page enters it (the index is not full yet, or the page passed its lowest
+count) or when the indexed count of a member grew by refresh_ratio; the
+lowest member is evicted when the index is full. Most increments change
+nothing, and the warm execution environment decides so from its copy of the
+index, without any DynamoDB call.
+
+getTopPages reads the index and the exact counts of its members, so a
+query costs the same whatever the number of pages. The indexed counts may
+lag by refresh_ratio: keeping more candidates than the pages asked for
+(capacity > limit) absorbs this lag at the boundary of the top N.
+
+Concurrent index updates use optimistic concurrency on "top_pages_version",
+like the unique-visitor sketches.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional
+
+from sharding import SHARD_KEY_SEPARATOR
+
+
+TOP_PAGES_KEY = "#top-pages"
+MEMBERS_ATTRIBUTE = "top_pages"
+VERSION_ATTRIBUTE = "top_pages_version"
+
+DEFAULT_TOP_PAGES_LIMIT = 10
+MAX_UPDATE_ATTEMPTS = 5
+
+
+def merge_top_page(entries: Mapping[str, int], page_id: str, visit_count: int,
+                   capacity: int, refresh_ratio: float) -> Optional[Dict[str, int]]:
+    """
+    Return the index entries once page_id has visit_count, or None when the
+    index does not need to change.
+    """
+    indexed_count = entries.get(page_id)
+    if indexed_count is not None:
+        if visit_count < indexed_count + max(1, math.ceil(indexed_count * refresh_ratio)):
+            return None
+    elif len(entries) >= capacity and visit_count <= min(entries.values()):
+        return None
+    merged = dict(entries)
+    merged[page_id] = visit_count
+    if len(merged) > capacity:
+        del merged[min(merged, key=lambda member: (merged[member], member))]
+    return merged
+
+
+class TopPagesIndex:
+    """
+    Top-K index of the pages, with the copy kept by the warm environment
+    """
+    def __init__(self, capacity: int, refresh_ratio: float = 0.05, max_age_seconds: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the index of at most capacity pages. The copy of the
+        index is read again once older than max_age_seconds.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.refresh_ratio = refresh_ratio
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, int]] = None
+        self._loaded_at = 0.0
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> Optional["TopPagesIndex"]:
+        """
+        Build the index from the Lambda environment variables, or return None
+        when TOP_PAGES_CAPACITY is not set (getTopPages disabled).
+        """
+        capacity = int(environ.get("TOP_PAGES_CAPACITY", "0"))
+        if capacity <= 0:
+            return None
+        return cls(capacity=capacity,
+                   refresh_ratio=float(environ.get("TOP_PAGES_REFRESH_RATIO", "0.05")))
+
+    def _remember(self, entries: Dict[str, int]) -> None:
+        with self._lock:
+            self._entries, self._loaded_at = entries, self._clock()
+
+    def needs_update(self, page_id: str, visit_count: int) -> bool:
+        """
+        Return True when the index may have to change, according to the copy
+        of this environment (always when it has none or it is too old).
+        """
+        with self._lock:
+            if self._entries is None or self._clock() - self._loaded_at >= self.max_age_seconds:
+                return True
+            entries = self._entries
+        return merge_top_page(entries, page_id, visit_count, self.capacity, self.refresh_ratio) is not None
+
+    def read(self, dynamodb_client, table_name: str, consistent_read: bool = False) -> tuple:
+        """
+        Read the index entries and their version (0 when there is no index yet).
+        """
+        dbResponse = dynamodb_client.get_item(TableName=table_name,
+                                              Key={"pkey_uuid": {"S": TOP_PAGES_KEY}},
+                                              ConsistentRead=consistent_read)
+        item = dbResponse.get("Item")
+        if item is None:
+            entries, version = {}, 0
+        else:
+            entries = {page_id: int(value["N"]) for page_id, value in item[MEMBERS_ATTRIBUTE]["M"].items()}
+            version = int(item[VERSION_ATTRIBUTE]["N"])
+        self._remember(entries)
+        return entries, version
+
+    def write(self, dynamodb_client, table_name: str, entries: Dict[str, int], version: int) -> None:
+        """
+        Replace the index entries, on condition that its version is still
+        version. Raise ConditionalCheckFailedException otherwise.
+        """
+        if version == 0:
+            condition, expression_values = "attribute_not_exists(pkey_uuid)", None
+        else:
+            condition, expression_values = "#version = :version", {":version": {"N": str(version)}}
+        request = {"TableName": table_name,
+                   "Item": {"pkey_uuid": {"S": TOP_PAGES_KEY},
+                            MEMBERS_ATTRIBUTE: {"M": {page_id: {"N": str(visit_count)}
+                                                      for page_id, visit_count in entries.items()}},
+                            VERSION_ATTRIBUTE: {"N": str(version + 1)}},
+                   "ConditionExpression": condition}
+        if expression_values is not None:
+            request["ExpressionAttributeNames"] = {"#version": VERSION_ATTRIBUTE}
+            request["ExpressionAttributeValues"] = expression_values
+        dynamodb_client.put_item(**request)
+        self._remember(entries)
+
+    def record(self, dynamodb_client, table_name: str, page_id: str, visit_count: int) -> bool:
+        """
+        Update the index with the new count of the page. Return True when the
+        index was written.
+        """
+        if not self.needs_update(page_id, visit_count):
+            return False
+        for attempt in range(MAX_UPDATE_ATTEMPTS):
+            entries, version = self.read(dynamodb_client, table_name, consistent_read=attempt > 0)
+            merged = merge_top_page(entries, page_id, visit_count, self.capacity, self.refresh_ratio)
+            if merged is None:
+                return False
+            try:
+                self.write(dynamodb_client, table_name, merged, version)
+                return True
+            except dynamodb_client.exceptions.ConditionalCheckFailedException:
+                # another invocation updated the index meanwhile: merge again
+                continue
+        raise RuntimeError(f"the top pages index kept changing, page {page_id} was not recorded")
+
+    def rebuild(self, dynamodb_client, table_name: str) -> Dict[str, int]:
+        """
+        Rebuild the index from a full scan of the table (e.g. when enabling
+        it on an existing table): the shards are added to their page, the
+        other internal items ("#..." keys) are skipped. Return the entries.
+        """
+        counts: Dict[str, int] = {}
+        scan_arguments = {"TableName": table_name, "ProjectionExpression": "pkey_uuid, visit_count"}
+        while True:
+            dbResponse = dynamodb_client.scan(**scan_arguments)
+            for item in dbResponse.get("Items", []):
+                key = item["pkey_uuid"]["S"]
+                page_id = key.split(SHARD_KEY_SEPARATOR)[0]
+                if "#" in page_id or "visit_count" not in item:
+                    continue
+                counts[page_id] = counts.get(page_id, 0) + int(item["visit_count"]["N"])
+            if "LastEvaluatedKey" not in dbResponse:
+                break
+            scan_arguments["ExclusiveStartKey"] = dbResponse["LastEvaluatedKey"]
+
+        top = sorted(counts.items(), key=lambda entry: (-entry[1], entry[0]))[:self.capacity]
+        _, version = self.read(dynamodb_client, table_name, consistent_read=True)
+        self.write(dynamodb_client, table_name, dict(top), version)
+        return dict(top)
+
+
+def rank_top_pages(counts: Mapping[str, int], limit: int) -> list:
+    """
+    Return the limit pages of highest count, as [{"pageId", "visit_count"}].
+    """
+    ranked = sorted(counts.items(), key=lambda entry: (-entry[1], entry[0]))[:limit]
+    return [{"pageId": page_id, "visit_count": visit_count} for page_id, visit_count in ranked]
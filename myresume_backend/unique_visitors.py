@@ -0,0 +1,191 @@
+"""
+Unique-visitor estimation with a HyperLogLog sketch per page.
+
+Each page item keeps a fixed-size binary sketch ("unique_visitors_hll",
+one byte per register) next to its "visit_count". A visit hashes the
+visitor (source IP + user-agent) into one register; the sketch is only
+written back when that register grows, which stops happening for repeat
+visitors, so reloads and bots neither inflate the estimate nor cost writes.
+
+Concurrent updates are merged with optimistic concurrency: the sketch is
+written with a condition on its version ("unique_visitors_version") and, when
+another invocation won the race, re-read and re-applied.
+"""
+
+import hashlib
+import math
+from typing import Mapping, Optional
+
+
+SKETCH_ATTRIBUTE = "unique_visitors_hll"
+VERSION_ATTRIBUTE = "unique_visitors_version"
+
+MAX_UPDATE_ATTEMPTS = 5
+
+
+class UniqueVisitorConfig:
+    """
+    Precision of the HyperLogLog sketches of new pages
+    """
+    def __init__(self, precision: int = 11):
+        """
+        Initialize the configuration. A sketch has 2**precision one-byte
+        registers, with a standard error of about 1.04 / sqrt(2**precision).
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> Optional["UniqueVisitorConfig"]:
+        """
+        Build the configuration from the Lambda environment variables, or
+        return None when UNIQUE_VISITORS_PRECISION is not set (estimation disabled).
+        """
+        precision = int(environ.get("UNIQUE_VISITORS_PRECISION", "0"))
+        if precision <= 0:
+            return None
+        return cls(precision=precision)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch with 64-bit hashes and one byte per register
+    """
+    def __init__(self, precision: int = 11, registers: Optional[bytes] = None):
+        """
+        Initialize an empty sketch, or load the registers of a stored one.
+        """
+        self.precision = precision
+        self.register_count = 1 << precision
+        self.registers = bytearray(registers if registers is not None else self.register_count)
+        if len(self.registers) != self.register_count:
+            raise ValueError(f"a sketch of precision {precision} has {self.register_count} registers")
+
+    @classmethod
+    def from_bytes(cls, registers: bytes) -> "HyperLogLog":
+        """
+        Load a stored sketch; its precision is given by its size.
+        """
+        precision = len(registers).bit_length() - 1
+        if len(registers) != 1 << precision:
+            raise ValueError("the size of a sketch must be a power of two")
+        return cls(precision, registers)
+
+    def to_bytes(self) -> bytes:
+        """
+        Return the registers, the stored form of the sketch.
+        """
+        return bytes(self.registers)
+
+    def add(self, value_hash: int) -> bool:
+        """
+        Add a 64-bit hash to the sketch. Return True when a register grew,
+        i.e. when the stored sketch must be updated.
+        """
+        index = value_hash >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remainder = value_hash & ((1 << remaining_bits) - 1)
+        # position of the leftmost 1-bit of the remaining bits
+        rank = remaining_bits - remainder.bit_length() + 1
+        if rank <= self.registers[index]:
+            return False
+        self.registers[index] = rank
+        return True
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        Merge another sketch of the same precision into this one.
+        """
+        if other.precision != self.precision:
+            raise ValueError("only sketches of the same precision can be merged")
+        self.registers = bytearray(max(pair) for pair in zip(self.registers, other.registers))
+
+    def estimate(self) -> int:
+        """
+        Return the estimated number of distinct values added.
+        """
+        register_count = self.register_count
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(register_count, 0.7213 / (1 + 1.079 / register_count))
+        raw_estimate = alpha * register_count * register_count / sum(2.0 ** -rank for rank in self.registers)
+        empty_registers = self.registers.count(0)
+        if raw_estimate <= 2.5 * register_count and empty_registers:
+            # small range correction: linear counting
+            return round(register_count * math.log(register_count / empty_registers))
+        return round(raw_estimate)
+
+
+def visitor_hash(source_ip: str, user_agent: str) -> int:
+    """
+    Return the 64-bit hash identifying a visitor.
+    """
+    digest = hashlib.blake2b(f"{source_ip}\n{user_agent}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def read_unique_visitor_sketch(dynamodb_client, table_name: str, page_id: str,
+                               precision: int, consistent_read: bool = False) -> tuple:
+    """
+    Read the sketch of the page and its version (0 and an empty sketch of the
+    given precision when the page has none yet). Raise KeyError when the
+    page does not exist.
+    """
+    dbResponse = dynamodb_client.get_item(TableName=table_name,
+                                          Key={"pkey_uuid": {"S": page_id}},
+                                          ProjectionExpression="#visitCount, #sketch, #version",
+                                          ExpressionAttributeNames={"#visitCount": "visit_count",
+                                                                    "#sketch": SKETCH_ATTRIBUTE,
+                                                                    "#version": VERSION_ATTRIBUTE},
+                                          ConsistentRead=consistent_read)
+    item = dbResponse.get("Item")
+    if item is None:
+        raise KeyError(f"page {page_id} not found. Check again the page-id.")
+    if SKETCH_ATTRIBUTE not in item:
+        return HyperLogLog(precision), 0
+    return HyperLogLog.from_bytes(item[SKETCH_ATTRIBUTE]["B"]), int(item[VERSION_ATTRIBUTE]["N"])
+
+
+def add_unique_visitor(dynamodb_client, table_name: str, page_id: str,
+                       value_hash: int, precision: int) -> bool:
+    """
+    Add a visitor hash to the sketch of the page. Return True when the stored
+    sketch was updated, False when the visitor did not change it.
+    """
+    for attempt in range(MAX_UPDATE_ATTEMPTS):
+        # A stale first read only costs a retry, the version check catches it
+        sketch, version = read_unique_visitor_sketch(dynamodb_client, table_name, page_id, precision,
+                                                     consistent_read=attempt > 0)
+        if not sketch.add(value_hash):
+            return False
+        if version == 0:
+            # first sketch of the page, which must exist
+            condition = "attribute_exists(#visitCount) AND attribute_not_exists(#version)"
+            expression_names = {"#visitCount": "visit_count"}
+            expression_values = {}
+        else:
+            condition = "#version = :version"
+            expression_names = {}
+            expression_values = {":version": {"N": str(version)}}
+        expression_names.update({"#sketch": SKETCH_ATTRIBUTE, "#version": VERSION_ATTRIBUTE})
+        expression_values.update({":sketch": {"B": sketch.to_bytes()},
+                                  ":newVersion": {"N": str(version + 1)}})
+        try:
+            dynamodb_client.update_item(TableName=table_name,
+                                        Key={"pkey_uuid": {"S": page_id}},
+                                        UpdateExpression="SET #sketch = :sketch, #version = :newVersion",
+                                        ConditionExpression=condition,
+                                        ExpressionAttributeNames=expression_names,
+                                        ExpressionAttributeValues=expression_values)
+            return True
+        except dynamodb_client.exceptions.ConditionalCheckFailedException:
+            # another invocation updated the sketch meanwhile: merge again
+            continue
+    raise RuntimeError(f"the sketch of page {page_id} kept changing, the visitor was not added")
+
+
+def estimate_unique_visitors(dynamodb_client, table_name: str, page_id: str) -> int:
+    """
+    Return the estimated number of unique visitors of the page.
+    """
+    sketch, _ = read_unique_visitor_sketch(dynamodb_client, table_name, page_id, precision=4)
+    return sketch.estimate()
@@ -0,0 +1,66 @@
+"""
+Request/response validation with precompiled JSON schemas.
+
+The schemas of schemas.py are compiled with fastjsonschema once per
+execution environment (on first use, or ahead of time with prewarm()), and
+the compiled validators are reused by every invocation.
+"""
+
+from typing import Any, Callable, Dict
+
+from schemas import INPUT_SCHEMA, OUTPUT_SCHEMA
+
+
+class SchemaValidationError(ValueError):
+    """
+    Raised when an event or a response does not match its schema
+    """
+
+
+_COMPILED_VALIDATORS: Dict[str, Callable[[Any], Any]] = {}
+
+
+def _compiled_validator(name: str) -> Callable[[Any], Any]:
+    """
+    Return the compiled validator of INPUT_SCHEMA ("input") or OUTPUT_SCHEMA
+    ("output"), compiling it on first use.
+    """
+    compiled_validator = _COMPILED_VALIDATORS.get(name)
+    if compiled_validator is None:
+        import fastjsonschema
+        schema = INPUT_SCHEMA if name == "input" else OUTPUT_SCHEMA
+        compiled_validator = _COMPILED_VALIDATORS[name] = fastjsonschema.compile(schema)
+    return compiled_validator
+
+
+def prewarm() -> None:
+    """
+    Compile both schemas ahead of the first invocation.
+    """
+    _compiled_validator("input")
+    _compiled_validator("output")
+
+
+def _validate(name: str, data: Any) -> None:
+    """
+    Validate data with the named compiled validator.
+    """
+    import fastjsonschema
+    try:
+        _compiled_validator(name)(data)
+    except fastjsonschema.JsonSchemaException as schema_error:
+        raise SchemaValidationError(schema_error.message) from schema_error
+
+
+def validate_request(event: Any) -> None:
+    """
+    Validate an API Gateway event against INPUT_SCHEMA.
+    """
+    _validate("input", event)
+
+
+def validate_response(response: Any) -> None:
+    """
+    Validate a handler response against OUTPUT_SCHEMA.
+    """
+    _validate("output", response)
@@ -0,0 +1,168 @@
+"""
+In-process write-coalescing buffer for the visitor increments.
+
+Like the DynamoDB resource kept in global scope, the buffer lives as long as
+the warm Lambda execution environment. Increments are collected per page and
+persisted as a single "add delta" update when a size, age or remaining-time
+threshold is reached, which saves write units under bursty traffic.
+
+Pending increments only live in memory: the buffer is flushed before the
+invocation ends when little time is left, during the next invocation once
+the age threshold passed (e.g. after the environment was frozen), and on
+SIGTERM/interpreter exit. If the environment is shut down without any signal,
+at most max_pending increments are lost.
+
+The persisted counts are kept for at most max_pages pages, least recently
+used first out; the next hit of an evicted page is written at once again.
+
+The buffer is shared by the threads of the local HTTP server: flushes are
+serialized, so that a first hit of a page waits for the write of the delta
+another thread already took out of the buffer, instead of finding its page
+neither pending nor persisted.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Mapping, Optional
+
+
+class VisitCountWriteBuffer:
+    """
+    Per-page delta map of the increments not yet written to the database
+    """
+    def __init__(self, max_pending: int, max_age_seconds: float = 5.0,
+                 min_remaining_time_ms: int = 500, max_pages: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize an empty buffer. max_pending is the number of buffered
+        increments (all pages together) which triggers a flush, max_pages the
+        number of pages whose persisted count is remembered.
+        """
+        if max_pages < 1:
+            raise ValueError("max_pages must be at least 1")
+        self.max_pending = max_pending
+        self.max_pages = max_pages
+        self.max_age_seconds = max_age_seconds
+        self.min_remaining_time_ms = min_remaining_time_ms
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, int] = {}
+        # page-id -> last persisted count, least recently used first
+        self._persisted: "OrderedDict[str, int]" = OrderedDict()
+        self._oldest_pending_time: Optional[float] = None
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> Optional["VisitCountWriteBuffer"]:
+        """
+        Build the buffer from the Lambda environment variables, or return None
+        when VISIT_COUNT_WRITE_BUFFER_MAX_PENDING is not set (buffering disabled).
+        """
+        max_pending = int(environ.get("VISIT_COUNT_WRITE_BUFFER_MAX_PENDING", "0"))
+        if max_pending <= 0:
+            return None
+        return cls(max_pending=max_pending,
+                   max_age_seconds=float(environ.get("VISIT_COUNT_WRITE_BUFFER_MAX_AGE_SECONDS", "5")),
+                   min_remaining_time_ms=int(environ.get("VISIT_COUNT_WRITE_BUFFER_MIN_REMAINING_MS", "500")),
+                   max_pages=int(environ.get("VISIT_COUNT_WRITE_BUFFER_MAX_PAGES", "1024")))
+
+    def add(self, page_id: str, delta: int = 1) -> None:
+        """
+        Buffer an increment of the given page.
+        """
+        with self._lock:
+            self._pending[page_id] = self._pending.get(page_id, 0) + delta
+            if self._oldest_pending_time is None:
+                self._oldest_pending_time = self._clock()
+
+    def discard(self, page_id: str, delta: int = 1) -> None:
+        """
+        Take back a buffered increment of the page.
+        """
+        with self._lock:
+            remaining = self._pending.get(page_id, 0) - delta
+            if remaining > 0:
+                self._pending[page_id] = remaining
+            else:
+                self._pending.pop(page_id, None)
+            if not self._pending:
+                self._oldest_pending_time = None
+
+    def is_persisted(self, page_id: str) -> bool:
+        """
+        Return True when the persisted count of the page is known.
+        """
+        with self._lock:
+            return page_id in self._persisted
+
+    def pending_count(self) -> int:
+        """
+        Return the number of buffered increments of all pages.
+        """
+        with self._lock:
+            return sum(self._pending.values())
+
+    def current_count(self, page_id: str) -> int:
+        """
+        Return the last persisted count of the page plus its pending delta.
+        """
+        with self._lock:
+            visit_count = self._persisted[page_id] + self._pending.get(page_id, 0)
+            self._persisted.move_to_end(page_id)
+            return visit_count
+
+    def is_due(self, remaining_time_ms: Optional[int] = None) -> bool:
+        """
+        Return True when the buffer should be flushed: too many pending
+        increments, oldest increment too old, or invocation about to time out.
+        """
+        with self._lock:
+            if not self._pending:
+                return False
+            if sum(self._pending.values()) >= self.max_pending:
+                return True
+            if self._clock() - self._oldest_pending_time >= self.max_age_seconds:
+                return True
+        return remaining_time_ms is not None and remaining_time_ms < self.min_remaining_time_ms
+
+    def flush(self, persist: Callable[[str, int], int]) -> Dict[str, Exception]:
+        """
+        Write every pending delta with persist(page_id, delta), which returns
+        the new persisted count, and return the errors by page-id.
+        A failed delta of a known page is kept for the next flush, while the
+        delta of a page which was never persisted (e.g. unknown page-id) is
+        dropped. A flush waits for the flush in progress in another thread.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._oldest_pending_time = None
+
+            errors = {}
+            for page_id, delta in pending.items():
+                try:
+                    new_count = persist(page_id, delta)
+                except Exception as persist_error:
+                    errors[page_id] = persist_error
+                    if self.is_persisted(page_id):
+                        self.add(page_id, delta)
+                    continue
+                with self._lock:
+                    self._persisted[page_id] = new_count
+                    self._persisted.move_to_end(page_id)
+                    self._evict_persisted()
+            return errors
+
+    def _evict_persisted(self) -> None:
+        """
+        Forget the least recently used persisted counts beyond max_pages (lock
+        held). The count of a page with a pending delta is kept, as it is
+        needed to answer with persisted + pending.
+        """
+        excess = len(self._persisted) - self.max_pages
+        if excess <= 0:
+            return
+        evicted = [page_id for page_id in self._persisted if page_id not in self._pending][:excess]
+        for page_id in evicted:
+            del self._persisted[page_id]
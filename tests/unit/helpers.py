@@ -0,0 +1,15 @@
+"""
+Helpers shared by the unit tests
+"""
+
+
+class FakeClock:
+    """
+    Manually advanced clock, passed as the clock of the warm-environment
+    components (TTLs, ages, timeouts and windows)
+    """
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
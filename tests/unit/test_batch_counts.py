@@ -0,0 +1,117 @@
+import sys
+import os
+import json
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import getVisitorsCounts
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.batch_counts import batch_get_items          # pylint: disable=wrong-import-position
+from myresume_backend.sharding import ShardConfig, shard_key       # pylint: disable=wrong-import-position
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestBatchCounts(TestCase):
+    """
+    Test class for the batch counts endpoint backed by BatchGetItem
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish the "GLOBAL" environment for use in tests.
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name,
+                                     "shard_config" : ShardConfig(page_shard_counts={"page-sharded": 2}) }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+
+
+    def test_getVisitorsCounts_found_and_missing(self) -> None:
+        """
+        Verify the counts of existing pages (including sharded pages) are
+        returned, and unknown pages are reported as missing, not as errors.
+        """
+        table = self.mocked_dynamodb_class.table
+        table.put_item(Item={"pkey_uuid": "page-a", "visit_count": 42})
+        table.put_item(Item={"pkey_uuid": "page-sharded", "visit_count": 10})
+        table.put_item(Item={"pkey_uuid": shard_key("page-sharded", 1), "visit_count": 5})
+
+        test_return_value = getVisitorsCounts(dynamo_db=self.mocked_dynamodb_class,
+                                              page_ids=["page-a", "page-sharded", "page-unknown"])
+        body = json.loads(test_return_value["body"])
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 200)
+        self.assertEqual(body, {"counts": {"page-a": 42, "page-sharded": 15},
+                                "missing": ["page-unknown"], "errors": []})
+
+
+    def test_batch_get_items_chunks_of_100(self) -> None:
+        """
+        Verify more than 100 keys are read in chunks of at most 100 keys.
+        """
+        with self.mocked_dynamodb_class.table.batch_writer() as batch:
+            for index in range(250):
+                batch.put_item(Item={"pkey_uuid": f"page-{index}", "visit_count": index})
+
+        dynamodb_resource = self.mocked_dynamodb_class.resource
+        with patch.object(dynamodb_resource, "batch_get_item",
+                          wraps=dynamodb_resource.batch_get_item) as patch_batch_get_item:
+            items, unprocessed = batch_get_items(dynamodb_resource, self.test_ddb_table_name,
+                                                 [f"page-{index}" for index in range(250)])
+
+        # Assertion
+        self.assertEqual(len(items), 250)
+        self.assertEqual(unprocessed, set())
+        self.assertEqual([len(call.kwargs["RequestItems"][self.test_ddb_table_name]["Keys"])
+                          for call in patch_batch_get_item.call_args_list], [100, 100, 50])
+
+
+    @patch("myresume_backend.batch_counts.time.sleep")
+    def test_unprocessed_keys_retried_then_reported(self, patch_sleep : MagicMock) -> None:
+        """
+        Verify UnprocessedKeys are retried with backoff, and reported as errors
+        when they are still unprocessed after all attempts.
+        """
+        unprocessed_page = {self.test_ddb_table_name: {"Keys": [{"pkey_uuid": "page-b"}]}}
+        mocked_resource = MagicMock()
+        mocked_resource.batch_get_item.side_effect = (
+            [{"Responses": {self.test_ddb_table_name: [{"pkey_uuid": "page-a", "visit_count": 1}]},
+              "UnprocessedKeys": unprocessed_page}]
+            + [{"Responses": {}, "UnprocessedKeys": unprocessed_page}] * 4)
+
+        items, unprocessed = batch_get_items(mocked_resource, self.test_ddb_table_name,
+                                             ["page-a", "page-b"])
+
+        # Assertion
+        self.assertEqual(list(items), ["page-a"])
+        self.assertEqual(unprocessed, {"page-b"})
+        self.assertEqual(mocked_resource.batch_get_item.call_count, 5)
+        self.assertEqual(patch_sleep.call_count, 4)
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
@@ -0,0 +1,186 @@
+import sys
+import os
+import io
+import json
+import zlib
+from unittest import TestCase
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import _AWS_REGION   # pylint: disable=wrong-import-position
+from myresume_backend.bulk import export_table, import_items, write_batch, Progress   # pylint: disable=wrong-import-position
+from myresume_backend.sharding import ShardConfig, read_visit_count_shards, shard_key
+
+
+class SegmentedScanClient:
+    """
+    moto ignores Segment/TotalSegments: split its scans by a hash of the key
+    """
+    def __init__(self, dynamodb_client):
+        self._client = dynamodb_client
+        self.scanned_segments = []
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def scan(self, Segment, TotalSegments, **kwargs):  # pylint: disable=invalid-name
+        self.scanned_segments.append(Segment)
+        dbResponse = self._client.scan(**kwargs)
+        dbResponse["Items"] = [item for item in dbResponse["Items"]
+                               if zlib.crc32(item["pkey_uuid"]["S"].encode()) % TotalSegments == Segment]
+        return dbResponse
+
+
+class ThrottlingClient:
+    """
+    Client leaving the first item of each BatchWriteItem unprocessed, a
+    given number of times
+    """
+    def __init__(self, dynamodb_client, throttles: int):
+        self._client = dynamodb_client
+        self.throttles = throttles
+        self.calls = 0
+
+    def batch_write_item(self, RequestItems):  # pylint: disable=invalid-name
+        self.calls += 1
+        (table_name, requests), = RequestItems.items()
+        if self.throttles > 0:
+            self.throttles -= 1
+            if requests[1:]:
+                self._client.batch_write_item(RequestItems={table_name: requests[1:]})
+            return {"UnprocessedItems": {table_name: requests[:1]}}
+        return self._client.batch_write_item(RequestItems=RequestItems)
+
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestBulk(TestCase):
+    """
+    Test class for the bulk export and import of the table
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct (mocked!) DynamoDB tables
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        for table_name in (self.test_ddb_table_name, "restored_ddb"):
+            dynamodb.create_table(
+                TableName = table_name,
+                KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+                BillingMode='PAY_PER_REQUEST'
+                )
+        self.dynamodb_client = client("dynamodb", region_name=_AWS_REGION)
+        with dynamodb.Table(self.test_ddb_table_name).batch_writer() as batch:
+            for index in range(60):
+                batch.put_item(Item={"pkey_uuid": f"page-{index:02d}", "visit_count": index})
+        self.dynamodb_client.put_item(TableName=self.test_ddb_table_name,
+                                      Item={"pkey_uuid": {"S": "page-00"}, "visit_count": {"N": "7"},
+                                            "unique_visitors_hll": {"B": b"\x00\x01\xff"}})
+
+
+    def scan_table(self, table_name: str) -> dict:
+        return {item["pkey_uuid"]["S"]: item for item in self.dynamodb_client.scan(TableName=table_name)["Items"]}
+
+
+    def test_export_import_round_trip(self) -> None:
+        """
+        Verify every item is exported once from the parallel segments and
+        imported identically, binary attributes included.
+        """
+        scan_client = SegmentedScanClient(self.dynamodb_client)
+        output = io.StringIO()
+        progress = Progress("test", stream=io.StringIO())
+
+        exported = export_table(scan_client, self.test_ddb_table_name, output, segments=4, progress=progress)
+        imported = import_items(self.dynamodb_client, "restored_ddb", io.StringIO(output.getvalue()),
+                                workers=2)
+
+        # Assertion
+        self.assertEqual(exported, 60)
+        self.assertEqual(progress.items, 60)
+        self.assertEqual(sorted(scan_client.scanned_segments), [0, 1, 2, 3])
+        self.assertEqual(len(output.getvalue().splitlines()), 60)
+        self.assertEqual(imported, 60)
+        self.assertEqual(self.scan_table("restored_ddb"), self.scan_table(self.test_ddb_table_name))
+
+
+    def test_import_resets_counts(self) -> None:
+        """
+        Verify {"pageId", "visit_count"} lines create or reset the pages, and
+        a repeated page in one batch keeps its last line.
+        """
+        lines = [json.dumps({"pageId": "page-00", "visit_count": 0}),
+                 "",
+                 json.dumps({"pageId": "new-page", "visit_count": 1}),
+                 json.dumps({"pageId": "new-page", "visit_count": 5})]
+
+        imported = import_items(self.dynamodb_client, self.test_ddb_table_name, lines)
+        items = self.scan_table(self.test_ddb_table_name)
+
+        # Assertion
+        self.assertEqual(imported, 2)
+        self.assertEqual(items["page-00"], {"pkey_uuid": {"S": "page-00"}, "visit_count": {"N": "0"}})
+        self.assertEqual(items["new-page"]["visit_count"], {"N": "5"})
+
+
+    def test_import_resets_sharded_page(self) -> None:
+        """
+        Verify a pageId line deletes the shards of a sharded page, so that
+        its total count is the one of the line.
+        """
+        for shard in (1, 3):
+            self.dynamodb_client.put_item(TableName=self.test_ddb_table_name,
+                                          Item={"pkey_uuid": {"S": shard_key("page-01", shard)},
+                                                "visit_count": {"N": "100"}})
+        lines = [json.dumps({"pageId": "page-01", "visit_count": 5})]
+        lines += [json.dumps({"pageId": f"page-{index:02d}", "visit_count": 0}) for index in range(10, 20)]
+
+        imported = import_items(self.dynamodb_client, self.test_ddb_table_name, lines,
+                                shard_config=ShardConfig(default_shard_count=4))
+        shard_counts = read_visit_count_shards(resource("dynamodb", region_name=_AWS_REGION),
+                                               self.test_ddb_table_name, "page-01", 4)
+
+        # Assertion
+        self.assertEqual(imported, 11)
+        self.assertEqual(shard_counts, {0: 5, 1: 0, 2: 0, 3: 0})
+        self.assertNotIn(shard_key("page-01", 3), self.scan_table(self.test_ddb_table_name))
+
+
+    def test_write_batch_retries_unprocessed_items(self) -> None:
+        """
+        Verify unprocessed items are retried with backoff, and reported once
+        the attempts are exhausted.
+        """
+        items = [{"PutRequest": {"Item": {"pkey_uuid": {"S": f"retried-{index}"}, "visit_count": {"N": "1"}}}}
+                 for index in range(3)]
+        delays = []
+        throttling_client = ThrottlingClient(self.dynamodb_client, throttles=2)
+
+        written = write_batch(throttling_client, self.test_ddb_table_name, items, sleep=delays.append)
+
+        # Assertion
+        self.assertEqual(written, 3)
+        self.assertEqual(throttling_client.calls, 3)
+        self.assertEqual(len(delays), 2)
+        self.assertEqual(len([key for key in self.scan_table(self.test_ddb_table_name)
+                              if key.startswith("retried-")]), 3)
+        with self.assertRaises(RuntimeError):
+            write_batch(ThrottlingClient(self.dynamodb_client, throttles=100), self.test_ddb_table_name,
+                        items, sleep=delays.append)
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Tables
+        for table_name in (self.test_ddb_table_name, "restored_ddb"):
+            self.dynamodb_client.delete_table(TableName = table_name)
@@ -0,0 +1,249 @@
+import sys
+import os
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from boto3 import resource, client
+from botocore.exceptions import ClientError
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import getVisitorsCount
+from myresume_backend.lambda_function import addOneVisitorCount
+from myresume_backend.lambda_function import _create_dynamodb_resource
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.read_cache import VisitCountReadCache         # pylint: disable=wrong-import-position
+from myresume_backend.write_buffer import VisitCountWriteBuffer      # pylint: disable=wrong-import-position
+from tests.unit.helpers import FakeClock   # pylint: disable=wrong-import-position
+# The handler imports its sibling modules by name: use the same module, so
+# that the errors raised by the breaker are the classes the handler catches
+from circuit_breaker import CircuitBreaker, CircuitOpenError, DependencyUnavailableError   # pylint: disable=wrong-import-position
+from circuit_breaker import CLOSED, OPEN, HALF_OPEN
+from increment_queue import SqsIncrementQueue   # pylint: disable=wrong-import-position
+
+
+def throttling_error(*args, **kwargs):
+    """
+    Raise the error of a DynamoDB call throttled even after the retries.
+    """
+    raise ClientError({"Error": {"Code": "ProvisionedThroughputExceededException",
+                                 "Message": "Rate of requests exceeds the allowed throughput"}}, "GetItem")
+
+
+class TestCircuitBreaker(TestCase):
+    """
+    Test class for the state machine of the circuit breaker
+    """
+
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.transitions = []
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=10, clock=self.clock,
+                                      on_state_change=lambda old, new: self.transitions.append(new))
+
+
+    def test_from_environ_disabled_by_default(self) -> None:
+        """
+        Verify the breaker is disabled unless a failure threshold is configured.
+        """
+        self.assertIsNone(CircuitBreaker.from_environ({}))
+        self.assertEqual(CircuitBreaker.from_environ({"DYNAMODB_BREAKER_FAILURE_THRESHOLD": "3"}).failure_threshold, 3)
+
+
+    def test_opens_after_consecutive_failures(self) -> None:
+        """
+        Verify the breaker opens after failure_threshold throttles in a row,
+        and fails fast while open.
+        """
+        self.assertRaises(DependencyUnavailableError, self.breaker.call, throttling_error)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertRaises(DependencyUnavailableError, self.breaker.call, throttling_error)
+
+        # Assertion
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertRaises(CircuitOpenError, self.breaker.call, lambda: 42)
+        self.assertEqual(self.breaker.open_count, 1)
+
+
+    def test_other_errors_do_not_open(self) -> None:
+        """
+        Verify errors answered by DynamoDB (e.g. an unknown page-id) reset the
+        failure count and are raised as is.
+        """
+        def unknown_page():
+            raise KeyError("page")
+
+        self.assertRaises(DependencyUnavailableError, self.breaker.call, throttling_error)
+        self.assertRaises(KeyError, self.breaker.call, unknown_page)
+        self.assertRaises(DependencyUnavailableError, self.breaker.call, throttling_error)
+
+        # Assertion
+        self.assertEqual(self.breaker.state, CLOSED)
+
+
+    def test_half_open_trial(self) -> None:
+        """
+        Verify a single trial call is let through after the reset timeout:
+        its failure opens the breaker again, its success closes it.
+        """
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.clock.now = 20
+        self.assertEqual(self.breaker.call(lambda: 42), 42)
+
+        # Assertion
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.transitions, [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED])
+
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestDegradedResponses(TestCase):
+    """
+    Test class for the stale responses served while DynamoDB is unavailable
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish the "GLOBAL" environment for use in tests.
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name  }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": "12345678-1234-5678-1234-56781234",
+                                                        "visit_count":42
+                                                        })
+
+        # Breaker and stale-only read cache, as configured by the environment
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30)
+        self.stale_cache = VisitCountReadCache(ttl_seconds=0, keep_stale=True)
+        self.patches = [patch("myresume_backend.lambda_function._DYNAMODB_CIRCUIT_BREAKER", self.breaker),
+                        patch("myresume_backend.lambda_function._VISIT_COUNT_READ_CACHE", self.stale_cache)]
+        for test_patch in self.patches:
+            test_patch.start()
+
+
+    def test_throttled_reads_return_stale_count(self) -> None:
+        """
+        Verify throttled reads are answered with the last known count marked
+        stale, and unknown counts with 503.
+        """
+        fresh_return_value = getVisitorsCount(dynamo_db=self.mocked_dynamodb_class,
+                                              page_id="12345678-1234-5678-1234-56781234")
+        with patch("myresume_backend.lambda_function.get_visit_count", side_effect=throttling_error):
+            stale_return_values = [getVisitorsCount(dynamo_db=self.mocked_dynamodb_class,
+                                                    page_id="12345678-1234-5678-1234-56781234")
+                                   for _ in range(3)]
+            unknown_return_value = getVisitorsCount(dynamo_db=self.mocked_dynamodb_class,
+                                                    page_id="NOTVALID-1234-5678-1234-56781234")
+
+        # Assertion
+        self.assertNotIn("headers", fresh_return_value)
+        for stale_return_value in stale_return_values:
+            self.assertEqual(stale_return_value["statusCode"], 200)
+            self.assertEqual(stale_return_value["body"], "42")
+            self.assertEqual(stale_return_value["headers"]["X-Visit-Count-Stale"], "true")
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(unknown_return_value["statusCode"], 503)
+        self.assertEqual(unknown_return_value["headers"]["Retry-After"], "30")
+
+
+    def test_increment_while_open_returns_stale_count(self) -> None:
+        """
+        Verify increments fail fast while the breaker is open, without
+        writing to DynamoDB.
+        """
+        addOneVisitorCount(dynamo_db=self.mocked_dynamodb_class, page_id="12345678-1234-5678-1234-56781234")
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        test_return_value = addOneVisitorCount(dynamo_db=self.mocked_dynamodb_class,
+                                               page_id="12345678-1234-5678-1234-56781234")
+
+        # Assertion
+        self.assertEqual(test_return_value["body"], "43")
+        self.assertEqual(test_return_value["headers"]["X-Visit-Count-Stale"], "true")
+        self.assertEqual(self.mocked_dynamodb_class.table.get_item(
+            Key={"pkey_uuid": "12345678-1234-5678-1234-56781234"})["Item"]["visit_count"], 43)
+
+
+    def test_throttled_buffered_increment_not_kept(self) -> None:
+        """
+        Verify a buffered increment answered as not counted (stale) is not
+        written by the next flush either.
+        """
+        write_buffer = VisitCountWriteBuffer(max_pending=1)
+        with patch("myresume_backend.lambda_function._VISIT_COUNT_WRITE_BUFFER", write_buffer):
+            addOneVisitorCount(dynamo_db=self.mocked_dynamodb_class, page_id="12345678-1234-5678-1234-56781234")
+            with patch("myresume_backend.lambda_function.add_visit_count_delta", side_effect=throttling_error):
+                test_return_value = addOneVisitorCount(dynamo_db=self.mocked_dynamodb_class,
+                                                       page_id="12345678-1234-5678-1234-56781234")
+
+        # Assertion
+        self.assertEqual(test_return_value["headers"]["X-Visit-Count-Stale"], "true")
+        self.assertEqual(write_buffer.pending_count(), 0)
+
+
+    def test_failed_queue_send_is_not_a_dynamodb_failure(self) -> None:
+        """
+        Verify an increment which could not be queued is answered with 503
+        and leaves the DynamoDB breaker alone.
+        """
+        sqs_client = MagicMock()
+        sqs_client.send_message.side_effect = throttling_error
+        with patch("myresume_backend.lambda_function._VISIT_COUNT_INCREMENT_QUEUE",
+                   SqsIncrementQueue("https://sqs.example/queue", lambda: sqs_client)):
+            test_return_value = addOneVisitorCount(dynamo_db=self.mocked_dynamodb_class,
+                                                   page_id="12345678-1234-5678-1234-56781234")
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 503)
+        self.assertIn("increment not queued", test_return_value["body"])
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+
+    def test_client_config(self) -> None:
+        """
+        Verify the DynamoDB clients use the tuned timeouts and adaptive retries.
+        """
+        with patch.dict(os.environ, {"DYNAMODB_READ_TIMEOUT_SECONDS": "0.5"}):
+            client_config = _create_dynamodb_resource().meta.client.meta.config
+
+        # Assertion
+        self.assertEqual(client_config.read_timeout, 0.5)
+        self.assertEqual(client_config.connect_timeout, 1.0)
+        self.assertTrue(client_config.tcp_keepalive)
+        self.assertEqual(client_config.retries["mode"], "adaptive")
+
+
+    def tearDown(self) -> None:
+        for test_patch in self.patches:
+            test_patch.stop()
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
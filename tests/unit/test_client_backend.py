@@ -0,0 +1,108 @@
+import sys
+import os
+from unittest import TestCase
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import getVisitorsCount
+from myresume_backend.lambda_function import addOneVisitorCount
+from myresume_backend.lambda_function import extract_visit_count_from_dbresponse
+from myresume_backend.lambda_function import _AWS_REGION
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestClientBackend(TestCase):
+    """
+    Test class for the low-level DynamoDB client fast path
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish a "GLOBAL" environment using the client backend
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "client" : client('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name,
+                                     "backend" : "client" }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": "12345678-1234-5678-1234-56781234",
+                                                        "visit_count":42,
+                                                        "other_attribute": "not read"
+                                                        })
+
+
+    def test_getVisitorsCount(self) -> None:
+        """
+        Verify the client backend returns the page's visitors count.
+        """
+        test_return_value = getVisitorsCount(
+                        dynamo_db = self.mocked_dynamodb_class,
+                        page_id="12345678-1234-5678-1234-56781234"
+                        )
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 200)
+        self.assertEqual(test_return_value["body"], "42")
+
+
+    def test_addOneVisitorCount(self) -> None:
+        """
+        Verify the client backend adds one to the page's visitors count.
+        """
+        test_return_value = addOneVisitorCount(
+                        dynamo_db = self.mocked_dynamodb_class,
+                        page_id="12345678-1234-5678-1234-56781234"
+                        )
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 200)
+        self.assertEqual(test_return_value["body"], "43")
+
+
+    def test_pageid_notfound_404(self) -> None:
+        """
+        Verify the client backend returns 404 for an unknown page-id, for reads and writes.
+        """
+        for route_function in (getVisitorsCount, addOneVisitorCount):
+            test_return_value = route_function(
+                            dynamo_db = self.mocked_dynamodb_class,
+                            page_id="NOTVALID-1234-5678-1234-56781234"
+                            )
+
+            # Assertion
+            self.assertEqual(test_return_value["statusCode"], 404)
+            self.assertIn("Not Found", test_return_value["body"])
+
+
+    def test_extract_visit_count_zero(self) -> None:
+        """
+        Verify a visit_count of zero is extracted rather than reported missing.
+        """
+        self.assertEqual(extract_visit_count_from_dbresponse({"Item": {"visit_count": 0}}), 0)
+        with self.assertRaises(KeyError):
+            extract_visit_count_from_dbresponse({"ResponseMetadata": {}})
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
@@ -0,0 +1,259 @@
+import sys
+import os
+import json
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import lambda_handler
+from myresume_backend.lambda_function import request_visitor_hash
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.dedupe import BloomFilter, VisitDeduplicator, dedupe_key   # pylint: disable=wrong-import-position
+from myresume_backend.http_cache import HttpCacheConfig   # pylint: disable=wrong-import-position
+from tests.unit.helpers import FakeClock   # pylint: disable=wrong-import-position
+
+
+class TestBloomFilter(TestCase):
+    """
+    Test class for the bloom filter
+    """
+
+    def test_no_false_negatives_and_bounded_false_positives(self) -> None:
+        """
+        Verify every added key is found, and unknown keys are rarely found
+        at capacity.
+        """
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        for index in range(1000):
+            bloom_filter.add(f"visitor-{index}")
+        false_positives = sum(f"stranger-{index}" in bloom_filter for index in range(10000))
+
+        # Assertion
+        self.assertTrue(all(f"visitor-{index}" in bloom_filter for index in range(1000)))
+        self.assertLess(false_positives / 10000, 0.03)
+
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestVisitDeduplicator(TestCase):
+    """
+    Test class for the dedupe window of the visitor hits
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish the "GLOBAL" environment for use in tests.
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "client" : client('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name  }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": "6632d5b4-5655-4c48-b7b6-071d5823c888",
+                                                        "visit_count":42
+                                                        })
+        self.clock = FakeClock(1792156800.0)
+
+
+    def hit(self, deduplicator: VisitDeduplicator, page_id: str, visitor_hash: int = 7) -> bool:
+        """
+        Return True when the hit is counted (claimed and confirmed).
+        """
+        if deduplicator.claim(self.mocked_dynamodb_class.client, self.test_ddb_table_name,
+                              page_id, visitor_hash) is None:
+            return False
+        deduplicator.confirm(page_id, visitor_hash)
+        return True
+
+
+    def test_repeats_suppressed_within_window(self) -> None:
+        """
+        Verify a repeat is suppressed by the bloom filter of the same
+        environment and by the dedupe item in another one, until the window ends.
+        """
+        deduplicator = VisitDeduplicator(window_seconds=1800, clock=self.clock)
+        other_deduplicator = VisitDeduplicator(window_seconds=1800, clock=self.clock)
+
+        first_hit = self.hit(deduplicator, "page")
+        with patch.object(deduplicator, "claim_visit") as patch_claim_visit:
+            repeated_hit = self.hit(deduplicator, "page")
+        other_environment_hit = self.hit(other_deduplicator, "page")
+        other_page_hit = self.hit(deduplicator, "other-page")
+        self.clock.now += 1800
+        after_window_hit = self.hit(other_deduplicator, "page")
+        dedupe_item = self.mocked_dynamodb_class.table.get_item(Key={"pkey_uuid": dedupe_key("page", 7)})["Item"]
+
+        # Assertion
+        self.assertTrue(first_hit)
+        self.assertFalse(repeated_hit)
+        patch_claim_visit.assert_not_called()
+        self.assertFalse(other_environment_hit)
+        self.assertTrue(other_page_hit)
+        self.assertTrue(after_window_hit)
+        self.assertEqual(dedupe_item["expires_at"], int(self.clock.now) + 1800)
+        self.assertTrue(dedupe_key("page", 7).startswith("#"))
+
+
+    def test_released_claim_is_not_remembered(self) -> None:
+        """
+        Verify a released claim lets the next hit of the visitor count, and
+        does not delete a newer claim of the same window.
+        """
+        dynamodb_client = self.mocked_dynamodb_class.client
+        deduplicator = VisitDeduplicator(window_seconds=1800, clock=self.clock)
+
+        expires_at = deduplicator.claim(dynamodb_client, self.test_ddb_table_name, "page", 7)
+        deduplicator.release(dynamodb_client, self.test_ddb_table_name, "page", 7, expires_at)
+        retry_claim = deduplicator.claim(dynamodb_client, self.test_ddb_table_name, "page", 7)
+        deduplicator.release(dynamodb_client, self.test_ddb_table_name, "page", 7, expires_at - 1)
+
+        # Assertion
+        self.assertIsNotNone(expires_at)
+        self.assertEqual(retry_claim, expires_at)
+        self.assertIn("Item", self.mocked_dynamodb_class.table.get_item(Key={"pkey_uuid": dedupe_key("page", 7)}))
+
+
+    def test_bloom_filter_never_outlives_window(self) -> None:
+        """
+        Verify the bloom generations of a hit are dropped once the window passed.
+        """
+        deduplicator = VisitDeduplicator(window_seconds=100, clock=self.clock)
+        deduplicator.remember("key")
+        self.clock.now += 50
+        seen_after_half_window = deduplicator.seen_recently("key")
+        self.clock.now += 50
+
+        # Assertion
+        self.assertTrue(seen_after_half_window)
+        self.assertFalse(deduplicator.seen_recently("key"))
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    def test_lambda_handler_refresh_not_counted(self,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify a refresh returns the current count without a write, and
+        another visitor is counted.
+        """
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+        with open("tests/events/sampleEvent_addOneVisitorCount.json", "r", encoding='UTF-8') as file_handle:
+            test_event = json.load(file_handle)
+
+        with patch("myresume_backend.lambda_function._VISIT_DEDUPE", VisitDeduplicator(window_seconds=1800)):
+            first_return_value = lambda_handler(event=test_event, context=None)
+            refresh_return_value = lambda_handler(event=test_event, context=None)
+            test_event["requestContext"]["http"]["sourceIp"] = "203.0.113.7"
+            other_visitor_return_value = lambda_handler(event=test_event, context=None)
+
+        # Assertion
+        self.assertEqual(first_return_value["body"], "43")
+        self.assertEqual(refresh_return_value["statusCode"], 200)
+        self.assertEqual(refresh_return_value["body"], "43")
+        self.assertEqual(other_visitor_return_value["body"], "44")
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    def test_lambda_handler_refresh_not_cached(self,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify the answer to a refresh carries no public caching headers, so
+        that a CDN does not serve the increment URL to the next visitors.
+        """
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+        with open("tests/events/sampleEvent_addOneVisitorCount.json", "r", encoding='UTF-8') as file_handle:
+            test_event = json.load(file_handle)
+
+        with patch("myresume_backend.lambda_function._VISIT_DEDUPE", VisitDeduplicator(window_seconds=1800)), \
+             patch("myresume_backend.lambda_function._HTTP_CACHE_CONFIG", HttpCacheConfig(max_age_seconds=60)):
+            lambda_handler(event=test_event, context=None)
+            refresh_return_value = lambda_handler(event=test_event, context=None)
+
+        # Assertion
+        self.assertEqual(refresh_return_value["body"], "43")
+        self.assertEqual(refresh_return_value["headers"], {"Cache-Control": "no-store"})
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    def test_lambda_handler_failed_increment_releases_claim(self,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify an increment which fails leaves no dedupe item, so that an
+        unknown page-id leaves nothing behind and the retry of a visitor counts.
+        """
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+        with open("tests/events/sampleEvent_addOneVisitorCount.json", "r", encoding='UTF-8') as file_handle:
+            test_event = json.load(file_handle)
+        page_id = test_event["pathParameters"]["page-id"]
+        visitor_hash = request_visitor_hash(test_event)
+
+        with patch("myresume_backend.lambda_function._VISIT_DEDUPE", VisitDeduplicator(window_seconds=1800)):
+            test_event["pathParameters"]["page-id"] = "NOTVALID-1234-5678-1234-56781234"
+            unknown_page_return_value = lambda_handler(event=test_event, context=None)
+            test_event["pathParameters"]["page-id"] = page_id
+            with patch("myresume_backend.lambda_function.addOneVisitorCount",
+                       return_value={"statusCode": 500, "body": "ERROR: throttled"}):
+                failed_return_value = lambda_handler(event=test_event, context=None)
+            retry_return_value = lambda_handler(event=test_event, context=None)
+        dedupe_items = self.mocked_dynamodb_class.client.scan(TableName=self.test_ddb_table_name)["Items"]
+
+        # Assertion
+        self.assertEqual(unknown_page_return_value["statusCode"], 404)
+        self.assertEqual(failed_return_value["statusCode"], 500)
+        self.assertEqual(retry_return_value["body"], "43")
+        self.assertEqual(sorted(item["pkey_uuid"]["S"] for item in dedupe_items),
+                         sorted([page_id, dedupe_key(page_id, visitor_hash)]))
+
+
+    def test_page_id_with_hash_rejected(self) -> None:
+        """
+        Verify a page-id containing "#" (reserved to the internal items) is rejected.
+        """
+        with open("tests/events/sampleEvent_addOneVisitorCount.json", "r", encoding='UTF-8') as file_handle:
+            test_event = json.load(file_handle)
+        test_event["pathParameters"]["page-id"] = "#top-pages"
+
+        # Assertion
+        self.assertEqual(lambda_handler(event=test_event, context=None)["statusCode"], 400)
+
+
+    def test_batch_ids_with_hash_rejected(self) -> None:
+        """
+        Verify the batch route does not read the internal items (dedupe,
+        shards, top pages) either.
+        """
+        with open("tests/events/sampleEvent_getVisitorCounts.json", "r", encoding='UTF-8') as file_handle:
+            test_event = json.load(file_handle)
+
+        for ids in (dedupe_key("page", 7), "page#shard-1", "page,#top-pages"):
+            test_event["queryStringParameters"]["ids"] = ids
+
+            # Assertion
+            self.assertEqual(lambda_handler(event=test_event, context=None)["statusCode"], 400)
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
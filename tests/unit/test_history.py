@@ -0,0 +1,180 @@
+import sys
+import os
+import json
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import lambda_handler
+from myresume_backend.lambda_function import addOneVisitorCount
+from myresume_backend.lambda_function import getVisitorHistory
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.history import VisitHistoryConfig, history_bucket, record_visit_history  # pylint: disable=wrong-import-position
+
+# 2026-10-16T13:20:00Z
+TEST_TIMESTAMP = 1792156800
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestHistory(TestCase):
+    """
+    Test class for the time-bucketed visit history
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        self.test_history_table_name = "unit_test_history"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct the (mocked!) counter and history tables
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+        dynamodb.create_table(
+            TableName = self.test_history_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"},
+                       {"AttributeName": "bucket", "KeyType": "RANGE"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"},
+                                  {"AttributeName": "bucket", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish a "GLOBAL" environment with history enabled
+        self.history_config = VisitHistoryConfig(self.test_history_table_name, hourly_retention_days=7)
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name,
+                                     "history" : self.history_config }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": "12345678-1234-5678-1234-56781234",
+                                                        "visit_count":42
+                                                        })
+
+
+    def test_history_bucket(self) -> None:
+        """
+        Verify the UTC bucket of each granularity.
+        """
+        # Assertion
+        self.assertEqual(history_bucket(TEST_TIMESTAMP, "hour"), "2026-10-16T13")
+        self.assertEqual(history_bucket(TEST_TIMESTAMP, "day"), "2026-10-16")
+        self.assertEqual(history_bucket(TEST_TIMESTAMP, "month"), "2026-10")
+
+
+    def test_addOneVisitorCount_records_every_granularity(self) -> None:
+        """
+        Verify an increment is added to the hour, day and month buckets, and
+        only the hourly bucket expires.
+        """
+        with patch("myresume_backend.history.time.time", return_value=TEST_TIMESTAMP):
+            addOneVisitorCount(dynamo_db=self.mocked_dynamodb_class, page_id="12345678-1234-5678-1234-56781234")
+            test_return_value = addOneVisitorCount(dynamo_db=self.mocked_dynamodb_class,
+                                                   page_id="12345678-1234-5678-1234-56781234")
+        history_table = self.mocked_dynamodb_class.history_table
+        hour_item = history_table.get_item(Key={"pkey_uuid": "12345678-1234-5678-1234-56781234#hour",
+                                                "bucket": "2026-10-16T13"})["Item"]
+        month_item = history_table.get_item(Key={"pkey_uuid": "12345678-1234-5678-1234-56781234#month",
+                                                 "bucket": "2026-10"})["Item"]
+
+        # Assertion
+        self.assertEqual(test_return_value["body"], "44")
+        self.assertEqual(hour_item["visit_count"], 2)
+        self.assertEqual(hour_item["expires_at"], TEST_TIMESTAMP + 7 * 86400)
+        self.assertEqual(month_item["visit_count"], 2)
+        self.assertNotIn("expires_at", month_item)
+
+
+    def test_getVisitorHistory_paginates_range(self) -> None:
+        """
+        Verify the buckets of the requested range are returned oldest first,
+        one page at a time.
+        """
+        dynamodb_client = self.mocked_dynamodb_class.client
+        for day in (1, 2, 3, 5):
+            record_visit_history(dynamodb_client, self.history_config, "12345678-1234-5678-1234-56781234",
+                                 day, timestamp=TEST_TIMESTAMP + (day - 16) * 86400)
+        record_visit_history(dynamodb_client, self.history_config, "12345678-1234-5678-1234-56781234",
+                             1, timestamp=TEST_TIMESTAMP + 30 * 86400)
+
+        first_page = getVisitorHistory(dynamo_db=self.mocked_dynamodb_class,
+                                       page_id="12345678-1234-5678-1234-56781234",
+                                       query_parameters={"granularity": "day", "from": "2026-10-02T08",
+                                                         "to": "2026-10", "limit": "2"})
+        first_body = json.loads(first_page["body"])
+        second_page = getVisitorHistory(dynamo_db=self.mocked_dynamodb_class,
+                                        page_id="12345678-1234-5678-1234-56781234",
+                                        query_parameters={"granularity": "day", "from": "2026-10-02T08",
+                                                          "to": "2026-10", "limit": "2",
+                                                          "next": first_body["next"]})
+        second_body = json.loads(second_page["body"])
+        months = json.loads(getVisitorHistory(dynamo_db=self.mocked_dynamodb_class,
+                                              page_id="12345678-1234-5678-1234-56781234",
+                                              query_parameters={"granularity": "month"})["body"])
+
+        # Assertion
+        self.assertEqual(first_page["statusCode"], 200)
+        self.assertEqual(first_body["buckets"], [{"bucket": "2026-10-02", "visit_count": 2},
+                                                 {"bucket": "2026-10-03", "visit_count": 3}])
+        self.assertEqual(second_body["buckets"], [{"bucket": "2026-10-05", "visit_count": 5}])
+        self.assertIsNone(second_body["next"])
+        self.assertEqual(months["buckets"], [{"bucket": "2026-10", "visit_count": 11},
+                                             {"bucket": "2026-11", "visit_count": 1}])
+
+
+    def test_getVisitorHistory_disabled_404(self) -> None:
+        """
+        Verify the history route answers 404 when history is not enabled.
+        """
+        dynamodb_class = LambdaDynamoDBClass({ "resource" : self.mocked_dynamodb_class.resource,
+                                               "table_name" : self.test_ddb_table_name })
+        test_return_value = getVisitorHistory(dynamo_db=dynamodb_class,
+                                              page_id="12345678-1234-5678-1234-56781234",
+                                              query_parameters={})
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 404)
+
+
+    # Patch the Global Class and any function calls
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    @patch("myresume_backend.lambda_function.getVisitorHistory")
+    def test_lambda_handler_getVisitorHistory_valid_event_returns_200(self,
+                            patch_getVisitorHistory : MagicMock,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify the history event is routed to getVisitorHistory with its query string.
+        """
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+        return_value_200 = {"statusCode" : 200, "body":"{}"}
+        patch_getVisitorHistory.return_value = return_value_200
+        with open("tests/events/sampleEvent_getVisitorHistory.json", "r", encoding='UTF-8') as file_handle:
+            test_event = json.load(file_handle)
+
+        test_return_value = lambda_handler(event=test_event, context=None)
+
+        # Assertion
+        patch_getVisitorHistory.assert_called_once_with(dynamo_db=self.mocked_dynamodb_class,
+                                                        page_id=test_event["pathParameters"]["page-id"],
+                                                        query_parameters=test_event["queryStringParameters"])
+        self.assertEqual(test_return_value, return_value_200)
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Tables
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
+        dynamodb_resource.delete_table(TableName = self.test_history_table_name )
@@ -0,0 +1,134 @@
+import sys
+import os
+import json
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import lambda_handler
+from myresume_backend.lambda_function import getVisitorsCount
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.read_cache import VisitCountReadCache         # pylint: disable=wrong-import-position
+from myresume_backend.http_cache import HttpCacheConfig, etag_matches
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestHttpCache(TestCase):
+    """
+    Test class for the Cache-Control/ETag headers and the 304 responses
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish the "GLOBAL" environment for use in tests.
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name  }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": "6632d5b4-5655-4c48-b7b6-071d5823c888",
+                                                        "visit_count":42
+                                                        })
+
+        # HTTP caching headers, as configured by the environment
+        self.http_cache_config = HttpCacheConfig(max_age_seconds=60, stale_while_revalidate_seconds=300)
+        self.http_cache_patch = patch("myresume_backend.lambda_function._HTTP_CACHE_CONFIG", self.http_cache_config)
+        self.http_cache_patch.start()
+        with open("tests/events/sampleEvent_getVisitorCount.json", "r", encoding='UTF-8') as file_handle:
+            self.test_event = json.load(file_handle)
+
+
+    def test_etag_matches(self) -> None:
+        """
+        Verify the If-None-Match comparison (lists, weak ETags and "*").
+        """
+        # Assertion
+        self.assertTrue(etag_matches('"41", W/"42"', '"42"'))
+        self.assertTrue(etag_matches('*', '"42"'))
+        self.assertFalse(etag_matches('"43"', '"42"'))
+        self.assertFalse(etag_matches(None, '"42"'))
+        self.assertIsNone(HttpCacheConfig.from_environ({}))
+
+
+    def test_getVisitorsCount_returns_caching_headers(self) -> None:
+        """
+        Verify the count is returned with its ETag and Cache-Control.
+        """
+        test_return_value = getVisitorsCount(dynamo_db=self.mocked_dynamodb_class,
+                                             page_id="6632d5b4-5655-4c48-b7b6-071d5823c888")
+
+        # Assertion
+        self.assertEqual(test_return_value["body"], "42")
+        self.assertEqual(test_return_value["headers"], {"Cache-Control": "public, max-age=60, stale-while-revalidate=300",
+                                                        "ETag": '"42"'})
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    def test_lambda_handler_if_none_match_returns_304(self,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify a matching If-None-Match is answered with a 304 without body,
+        and a changed count with a 200.
+        """
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+        self.test_event["headers"]["if-none-match"] = '"42"'
+        not_modified_return_value = lambda_handler(event=self.test_event, context=None)
+        self.test_event["headers"]["if-none-match"] = '"41"'
+        modified_return_value = lambda_handler(event=self.test_event, context=None)
+
+        # Assertion
+        self.assertEqual(not_modified_return_value["statusCode"], 304)
+        self.assertEqual(not_modified_return_value["body"], "")
+        self.assertEqual(not_modified_return_value["headers"]["ETag"], '"42"')
+        self.assertEqual(modified_return_value["statusCode"], 200)
+        self.assertEqual(modified_return_value["body"], "42")
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    @patch("myresume_backend.lambda_function.get_visit_count")
+    def test_lambda_handler_304_from_read_cache_without_table_read(self,
+                            patch_get_visit_count : MagicMock,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify a revalidation of a count cached in the warm environment is
+        answered without reading the table.
+        """
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+        read_cache = VisitCountReadCache(ttl_seconds=60)
+        read_cache.put("6632d5b4-5655-4c48-b7b6-071d5823c888", 42)
+        self.test_event["headers"]["if-none-match"] = '"42"'
+
+        with patch("myresume_backend.lambda_function._VISIT_COUNT_READ_CACHE", read_cache):
+            test_return_value = lambda_handler(event=self.test_event, context=None)
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 304)
+        patch_get_visit_count.assert_not_called()
+
+
+    def tearDown(self) -> None:
+        self.http_cache_patch.stop()
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
@@ -0,0 +1,239 @@
+import sys
+import os
+import asyncio
+import threading
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import lambda_handler, metric_route_name
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.http_server import CounterHttpServer, api_gateway_event   # pylint: disable=wrong-import-position
+
+
+async def http_get(port: int, target: str, headers: str = "") -> tuple:
+    """
+    Send one GET request on a new connection and return the status code,
+    the (lower-cased) headers and the body of the response.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: test\r\n{headers}Connection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = (await reader.read()).decode()
+    writer.close()
+    head, _, body = response.partition("\r\n\r\n")
+    status_line, *header_lines = head.split("\r\n")
+    response_headers = dict((name.lower(), value) for name, _, value in
+                            (line.partition(": ") for line in header_lines))
+    return int(status_line.split()[1]), response_headers, body
+
+
+class TestApiGatewayEvent(TestCase):
+    """
+    Test class for the mapping of the HTTP requests onto API Gateway events
+    """
+
+    def test_routes_and_query_parameters(self) -> None:
+        """
+        Verify the route key, path and query parameters of the events.
+        """
+        page_event = api_gateway_event("GET", "/counts/abc?func=getVisitorCount", {"user-agent": "ua"}, "203.0.113.7")
+        batch_event = api_gateway_event("GET", "/counts?ids=a,b&ids=c", {}, "203.0.113.7")
+        unknown_event = api_gateway_event("GET", "/other", {}, "203.0.113.7")
+        proxied_event = api_gateway_event("GET", "/counts/abc?func=getVisitorCount",
+                                          {"x-forwarded-for": "198.51.100.1"}, "203.0.113.7")
+
+        # Assertion
+        self.assertEqual(page_event["routeKey"], "GET /counts/{page-id}")
+        self.assertEqual(page_event["pathParameters"], {"page-id": "abc"})
+        self.assertEqual(page_event["queryStringParameters"], {"func": "getVisitorCount"})
+        self.assertEqual(page_event["requestContext"]["http"]["sourceIp"], "203.0.113.7")
+        self.assertEqual(page_event["headers"]["x-forwarded-for"], "203.0.113.7")
+        self.assertEqual(proxied_event["headers"]["x-forwarded-for"], "198.51.100.1, 203.0.113.7")
+        self.assertEqual(proxied_event["requestContext"]["http"]["sourceIp"], "203.0.113.7")
+        self.assertEqual(batch_event["routeKey"], "GET /counts")
+        self.assertEqual(batch_event["queryStringParameters"], {"ids": "a,b,c"})
+        self.assertEqual(unknown_event["routeKey"], "GET /other")
+        self.assertNotIn("queryStringParameters", unknown_event)
+
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestCounterHttpServer(TestCase):
+    """
+    Test class for the standalone HTTP server
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish the "GLOBAL" environment for use in tests.
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name  }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": "6632d5b4-5655-4c48-b7b6-071d5823c888",
+                                                        "visit_count":42
+                                                        })
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    def test_serves_routes_and_metrics(self,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify the counts routes are answered by lambda_handler, concurrently,
+        and counted in /metrics.
+        """
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+        page_path = "/counts/6632d5b4-5655-4c48-b7b6-071d5823c888"
+
+        async def scenario():
+            server = CounterHttpServer(lambda_handler, host="127.0.0.1", port=0, max_workers=4,
+                                       route_name=metric_route_name)
+            await server.start()
+            increments = await asyncio.gather(*(http_get(server.port, page_path + "?func=addOneVisitorCount")
+                                                for _ in range(8)))
+            count = await http_get(server.port, page_path + "?func=getVisitorCount")
+            not_found = await http_get(server.port, "/counts/abc?func=unknownFunction")
+            metrics = await http_get(server.port, "/metrics")
+            await server.shutdown()
+            return increments, count, not_found, metrics
+
+        increments, count, not_found, metrics = asyncio.run(scenario())
+
+        # Assertion
+        self.assertEqual(sorted(int(body) for _, _, body in increments), list(range(43, 51)))
+        self.assertEqual(count[0], 200)
+        self.assertEqual(count[2], "50")
+        self.assertEqual(count[1]["content-length"], "2")
+        self.assertEqual(not_found[0], 404)
+        self.assertIn('counter_http_requests_total{route="addOneVisitorCount",status="200"} 8', metrics[2])
+        self.assertIn('counter_http_requests_total{route="unknown",status="404"} 1', metrics[2])
+        self.assertIn('counter_http_request_duration_seconds_count{route="getVisitorCount"} 1', metrics[2])
+
+
+    def test_graceful_shutdown_finishes_requests_in_flight(self) -> None:
+        """
+        Verify a request in flight at shutdown is answered, the server stops
+        accepting connections and on_shutdown is called afterwards.
+        """
+        handler_started, release_handler = threading.Event(), threading.Event()
+        shutdown_calls = []
+
+        def slow_handler(event, context):
+            handler_started.set()
+            release_handler.wait(5)
+            return {"statusCode": 200, "body": "42"}
+
+        async def scenario():
+            server = CounterHttpServer(slow_handler, host="127.0.0.1", port=0,
+                                       on_shutdown=lambda: shutdown_calls.append(True))
+            await server.start()
+            request = asyncio.ensure_future(http_get(server.port, "/counts/abc?func=getVisitorCount"))
+            await asyncio.get_running_loop().run_in_executor(None, handler_started.wait, 5)
+            shutdown = asyncio.ensure_future(server.shutdown())
+            await asyncio.sleep(0.05)
+            calls_before_release = list(shutdown_calls)
+            release_handler.set()
+            response = await request
+            await shutdown
+            with self.assertRaises(OSError):
+                await asyncio.open_connection("127.0.0.1", server.port)
+            return calls_before_release, response
+
+        calls_before_release, response = asyncio.run(scenario())
+
+        # Assertion
+        self.assertEqual(calls_before_release, [])
+        self.assertEqual(response[0], 200)
+        self.assertEqual(response[2], "42")
+        self.assertEqual(shutdown_calls, [True])
+
+
+    def test_malformed_requests_get_400(self) -> None:
+        """
+        Verify unparsable request lines and headers are answered with a 400
+        without reaching the handler.
+        """
+        handler = MagicMock()
+
+        async def send_raw(port: int, request: bytes) -> str:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            await writer.drain()
+            response = (await reader.read()).decode()
+            writer.close()
+            return response
+
+        async def scenario():
+            server = CounterHttpServer(handler, host="127.0.0.1", port=0)
+            await server.start()
+            responses = [await send_raw(server.port, request) for request in
+                         (b"GET /\r\n\r\n",
+                          b"GET /counts/abc?func=getVisitorCount HTTP/1.1\r\nno colon\r\n\r\n",
+                          b"GET /counts/abc?func=getVisitorCount HTTP/1.1\r\nContent-Length: x\r\n\r\n")]
+            await server.shutdown()
+            return responses
+
+        responses = asyncio.run(scenario())
+
+        # Assertion
+        for response in responses:
+            self.assertTrue(response.startswith("HTTP/1.1 400 Bad Request\r\n"))
+            self.assertIn("Connection: close", response)
+        handler.assert_not_called()
+
+
+    def test_rejects_requests_beyond_max_pending(self) -> None:
+        """
+        Verify requests beyond max_pending are answered with a 503.
+        """
+        release_handler = threading.Event()
+
+        def slow_handler(event, context):
+            release_handler.wait(5)
+            return {"statusCode": 200, "body": "42"}
+
+        async def scenario():
+            server = CounterHttpServer(slow_handler, host="127.0.0.1", port=0, max_pending=1)
+            await server.start()
+            first = asyncio.ensure_future(http_get(server.port, "/counts/abc?func=getVisitorCount"))
+            await asyncio.sleep(0.05)
+            rejected = await http_get(server.port, "/counts/abc?func=getVisitorCount")
+            release_handler.set()
+            await first
+            await server.shutdown()
+            return rejected, server.metrics.rejected
+
+        rejected, rejected_count = asyncio.run(scenario())
+
+        # Assertion
+        self.assertEqual(rejected[0], 503)
+        self.assertEqual(rejected[1]["retry-after"], "1")
+        self.assertEqual(rejected_count, 1)
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
@@ -0,0 +1,170 @@
+import sys
+import os
+import json
+import base64
+from unittest import TestCase
+from unittest.mock import patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import addOneVisitorCount
+from myresume_backend.lambda_function import visit_count_consumer_handler
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.increment_queue import LocalIncrementQueue, SqsIncrementQueue   # pylint: disable=wrong-import-position
+from myresume_backend.increment_queue import aggregate_increment_records, increment_message_body
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+@moto.mock_sqs
+class TestIncrementQueue(TestCase):
+    """
+    Test class for the asynchronous increment pipeline
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish the "GLOBAL" environment used by both entry points
+        self.mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                          "table_name" : self.test_ddb_table_name }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(self.mocked_dynamodb_resource)
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": "12345678-1234-5678-1234-56781234",
+                                                        "visit_count":42
+                                                        })
+        self.local_queue = LocalIncrementQueue()
+
+
+    def test_aggregate_increment_records(self) -> None:
+        """
+        Verify SQS and Kinesis records are collapsed into one delta per page,
+        and invalid messages are reported.
+        """
+        records = [{"messageId": "m1", "body": increment_message_body("page-a")},
+                   {"messageId": "m2", "body": increment_message_body("page-b", 3)},
+                   {"messageId": "m3", "body": "not json"},
+                   {"kinesis": {"sequenceNumber": "s1",
+                                "data": base64.b64encode(increment_message_body("page-a").encode()).decode()}}]
+
+        deltas, identifiers, invalid = aggregate_increment_records(records)
+
+        # Assertion
+        self.assertEqual(deltas, {"page-a": 2, "page-b": 3})
+        self.assertEqual(identifiers, {"page-a": ["m1", "s1"], "page-b": ["m2"]})
+        self.assertEqual(invalid, ["m3"])
+
+
+    def test_pipeline_with_local_queue(self) -> None:
+        """
+        Verify queued increments return the last known count without writing,
+        and are applied as one delta by the consumer.
+        """
+        with patch("myresume_backend.lambda_function._VISIT_COUNT_INCREMENT_QUEUE", self.local_queue), \
+             patch("myresume_backend.lambda_function._LAMBDA_DYNAMODB_RESOURCE", self.mocked_dynamodb_resource):
+            test_return_values = [addOneVisitorCount(dynamo_db=self.mocked_dynamodb_class,
+                                                     page_id="12345678-1234-5678-1234-56781234")
+                                  for _ in range(3)]
+            count_before_delivery = self.mocked_dynamodb_class.table.get_item(
+                Key={"pkey_uuid": "12345678-1234-5678-1234-56781234"})["Item"]["visit_count"]
+            consumed = self.local_queue.deliver(visit_count_consumer_handler)
+        count_after_delivery = self.mocked_dynamodb_class.table.get_item(
+            Key={"pkey_uuid": "12345678-1234-5678-1234-56781234"})["Item"]["visit_count"]
+
+        # Assertion
+        self.assertEqual([value["body"] for value in test_return_values], ["43"] * 3)
+        self.assertEqual(count_before_delivery, 42)
+        self.assertEqual(consumed, 3)
+        self.assertEqual(count_after_delivery, 45)
+
+
+    def test_unknown_page_is_not_queued(self) -> None:
+        """
+        Verify an unknown page-id is answered with 404 and nothing is queued.
+        """
+        with patch("myresume_backend.lambda_function._VISIT_COUNT_INCREMENT_QUEUE", self.local_queue):
+            test_return_value = addOneVisitorCount(dynamo_db=self.mocked_dynamodb_class,
+                                                   page_id="NOTVALID-1234-5678-1234-56781234")
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 404)
+        self.assertEqual(len(self.local_queue), 0)
+
+
+    def test_consumer_reports_partial_batch_failures(self) -> None:
+        """
+        Verify only the records of the pages which failed are reported.
+        """
+        event = {"Records": [{"messageId": "m1", "body": increment_message_body("12345678-1234-5678-1234-56781234")},
+                             {"messageId": "m2", "body": increment_message_body("NOTVALID-1234-5678-1234-56781234")},
+                             {"messageId": "m3", "body": increment_message_body("NOTVALID-1234-5678-1234-56781234")}]}
+
+        with patch("myresume_backend.lambda_function._LAMBDA_DYNAMODB_RESOURCE", self.mocked_dynamodb_resource):
+            test_return_value = visit_count_consumer_handler(event, None)
+
+        # Assertion
+        self.assertEqual(test_return_value, {"batchItemFailures": [{"itemIdentifier": "m2"},
+                                                                   {"itemIdentifier": "m3"}]})
+        self.assertEqual(self.mocked_dynamodb_class.table.get_item(
+            Key={"pkey_uuid": "12345678-1234-5678-1234-56781234"})["Item"]["visit_count"], 43)
+
+
+    def test_consumer_stops_kinesis_batch_at_first_failure(self) -> None:
+        """
+        Verify a Kinesis batch is applied in order up to the first failed
+        page, and only the sequence number of that record is reported.
+        """
+        def kinesis_record(sequence_number, body):
+            return {"kinesis": {"sequenceNumber": sequence_number,
+                                "data": base64.b64encode(body.encode()).decode()}}
+        event = {"Records": [kinesis_record("s1", increment_message_body("12345678-1234-5678-1234-56781234")),
+                             kinesis_record("s2", increment_message_body("12345678-1234-5678-1234-56781234")),
+                             kinesis_record("s3", "not json"),
+                             kinesis_record("s4", increment_message_body("NOTVALID-1234-5678-1234-56781234")),
+                             kinesis_record("s5", increment_message_body("12345678-1234-5678-1234-56781234"))]}
+
+        with patch("myresume_backend.lambda_function._LAMBDA_DYNAMODB_RESOURCE", self.mocked_dynamodb_resource):
+            test_return_value = visit_count_consumer_handler(event, None)
+
+        # Assertion: s1 and s2 are applied once, s5 waits for the redelivery from s4
+        self.assertEqual(test_return_value, {"batchItemFailures": [{"itemIdentifier": "s4"}]})
+        self.assertEqual(self.mocked_dynamodb_class.table.get_item(
+            Key={"pkey_uuid": "12345678-1234-5678-1234-56781234"})["Item"]["visit_count"], 44)
+
+
+    def test_sqs_increment_queue_sends_message(self) -> None:
+        """
+        Verify the SQS producer sends the increment message to the queue.
+        """
+        sqs_client = client("sqs", region_name=_AWS_REGION)
+        queue_url = sqs_client.create_queue(QueueName="unit_test_increments")["QueueUrl"]
+
+        SqsIncrementQueue(queue_url, lambda: sqs_client).send("12345678-1234-5678-1234-56781234")
+        messages = sqs_client.receive_message(QueueUrl=queue_url)["Messages"]
+
+        # Assertion
+        self.assertEqual(json.loads(messages[0]["Body"]), {"pageId": "12345678-1234-5678-1234-56781234",
+                                                           "delta": 1})
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
@@ -1,6 +1,8 @@
 import sys
 import os
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 from boto3 import resource, client
@@ -131,6 +133,49 @@ class TestLambdaFunction(TestCase):
         self.assertIn("Not Found", test_return_value["body"])
 
 
+    @patch("myresume_backend.lambda_function._create_dynamodb_resource")
+    def test_dynamodb_resource_created_on_first_use(self,
+                            patch_create_dynamodb_resource : MagicMock
+                            ) -> None:
+        """
+        Verify the DynamoDB resource is only created when first used, and then
+        kept in the global resources for the next invocations.
+        """
+        lazy_dynamodb_resource = { "resource" : None,
+                                   "table_name" : self.test_ddb_table_name }
+        dynamodb_resource_class = LambdaDynamoDBClass(lazy_dynamodb_resource)
+
+        # Assertion
+        patch_create_dynamodb_resource.assert_not_called()
+        dynamodb_resource_class.table
+        LambdaDynamoDBClass(lazy_dynamodb_resource).table
+        patch_create_dynamodb_resource.assert_called_once_with()
+        self.assertIs(lazy_dynamodb_resource["resource"], patch_create_dynamodb_resource.return_value)
+
+
+    @patch("myresume_backend.lambda_function._create_dynamodb_client")
+    def test_dynamodb_client_created_once_by_concurrent_threads(self,
+                            patch_create_dynamodb_client : MagicMock
+                            ) -> None:
+        """
+        Verify the threads of the HTTP server which need the client at the
+        same time share one client.
+        """
+        def slow_create_dynamodb_client():
+            time.sleep(0.05)
+            return MagicMock()
+        patch_create_dynamodb_client.side_effect = slow_create_dynamodb_client
+        lazy_dynamodb_resource = { "resource" : None,
+                                   "table_name" : self.test_ddb_table_name }
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            clients = list(executor.map(lambda _: LambdaDynamoDBClass(lazy_dynamodb_resource).client, range(4)))
+
+        # Assertion
+        patch_create_dynamodb_client.assert_called_once_with()
+        self.assertTrue(all(dynamodb_client is clients[0] for dynamodb_client in clients))
+
+
     def test_extract_visit_count_from_dbresponse(self) -> None:
         """
         Verify given correct parameters, the 'visit_count' value of
@@ -245,6 +290,38 @@ class TestLambdaFunction(TestCase):
         self.assertEqual(test_return_value, return_value_200)
 
 
+    # Patch the Global Class and any function calls
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    @patch("myresume_backend.lambda_function.getVisitorsCounts")
+    def test_lambda_handler_getVisitorsCounts_valid_event_returns_200(self,
+                            patch_getVisitorsCounts : MagicMock,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ):
+        """
+        Verify 1) the batch event is parsed, 2) AWS resources are passed,
+        3) the getVisitorsCounts function is called with every page id, and
+        4) a status code 200 is returned.
+        """
+
+        # Test setup - Return a mock for the global variables and resources
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+
+        return_value_200 = {"statusCode" : 200, "body":"{}"}
+        patch_getVisitorsCounts.return_value = return_value_200
+
+        # Run Test using a test event from /tests/events/*.json
+        test_event = self.load_sample_event_from_file("sampleEvent_getVisitorCounts")
+        test_return_value = lambda_handler(event=test_event, context=None)
+
+        # Validate the function was called with the mocked global and event values
+        patch_getVisitorsCounts.assert_called_once_with(
+                                        dynamo_db=self.mocked_dynamodb_class,
+                                        page_ids=test_event["queryStringParameters"]["ids"].split(","))
+
+        # Assertion
+        self.assertEqual(test_return_value, return_value_200)
+
+
     def tearDown(self) -> None:
         # Remove (mocked!) DynamoDB Table
         dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
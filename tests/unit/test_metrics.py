@@ -0,0 +1,155 @@
+import sys
+import os
+import json
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import lambda_handler          # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.metrics import EmfMetricsEmitter, InvocationMetrics   # pylint: disable=wrong-import-position
+from myresume_backend.metrics import register_dynamodb_hooks, start_invocation, end_invocation
+from tests.unit.helpers import FakeClock   # pylint: disable=wrong-import-position
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestMetrics(TestCase):
+    """
+    Test class for the EMF hot-path metrics
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+        dynamodb.Table(self.test_ddb_table_name).put_item(Item={"pkey_uuid": "12345678-1234-5678-1234-56781234",
+                                                               "visit_count":42
+                                                               })
+        self.emitted = []
+
+
+    def test_emitter_batches_invocations_per_route(self) -> None:
+        """
+        Verify the invocations are printed as one EMF line per route and status
+        code once the batch is full, with one value per invocation.
+        """
+        emitter = EmfMetricsEmitter(namespace="Test", batch_size=3, printer=self.emitted.append)
+        for route, status_code in (("getVisitorCount", 200), ("getVisitorCount", 200)):
+            metrics = InvocationMetrics(cold_start=False)
+            metrics.route, metrics.status_code, metrics.latency_ms = route, status_code, 5.0
+            emitter.record(metrics)
+
+        # Assertion: the batch is not full yet
+        self.assertEqual(self.emitted, [])
+
+        metrics = InvocationMetrics(cold_start=True)
+        metrics.route, metrics.status_code = "addOneVisitorCount", 404
+        emitter.record(metrics)
+        documents = {document["Route"]: document for document in map(json.loads, self.emitted)}
+
+        # Assertion
+        self.assertEqual(len(documents), 2)
+        self.assertEqual(documents["getVisitorCount"]["Latency"], [5.0, 5.0])
+        self.assertEqual(documents["addOneVisitorCount"]["ColdStart"], [1])
+        self.assertEqual(documents["addOneVisitorCount"]["StatusCode"], "404")
+        self.assertEqual(documents["getVisitorCount"]["_aws"]["CloudWatchMetrics"][0]["Dimensions"],
+                         [["Service", "Route", "StatusCode"]])
+
+
+    def test_emitter_timestamps_the_invocations(self) -> None:
+        """
+        Verify the EMF Timestamp is the time the invocations were recorded,
+        not the flush time, and invocations of another minute get their own line.
+        """
+        clock = FakeClock(1800000000.0)
+        emitter = EmfMetricsEmitter(namespace="Test", batch_size=10, max_age_seconds=600,
+                                    printer=self.emitted.append, clock=clock)
+        for recorded_at in (1800000000.0, 1800000030.0, 1800000090.0):
+            clock.now = recorded_at
+            metrics = InvocationMetrics(cold_start=False)
+            metrics.route, metrics.status_code = "getVisitorCount", 200
+            emitter.record(metrics)
+        clock.now = 1800000500.0
+        emitter.flush()
+        documents = [json.loads(document) for document in self.emitted]
+
+        # Assertion
+        self.assertEqual([document["_aws"]["Timestamp"] for document in documents],
+                         [1800000000000, 1800000090000])
+        self.assertEqual([document["Invocations"] for document in documents], [[1, 1], [1]])
+
+
+    def test_dynamodb_hooks_measure_sampled_calls(self) -> None:
+        """
+        Verify the hooks count the DynamoDB calls and consumed capacity of a
+        sampled invocation, and leave other calls untouched.
+        """
+        dynamodb_resource = resource("dynamodb", region_name=_AWS_REGION)
+        register_dynamodb_hooks(dynamodb_resource.meta.client)
+        table = dynamodb_resource.Table(self.test_ddb_table_name)
+
+        metrics = InvocationMetrics(cold_start=False)
+        token = start_invocation(metrics)
+        try:
+            table.get_item(Key={"pkey_uuid": "12345678-1234-5678-1234-56781234"})
+            table.update_item(Key={"pkey_uuid": "12345678-1234-5678-1234-56781234"},
+                              UpdateExpression="ADD visit_count :val",
+                              ExpressionAttributeValues={":val": 1})
+        finally:
+            end_invocation(token)
+        unsampled_response = table.get_item(Key={"pkey_uuid": "12345678-1234-5678-1234-56781234"})
+
+        # Assertion
+        self.assertEqual(metrics.dynamodb_calls, 2)
+        self.assertGreater(metrics.dynamodb_ms, 0)
+        self.assertGreater(metrics.consumed_read_capacity, 0)
+        self.assertGreater(metrics.consumed_write_capacity, 0)
+        self.assertNotIn("ConsumedCapacity", unsampled_response)
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    @patch("myresume_backend.lambda_function.getVisitorsCount")
+    def test_lambda_handler_records_route_and_status(self,
+                            patch_getVisitorsCount : MagicMock,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify lambda_handler records the route, status code and validation time.
+        """
+        patch_getVisitorsCount.return_value = {"statusCode" : 200, "body":"42"}
+        emitter = EmfMetricsEmitter(namespace="Test", batch_size=1, printer=self.emitted.append)
+        with open("tests/events/sampleEvent_getVisitorCount.json", "r", encoding='UTF-8') as file_handle:
+            test_event = json.load(file_handle)
+
+        with patch("myresume_backend.lambda_function._METRICS_EMITTER", emitter):
+            lambda_handler(event=test_event, context=None)
+        document = json.loads(self.emitted[0])
+
+        # Assertion
+        self.assertEqual(document["Route"], "getVisitorCount")
+        self.assertEqual(document["StatusCode"], "200")
+        self.assertEqual(document["Invocations"], [1])
+        self.assertGreater(document["ValidationTime"][0], 0)
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
@@ -0,0 +1,173 @@
+import sys
+import os
+from unittest import TestCase
+from unittest.mock import patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import getVisitorsCount
+from myresume_backend.lambda_function import addOneVisitorCount
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.read_cache import VisitCountReadCache         # pylint: disable=wrong-import-position
+from tests.unit.helpers import FakeClock   # pylint: disable=wrong-import-position
+
+
+class TestVisitCountReadCache(TestCase):
+    """
+    Test class for the TTL/LRU behaviour of the read cache
+    """
+
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.cache = VisitCountReadCache(ttl_seconds=10, max_entries=2, clock=self.clock)
+
+
+    def test_from_environ_disabled_by_default(self) -> None:
+        """
+        Verify caching is disabled unless a TTL is configured.
+        """
+        self.assertIsNone(VisitCountReadCache.from_environ({}))
+        self.assertEqual(VisitCountReadCache.from_environ(
+                {"VISIT_COUNT_CACHE_TTL_SECONDS": "2", "VISIT_COUNT_CACHE_MAX_ENTRIES": "5"}).max_entries, 5)
+
+
+    def test_ttl_expiry(self) -> None:
+        """
+        Verify an entry is served until its TTL passes.
+        """
+        self.cache.put("a", 1)
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get("a"), 1)
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get("a"))
+
+        # Assertion
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1, "evictions": 0, "size": 0})
+
+
+    def test_put_without_refresh_keeps_expiry(self) -> None:
+        """
+        Verify a count put without refresh keeps the expiry of the unexpired
+        entry, and starts a new TTL once the entry expired.
+        """
+        self.cache.put("a", 1)
+        self.clock.now = 8
+        self.cache.put("a", 2, refresh=False)
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get("a"), 2)
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.put("a", 3, refresh=False)
+        self.clock.now = 19.9
+
+        # Assertion
+        self.assertEqual(self.cache.get("a"), 3)
+
+
+    def test_keep_stale(self) -> None:
+        """
+        Verify expired entries are kept as last known counts with keep_stale.
+        """
+        stale_cache = VisitCountReadCache(ttl_seconds=10, max_entries=2, clock=self.clock, keep_stale=True)
+        stale_cache.put("a", 1)
+        self.clock.now = 10
+
+        # Assertion
+        self.assertIsNone(stale_cache.get("a"))
+        self.assertEqual(stale_cache.get_stale("a"), 1)
+        self.assertIsNone(self.cache.get_stale("a"))
+        self.assertIsNotNone(VisitCountReadCache.from_environ({}, keep_stale=True))
+
+
+    def test_lru_eviction(self) -> None:
+        """
+        Verify the least recently used entry is evicted when the cache is full.
+        """
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.get("a")
+        self.cache.put("c", 3)
+
+        # Assertion
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("c"), 3)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestReadThroughCache(TestCase):
+    """
+    Test class for the read cache in front of getVisitorsCount
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish the "GLOBAL" environment for use in tests.
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name  }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+        self.page_id = "12345678-1234-5678-1234-56781234"
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": self.page_id,
+                                                        "visit_count":42
+                                                        })
+        self.cache = VisitCountReadCache(ttl_seconds=60)
+
+
+    def test_repeated_reads_served_from_cache(self) -> None:
+        """
+        Verify the second read of a page does not reach the DB.
+        """
+        with patch("myresume_backend.lambda_function._VISIT_COUNT_READ_CACHE", self.cache):
+            getVisitorsCount(dynamo_db=self.mocked_dynamodb_class, page_id=self.page_id)
+            self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": self.page_id,
+                                                            "visit_count":100
+                                                            })
+            test_return_value = getVisitorsCount(dynamo_db=self.mocked_dynamodb_class,
+                                                 page_id=self.page_id)
+
+        # Assertion
+        self.assertEqual(test_return_value["body"], "42")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+
+    def test_write_refreshes_cached_count(self) -> None:
+        """
+        Verify addOneVisitorCount updates the cached count from its DB response.
+        """
+        with patch("myresume_backend.lambda_function._VISIT_COUNT_READ_CACHE", self.cache):
+            getVisitorsCount(dynamo_db=self.mocked_dynamodb_class, page_id=self.page_id)
+            addOneVisitorCount(dynamo_db=self.mocked_dynamodb_class, page_id=self.page_id)
+            test_return_value = getVisitorsCount(dynamo_db=self.mocked_dynamodb_class,
+                                                 page_id=self.page_id)
+
+        # Assertion
+        self.assertEqual(test_return_value["body"], "43")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
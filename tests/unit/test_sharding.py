@@ -0,0 +1,139 @@
+import sys
+import os
+from unittest import TestCase
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import getVisitorsCount
+from myresume_backend.lambda_function import addOneVisitorCount
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.sharding import ShardConfig, shard_key, choose_shard    # pylint: disable=wrong-import-position
+from myresume_backend.sharding import read_visit_count_shards, fold_visit_count_shards
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestSharding(TestCase):
+    """
+    Test class for the sharded visit_count counters
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish a sharded "GLOBAL" environment: 4 shards for every page
+        self.page_id = "12345678-1234-5678-1234-56781234"
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name,
+                                     "shard_config" : ShardConfig(default_shard_count=4) }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+
+        # An existing single-item page, as written before sharding was enabled
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": self.page_id,
+                                                        "visit_count":42
+                                                        })
+
+
+    def test_shard_config_from_environ(self) -> None:
+        """
+        Verify the table-wide shard count can be overridden per page.
+        """
+        shard_config = ShardConfig.from_environ({"VISIT_COUNT_SHARD_COUNT": "8",
+                                                 "VISIT_COUNT_PAGE_SHARD_COUNTS": '{"home": 16}'})
+
+        # Assertion
+        self.assertEqual(shard_config.shard_count("home"), 16)
+        self.assertEqual(shard_config.shard_count("other"), 8)
+        self.assertEqual(ShardConfig.from_environ({}).shard_count("home"), 1)
+
+
+    def test_choose_shard(self) -> None:
+        """
+        Verify the chosen shard is in range and stable when hashed.
+        """
+        for _ in range(50):
+            self.assertIn(choose_shard(4), range(4))
+        self.assertEqual(choose_shard(4, hash_key="visitor"), choose_shard(4, hash_key="visitor"))
+        self.assertEqual(choose_shard(1), 0)
+
+
+    def test_sharded_counts_add_up(self) -> None:
+        """
+        Verify increments spread over the shards are all counted by getVisitorsCount,
+        including the count of the pre-existing single item.
+        """
+        for expected_count in range(43, 63):
+            test_return_value = addOneVisitorCount(
+                            dynamo_db = self.mocked_dynamodb_class,
+                            page_id=self.page_id
+                            )
+            self.assertEqual(test_return_value["statusCode"], 200)
+            self.assertEqual(test_return_value["body"], f"{expected_count}")
+
+        test_return_value = getVisitorsCount(
+                        dynamo_db = self.mocked_dynamodb_class,
+                        page_id=self.page_id
+                        )
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 200)
+        self.assertEqual(test_return_value["body"], "62")
+
+
+    def test_sharded_pageid_notfound_404(self) -> None:
+        """
+        Verify an unknown page-id returns 404 and no shard item is written.
+        """
+        test_return_value = addOneVisitorCount(
+                        dynamo_db = self.mocked_dynamodb_class,
+                        page_id="NOTVALID-1234-5678-1234-56781234"
+                        )
+        scanned_items = self.mocked_dynamodb_class.table.scan()["Items"]
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 404)
+        self.assertIn("Not Found", test_return_value["body"])
+        self.assertEqual(len(scanned_items), 1)
+
+
+    def test_fold_visit_count_shards(self) -> None:
+        """
+        Verify folding moves all shard counts back into the page item.
+        """
+        table = self.mocked_dynamodb_class.table
+        table.put_item(Item={"pkey_uuid": shard_key(self.page_id, 1), "visit_count": 3})
+        table.put_item(Item={"pkey_uuid": shard_key(self.page_id, 3), "visit_count": 5})
+
+        folded = fold_visit_count_shards(self.mocked_dynamodb_class.resource,
+                                         self.test_ddb_table_name, self.page_id,
+                                         from_shard_count=4)
+        shard_counts = read_visit_count_shards(self.mocked_dynamodb_class.resource,
+                                               self.test_ddb_table_name, self.page_id, 4)
+
+        # Assertion
+        self.assertEqual(folded, 8)
+        self.assertEqual(shard_counts, {0: 50, 1: 0, 2: 0, 3: 0})
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
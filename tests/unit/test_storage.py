@@ -0,0 +1,168 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import lambda_handler
+from myresume_backend.lambda_function import DynamoDBVisitCountStore
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.storage import VisitCountStore, MemoryVisitCountStore, SqliteVisitCountStore   # pylint: disable=wrong-import-position
+from myresume_backend.storage import visit_count_store_from_environ
+from myresume_backend.top_pages import TopPagesIndex
+
+
+class TestVisitCountStores(TestCase):
+    """
+    Test class for the DynamoDB, memory and SQLite stores of the visit counts
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.sqlite_path = os.path.join(self.directory.name, "counts.sqlite3")
+
+
+    def assert_store_operations(self, store: VisitCountStore) -> None:
+        """
+        Verify the store reads, increments and batch reads the pages, and
+        raises KeyError for unknown pages.
+        """
+        store.create_page("page", 42)
+        store.create_page("page", 0)
+        store.create_page("other-page")
+
+        # Assertion
+        self.assertEqual(store.get("page"), 42)
+        self.assertEqual(store.increment("page", 2), 44)
+        self.assertEqual(store.batch_get(["page", "unknown", "other-page", "page"]),
+                         ({"page": 44, "other-page": 0}, ["unknown"], []))
+        with self.assertRaises(KeyError):
+            store.get("unknown")
+        with self.assertRaises(KeyError):
+            store.increment("unknown")
+        self.assertEqual(store.top_pages(1), {"page": 44})
+
+
+    def test_stores_get_increment_and_batch_get(self) -> None:
+        """
+        Verify the local stores implement the storage interface.
+        """
+        for store in (MemoryVisitCountStore(), SqliteVisitCountStore(self.sqlite_path)):
+            with self.subTest(store=type(store).__name__):
+                self.assert_store_operations(store)
+        with self.assertRaises(TypeError):
+            VisitCountStore()  # pylint: disable=abstract-class-instantiated
+
+
+    @moto.mock_dynamodb
+    def test_dynamodb_store_get_increment_and_batch_get(self) -> None:
+        """
+        Verify the DynamoDB store implements the storage interface, with the
+        top pages served from its index.
+        """
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = "unit_test_ddb",
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+        dynamodb_class = LambdaDynamoDBClass({ "resource" : dynamodb,
+                                               "client" : client('dynamodb', region_name=_AWS_REGION),
+                                               "table_name" : "unit_test_ddb",
+                                               "top_pages" : TopPagesIndex(capacity=10) })
+
+        # Assertion
+        self.assertIsInstance(dynamodb_class.store, DynamoDBVisitCountStore)
+        self.assert_store_operations(dynamodb_class.store)
+
+
+    def test_sqlite_groups_concurrent_increments_in_one_commit(self) -> None:
+        """
+        Verify the increments queued while a commit runs are committed
+        together, and an unknown page only fails its own increment.
+        """
+        store = SqliteVisitCountStore(self.sqlite_path)
+        store.create_page("page", 0)
+        results = []
+        page_ids = ["page"] * 5 + ["unknown"]
+
+        def increment(page_id):
+            try:
+                results.append(store.increment(page_id))
+            except KeyError:
+                results.append("not found")
+
+        with store._commit_lock:  # pylint: disable=protected-access
+            threads = [threading.Thread(target=increment, args=(page_id,)) for page_id in page_ids]
+            for thread in threads:
+                thread.start()
+            while len(store._pending) < len(page_ids):  # pylint: disable=protected-access
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+
+        # Assertion
+        self.assertEqual(store.commits, 1)
+        self.assertEqual(sorted(results, key=str), [1, 2, 3, 4, 5, "not found"])
+        self.assertEqual(SqliteVisitCountStore(self.sqlite_path).get("page"), 5)
+
+
+    def test_from_environ(self) -> None:
+        """
+        Verify the store is selected by VISIT_COUNT_STORE and seeded with
+        VISIT_COUNT_STORE_PAGES.
+        """
+        pages = json.dumps({"page": 42})
+        memory_store = visit_count_store_from_environ({"VISIT_COUNT_STORE": "memory",
+                                                       "VISIT_COUNT_STORE_PAGES": pages})
+        sqlite_store = visit_count_store_from_environ({"VISIT_COUNT_STORE": "sqlite",
+                                                       "VISIT_COUNT_SQLITE_PATH": self.sqlite_path,
+                                                       "VISIT_COUNT_STORE_PAGES": pages})
+
+        # Assertion
+        self.assertIsNone(visit_count_store_from_environ({}))
+        self.assertEqual(memory_store.get("page"), 42)
+        self.assertEqual(sqlite_store.get("page"), 42)
+        with self.assertRaises(ValueError):
+            visit_count_store_from_environ({"VISIT_COUNT_STORE": "redis"})
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    def test_lambda_handler_with_memory_store(self,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify the routes read and increment the counts of a local store.
+        """
+        store = MemoryVisitCountStore({"6632d5b4-5655-4c48-b7b6-071d5823c888": 42})
+        patch_lambda_dynamodb_class.return_value = LambdaDynamoDBClass({"resource": None,
+                                                                        "table_name": "NONE",
+                                                                        "store": store})
+        events = {}
+        for name in ("addOneVisitorCount", "getVisitorCount", "getVisitorCounts"):
+            with open(f"tests/events/sampleEvent_{name}.json", "r", encoding='UTF-8') as file_handle:
+                events[name] = json.load(file_handle)
+
+        add_return_value = lambda_handler(event=events["addOneVisitorCount"], context=None)
+        get_return_value = lambda_handler(event=events["getVisitorCount"], context=None)
+        batch_return_value = lambda_handler(event=events["getVisitorCounts"], context=None)
+
+        # Assertion
+        self.assertEqual(add_return_value["body"], "43")
+        self.assertEqual(get_return_value["body"], "43")
+        self.assertEqual(json.loads(batch_return_value["body"]),
+                         {"counts": {"6632d5b4-5655-4c48-b7b6-071d5823c888": 43},
+                          "missing": ["e1a5f0c2-1c7d-4a6f-9a53-2a2f3b8d1c11"], "errors": []})
+
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
@@ -0,0 +1,183 @@
+import sys
+import os
+import json
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import lambda_handler
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.top_pages import TopPagesIndex, merge_top_page, TOP_PAGES_KEY   # pylint: disable=wrong-import-position
+
+
+class TestMergeTopPage(TestCase):
+    """
+    Test class for the index update decisions
+    """
+
+    def test_entries_evictions_and_refreshes(self) -> None:
+        """
+        Verify pages enter a full index only above its lowest count, which
+        is then evicted, and members are refreshed by refresh_ratio steps.
+        """
+        entries = {"a": 100, "b": 50}
+
+        # Assertion
+        self.assertEqual(merge_top_page(entries, "c", 1, capacity=3, refresh_ratio=0.1),
+                         {"a": 100, "b": 50, "c": 1})
+        self.assertIsNone(merge_top_page(entries, "c", 50, capacity=2, refresh_ratio=0.1))
+        self.assertEqual(merge_top_page(entries, "c", 51, capacity=2, refresh_ratio=0.1), {"a": 100, "c": 51})
+        self.assertIsNone(merge_top_page(entries, "a", 109, capacity=2, refresh_ratio=0.1))
+        self.assertEqual(merge_top_page(entries, "a", 110, capacity=2, refresh_ratio=0.1), {"a": 110, "b": 50})
+
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestTopPagesIndex(TestCase):
+    """
+    Test class for the top pages index and getTopPages
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish the "GLOBAL" environment for use in tests.
+        self.index = TopPagesIndex(capacity=2, refresh_ratio=0.0)
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "client" : client('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name,
+                                     "top_pages" : self.index }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+        for page_id, visit_count in (("page-a", 10), ("page-b", 20), ("page-c", 30)):
+            self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": page_id, "visit_count": visit_count})
+
+
+    def test_increments_maintain_index(self) -> None:
+        """
+        Verify the increments keep the capacity highest pages in the index,
+        and increments which cannot change it do not read it.
+        """
+        dynamodb_client = self.mocked_dynamodb_class.client
+        for page_id, visit_count in (("page-a", 11), ("page-b", 21), ("page-c", 31)):
+            self.index.record(dynamodb_client, self.test_ddb_table_name, page_id, visit_count)
+        with patch.object(self.index, "read") as patch_read:
+            low_page_recorded = self.index.record(dynamodb_client, self.test_ddb_table_name, "page-a", 12)
+        entries, version = self.index.read(dynamodb_client, self.test_ddb_table_name)
+
+        # Assertion
+        self.assertFalse(low_page_recorded)
+        patch_read.assert_not_called()
+        self.assertEqual(entries, {"page-b": 21, "page-c": 31})
+        self.assertEqual(version, 3)
+
+
+    def test_concurrent_update_is_merged(self) -> None:
+        """
+        Verify an index written by another environment meanwhile is re-read
+        and merged instead of overwritten.
+        """
+        dynamodb_client = self.mocked_dynamodb_class.client
+        other_index = TopPagesIndex(capacity=2, refresh_ratio=0.0)
+        self.index.record(dynamodb_client, self.test_ddb_table_name, "page-a", 11)
+        other_index.record(dynamodb_client, self.test_ddb_table_name, "page-b", 21)
+        # this environment's copy of the index is now out of date
+        self.index.record(dynamodb_client, self.test_ddb_table_name, "page-c", 31)
+
+        # Assertion
+        self.assertEqual(self.index.read(dynamodb_client, self.test_ddb_table_name)[0],
+                         {"page-b": 21, "page-c": 31})
+
+
+    def test_rebuild_adds_shards_and_skips_internal_items(self) -> None:
+        """
+        Verify the rebuilt index adds the shards to their page and skips the
+        dedupe and index items.
+        """
+        table = self.mocked_dynamodb_class.table
+        table.put_item(Item={"pkey_uuid": "page-a#shard-1", "visit_count": 25})
+        table.put_item(Item={"pkey_uuid": "#visit#page-c#00000000000000ff", "expires_at": 1})
+        table.put_item(Item={"pkey_uuid": "#top-pages-stale", "visit_count": 1000})
+
+        entries = self.index.rebuild(self.mocked_dynamodb_class.client, self.test_ddb_table_name)
+
+        # Assertion
+        self.assertEqual(entries, {"page-a": 35, "page-c": 30})
+        self.assertEqual(table.get_item(Key={"pkey_uuid": TOP_PAGES_KEY})["Item"]["top_pages"],
+                         {"page-a": 35, "page-c": 30})
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    def test_lambda_handler_get_top_pages(self,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify increments update the index and getTopPages returns the
+        members ranked by their exact count.
+        """
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+        with open("tests/events/sampleEvent_addOneVisitorCount.json", "r", encoding='UTF-8') as file_handle:
+            add_event = json.load(file_handle)
+        with open("tests/events/sampleEvent_getTopPages.json", "r", encoding='UTF-8') as file_handle:
+            top_pages_event = json.load(file_handle)
+        for page_id in ("page-a", "page-b", "page-a"):
+            add_event["pathParameters"]["page-id"] = page_id
+            lambda_handler(event=add_event, context=None)
+        # increments of members below refresh_ratio leave the indexed count behind
+        self.index.refresh_ratio = 1.0
+        for _ in range(15):
+            lambda_handler(event=add_event, context=None)
+
+        too_many_return_value = lambda_handler(event=top_pages_event, context=None)
+        top_pages_event["queryStringParameters"]["limit"] = "2"
+        return_value = lambda_handler(event=top_pages_event, context=None)
+
+        # Assertion
+        self.assertEqual(too_many_return_value["statusCode"], 400)
+        self.assertEqual(return_value["statusCode"], 200)
+        self.assertEqual(json.loads(return_value["body"]),
+                         {"pages": [{"pageId": "page-a", "visit_count": 27},
+                                    {"pageId": "page-b", "visit_count": 21}]})
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    def test_lambda_handler_get_top_pages_disabled(self,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify getTopPages is not found without the index.
+        """
+        self.mocked_dynamodb_class.top_pages = None
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+        with open("tests/events/sampleEvent_getTopPages.json", "r", encoding='UTF-8') as file_handle:
+            test_event = json.load(file_handle)
+
+        test_return_value = lambda_handler(event=test_event, context=None)
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 404)
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
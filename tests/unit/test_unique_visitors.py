@@ -0,0 +1,185 @@
+import sys
+import os
+import json
+import random
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import lambda_handler
+from myresume_backend.lambda_function import getUniqueVisitorCount
+from myresume_backend.lambda_function import request_visitor_hash
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend import unique_visitors                       # pylint: disable=wrong-import-position
+from myresume_backend.unique_visitors import HyperLogLog, UniqueVisitorConfig, visitor_hash
+from myresume_backend.unique_visitors import add_unique_visitor, read_unique_visitor_sketch
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestUniqueVisitors(TestCase):
+    """
+    Test class for the HyperLogLog unique-visitor estimation
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish a "GLOBAL" environment with unique-visitor estimation enabled
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "client" : client('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name,
+                                     "unique_visitors" : UniqueVisitorConfig(precision=11) }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": "12345678-1234-5678-1234-56781234",
+                                                        "visit_count":42
+                                                        })
+
+
+    def test_hyperloglog_estimate_error(self) -> None:
+        """
+        Verify the estimate stays within a few standard errors, for small
+        (linear counting) and large cardinalities, and repeats are ignored.
+        """
+        test_random = random.Random(42)
+        for cardinality in (100, 50000):
+            sketch = HyperLogLog(precision=11)
+            hashes = [test_random.getrandbits(64) for _ in range(cardinality)]
+            for value_hash in hashes:
+                sketch.add(value_hash)
+
+            # Assertion
+            self.assertFalse(any(sketch.add(value_hash) for value_hash in hashes))
+            self.assertLess(abs(sketch.estimate() - cardinality) / cardinality, 0.07)
+            self.assertEqual(len(sketch.to_bytes()), 2048)
+
+
+    def test_hyperloglog_merge(self) -> None:
+        """
+        Verify merged sketches estimate the union of their values.
+        """
+        first_sketch, second_sketch = HyperLogLog(precision=10), HyperLogLog(precision=10)
+        for value in range(2000):
+            first_sketch.add(visitor_hash(f"10.0.0.{value}", "ua"))
+            second_sketch.add(visitor_hash(f"10.0.0.{value + 1000}", "ua"))
+        first_sketch.merge(second_sketch)
+
+        # Assertion
+        self.assertLess(abs(first_sketch.estimate() - 3000) / 3000, 0.1)
+        self.assertRaises(ValueError, first_sketch.merge, HyperLogLog(precision=11))
+
+
+    def test_add_unique_visitor_writes_only_new_registers(self) -> None:
+        """
+        Verify a returning visitor does not write the sketch again.
+        """
+        dynamodb_client = self.mocked_dynamodb_class.client
+        value_hash = visitor_hash("126.29.55.95", "PostmanRuntime/7.35.0")
+
+        # Assertion
+        self.assertTrue(add_unique_visitor(dynamodb_client, self.test_ddb_table_name,
+                                           "12345678-1234-5678-1234-56781234", value_hash, 11))
+        self.assertFalse(add_unique_visitor(dynamodb_client, self.test_ddb_table_name,
+                                            "12345678-1234-5678-1234-56781234", value_hash, 11))
+        self.assertRaises(KeyError, add_unique_visitor, dynamodb_client, self.test_ddb_table_name,
+                          "NOTVALID-1234-5678-1234-56781234", value_hash, 11)
+        self.assertEqual(json.loads(getUniqueVisitorCount(dynamo_db=self.mocked_dynamodb_class,
+                                                          page_id="12345678-1234-5678-1234-56781234")["body"]), 1)
+
+
+    def test_add_unique_visitor_merges_concurrent_update(self) -> None:
+        """
+        Verify an update based on a stale sketch is retried on the current one.
+        """
+        dynamodb_client = self.mocked_dynamodb_class.client
+        first_hash, second_hash = visitor_hash("10.0.0.1", "ua"), visitor_hash("10.0.0.2", "ua")
+        stale_sketch = read_unique_visitor_sketch(dynamodb_client, self.test_ddb_table_name,
+                                                  "12345678-1234-5678-1234-56781234", 11)
+        add_unique_visitor(dynamodb_client, self.test_ddb_table_name,
+                           "12345678-1234-5678-1234-56781234", first_hash, 11)
+
+        current_sketch = read_unique_visitor_sketch(dynamodb_client, self.test_ddb_table_name,
+                                                    "12345678-1234-5678-1234-56781234", 11)
+
+        # The first read returns the sketch as it was before the concurrent update
+        with patch("myresume_backend.unique_visitors.read_unique_visitor_sketch",
+                   side_effect=[stale_sketch, current_sketch]) as patch_read:
+            test_return_value = unique_visitors.add_unique_visitor(dynamodb_client, self.test_ddb_table_name,
+                                                                   "12345678-1234-5678-1234-56781234",
+                                                                   second_hash, 11)
+        sketch, version = read_unique_visitor_sketch(dynamodb_client, self.test_ddb_table_name,
+                                                     "12345678-1234-5678-1234-56781234", 11)
+
+        # Assertion
+        self.assertTrue(test_return_value)
+        self.assertEqual(patch_read.call_count, 2)
+        self.assertEqual(version, 2)
+        self.assertEqual(sketch.estimate(), 2)
+
+
+    # Patch the Global Class
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    def test_lambda_handler_counts_unique_visitors(self,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify lambda_handler adds the visitor of every counted visit, and
+        reloads of the same visitor are counted once.
+        """
+        patch_lambda_dynamodb_class.return_value = self.mocked_dynamodb_class
+        with open("tests/events/sampleEvent_addOneVisitorCount.json", "r", encoding='UTF-8') as file_handle:
+            test_event = json.load(file_handle)
+        test_event["pathParameters"]["page-id"] = "12345678-1234-5678-1234-56781234"
+
+        lambda_handler(event=test_event, context=None)
+        lambda_handler(event=test_event, context=None)
+        test_event["headers"]["user-agent"] = "Mozilla/5.0"
+        lambda_handler(event=test_event, context=None)
+        test_event["queryStringParameters"]["func"] = "getUniqueVisitorCount"
+        test_return_value = lambda_handler(event=test_event, context=None)
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 200)
+        self.assertEqual(test_return_value["body"], "2")
+
+
+    def test_request_visitor_hash_ignores_forwarded_for(self) -> None:
+        """
+        Verify the visitor is identified by the source IP seen by API Gateway,
+        so that a client rotating x-forwarded-for stays the same visitor.
+        """
+        with open("tests/events/sampleEvent_addOneVisitorCount.json", "r", encoding='UTF-8') as file_handle:
+            test_event = json.load(file_handle)
+        first_hash = request_visitor_hash(test_event)
+        test_event["headers"]["x-forwarded-for"] = "198.51.100.1"
+        spoofed_hash = request_visitor_hash(test_event)
+        test_event["requestContext"]["http"]["sourceIp"] = "203.0.113.7"
+
+        # Assertion
+        self.assertEqual(spoofed_hash, first_hash)
+        self.assertNotEqual(request_visitor_hash(test_event), first_hash)
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )
@@ -0,0 +1,76 @@
+import sys
+import json
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import lambda_handler            # pylint: disable=wrong-import-position
+from myresume_backend.validation import SchemaValidationError          # pylint: disable=wrong-import-position
+from myresume_backend.validation import validate_request, validate_response
+
+
+class TestValidation(TestCase):
+    """
+    Test class for the precompiled request/response validation
+    """
+
+    # Load test events from the file system
+    def load_sample_event_from_file(self, test_event_file_name: str) ->  dict:
+        """
+        Loads test events from the file system
+        """
+        event_file_name = f"tests/events/{test_event_file_name}.json"
+        with open(event_file_name, "r", encoding='UTF-8') as file_handle:
+            return json.load(file_handle)
+
+
+    def test_sample_events_are_valid(self) -> None:
+        """
+        Verify every sample event passes the compiled input schema.
+        """
+        for test_event_file_name in ("sampleEvent_getVisitorCount",
+                                     "sampleEvent_addOneVisitorCount",
+                                     "sampleEvent_getVisitorCounts"):
+            validate_request(self.load_sample_event_from_file(test_event_file_name))
+        validate_response({"statusCode": 200, "body": "42", "headers": {"Content-Type": "text/plain"}})
+
+
+    def test_invalid_response_raises(self) -> None:
+        """
+        Verify a response with a wrong type raises SchemaValidationError.
+        """
+        with self.assertRaises(SchemaValidationError):
+            validate_response({"statusCode": "200", "body": "42"})
+
+
+    def test_lambda_handler_invalid_event_returns_400(self) -> None:
+        """
+        Verify an event without page-id is answered with 400 instead of raising.
+        """
+        test_event = self.load_sample_event_from_file("sampleEvent_getVisitorCount")
+        del test_event["pathParameters"]
+
+        test_return_value = lambda_handler(event=test_event, context=None)
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 400)
+        self.assertIn("Bad Request", test_return_value["body"])
+
+
+    @patch("myresume_backend.lambda_function.LambdaDynamoDBClass")
+    @patch("myresume_backend.lambda_function.getVisitorsCount")
+    def test_lambda_handler_invalid_response_returns_500(self,
+                            patch_getVisitorsCount : MagicMock,
+                            patch_lambda_dynamodb_class : MagicMock
+                            ) -> None:
+        """
+        Verify a response which does not match OUTPUT_SCHEMA becomes a 500.
+        """
+        patch_getVisitorsCount.return_value = {"statusCode": 200}
+
+        test_event = self.load_sample_event_from_file("sampleEvent_getVisitorCount")
+        test_return_value = lambda_handler(event=test_event, context=None)
+
+        # Assertion
+        self.assertEqual(test_return_value["statusCode"], 500)
@@ -0,0 +1,176 @@
+import sys
+import os
+import threading
+from unittest import TestCase
+from boto3 import resource, client
+import moto
+
+# Import the Globals, Classes, and Functions from the Lambda Handler
+sys.path.append('./myresume_backend')
+from myresume_backend.lambda_function import LambdaDynamoDBClass   # pylint: disable=wrong-import-position
+from myresume_backend.lambda_function import addOneVisitorCountBuffered
+from myresume_backend.lambda_function import _AWS_REGION
+from myresume_backend.write_buffer import VisitCountWriteBuffer    # pylint: disable=wrong-import-position
+from tests.unit.helpers import FakeClock   # pylint: disable=wrong-import-position
+
+
+# Mock all AWS Services in use
+@moto.mock_dynamodb
+class TestWriteBuffer(TestCase):
+    """
+    Test class for the write-coalescing buffer of the visitor increments
+    """
+
+    # Test Setup
+    def setUp(self) -> None:
+        """
+        Create mocked resources for use during tests
+        """
+
+        # Mock environment & override resources
+        self.test_ddb_table_name = "unit_test_ddb"
+        os.environ["DYNAMODB_TABLE_NAME"] = self.test_ddb_table_name
+
+        # Set up the services: construct a (mocked!) DynamoDB table
+        dynamodb = resource("dynamodb", region_name=_AWS_REGION)
+        dynamodb.create_table(
+            TableName = self.test_ddb_table_name,
+            KeySchema=[{"AttributeName": "pkey_uuid", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pkey_uuid", "AttributeType": "S"}],
+            BillingMode='PAY_PER_REQUEST'
+            )
+
+        # Establish the "GLOBAL" environment for use in tests.
+        mocked_dynamodb_resource = { "resource" : resource('dynamodb', region_name=_AWS_REGION),
+                                     "table_name" : self.test_ddb_table_name  }
+        self.mocked_dynamodb_class = LambdaDynamoDBClass(mocked_dynamodb_resource)
+        self.page_id = "12345678-1234-5678-1234-56781234"
+        self.mocked_dynamodb_class.table.put_item(Item={"pkey_uuid": self.page_id,
+                                                        "visit_count":42
+                                                        })
+        self.clock = FakeClock()
+        self.write_buffer = VisitCountWriteBuffer(max_pending=3, max_age_seconds=10,
+                                                  clock=self.clock)
+
+
+    def stored_visit_count(self) -> int:
+        """
+        Return the visit_count currently stored in the mocked table
+        """
+        return int(self.mocked_dynamodb_class.table.get_item(
+                        Key={"pkey_uuid": self.page_id})["Item"]["visit_count"])
+
+
+    def test_from_environ_disabled_by_default(self) -> None:
+        """
+        Verify buffering is disabled unless a size threshold is configured.
+        """
+        self.assertIsNone(VisitCountWriteBuffer.from_environ({}))
+        self.assertEqual(VisitCountWriteBuffer.from_environ(
+                {"VISIT_COUNT_WRITE_BUFFER_MAX_PENDING": "10"}).max_pending, 10)
+
+
+    def test_increments_coalesced_until_size_threshold(self) -> None:
+        """
+        Verify the first increment is written at once, the next ones are buffered
+        and returned as persisted + pending, and are written as one delta when
+        the size threshold is reached.
+        """
+        returned_counts = [addOneVisitorCountBuffered(self.mocked_dynamodb_class, self.page_id,
+                                                      self.write_buffer) for _ in range(3)]
+
+        # Assertion
+        self.assertEqual(returned_counts, [43, 44, 45])
+        self.assertEqual(self.stored_visit_count(), 43)
+
+        returned_counts = [addOneVisitorCountBuffered(self.mocked_dynamodb_class, self.page_id,
+                                                      self.write_buffer) for _ in range(2)]
+
+        # Assertion
+        self.assertEqual(returned_counts, [46, 47])
+        self.assertEqual(self.stored_visit_count(), 46)
+
+
+    def test_age_and_remaining_time_thresholds(self) -> None:
+        """
+        Verify the buffer is due when the oldest increment is too old, or when
+        the invocation is about to time out.
+        """
+        self.write_buffer.add(self.page_id)
+
+        # Assertion
+        self.assertFalse(self.write_buffer.is_due())
+        self.assertTrue(self.write_buffer.is_due(remaining_time_ms=100))
+        self.clock.now = 10
+        self.assertTrue(self.write_buffer.is_due())
+
+
+    def test_unknown_page_delta_dropped(self) -> None:
+        """
+        Verify the increment of an unknown page-id raises and is not kept pending.
+        """
+        with self.assertRaises(Exception):
+            addOneVisitorCountBuffered(self.mocked_dynamodb_class, "NOTVALID-1234-5678-1234-56781234",
+                                       self.write_buffer)
+
+        # Assertion
+        self.assertEqual(self.write_buffer.pending_count(), 0)
+
+
+    def test_persisted_counts_bounded(self) -> None:
+        """
+        Verify the least recently used persisted counts are forgotten beyond
+        max_pages, except those of the pages with a pending delta.
+        """
+        write_buffer = VisitCountWriteBuffer(max_pending=10, max_pages=2, clock=self.clock)
+        write_buffer.add("a")
+        write_buffer.add("b")
+        write_buffer.flush(lambda page_id, delta: delta)
+        write_buffer.current_count("a")
+        write_buffer.add("b")
+        write_buffer.add("c")
+        write_buffer.flush(lambda page_id, delta: 1 if page_id == "c" else 1 / 0)
+
+        # Assertion: "a" is the least recently used page without a pending delta
+        self.assertFalse(write_buffer.is_persisted("a"))
+        self.assertTrue(write_buffer.is_persisted("b"))
+        self.assertTrue(write_buffer.is_persisted("c"))
+        self.assertEqual(write_buffer.current_count("b"), 2)
+
+
+    def test_concurrent_first_hits(self) -> None:
+        """
+        Verify a first hit whose delta was taken by the flush of another
+        thread waits for that write, and gets the persisted count.
+        """
+        persist_in_flight, release_persist = threading.Event(), threading.Event()
+        def slow_persist(page_id: str, delta: int) -> int:
+            persist_in_flight.set()
+            release_persist.wait(timeout=5)
+            return 42 + delta
+        self.write_buffer.add(self.page_id)
+        self.write_buffer.add(self.page_id)
+        first_flush = threading.Thread(target=self.write_buffer.flush, args=(slow_persist,))
+        first_flush.start()
+        persist_in_flight.wait(timeout=5)
+
+        returned_counts = []
+        def second_hit() -> None:
+            self.write_buffer.flush(slow_persist)
+            returned_counts.append(self.write_buffer.current_count(self.page_id))
+        second_flush = threading.Thread(target=second_hit)
+        second_flush.start()
+        second_flush.join(timeout=0.1)
+        release_persist.set()
+        first_flush.join()
+        second_flush.join()
+
+        # Assertion
+        self.assertEqual(returned_counts, [44])
+        self.assertEqual(self.write_buffer.pending_count(), 0)
+
+
+    def tearDown(self) -> None:
+        # Remove (mocked!) DynamoDB Table
+        dynamodb_resource = client("dynamodb", region_name=_AWS_REGION)
+        dynamodb_resource.delete_table(TableName = self.test_ddb_table_name )